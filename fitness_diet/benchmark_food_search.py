@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: meal-swap autocomplete over a large food catalog.
+
+Fills a scratch SQLite database with synthetic FoodDatabase rows, builds the
+FTS5 index and times food_search.search for prefix queries as they are typed,
+multi-word queries and misspelled ones, against the ``name__icontains``
+scan a plain ORM search would do.
+
+Usage: python benchmark_food_search.py [--rows N] [--iterations N] [--db PATH]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+
+FOODS = ['chicken', 'beef', 'salmon', 'tuna', 'tofu', 'tempeh', 'lentils', 'chickpeas', 'quinoa', 'rice', 'oats',
+         'yogurt', 'cheese', 'egg', 'turkey', 'pork', 'shrimp', 'broccoli', 'spinach', 'kale', 'avocado', 'banana',
+         'apple', 'blueberries', 'almonds', 'walnuts', 'peanut butter', 'pasta', 'bread', 'potato', 'sweet potato',
+         'mushroom', 'pepper', 'tomato', 'carrot', 'zucchini', 'cauliflower', 'beans', 'edamame', 'cod', 'sardines',
+         'mackerel', 'duck', 'lamb', 'bison', 'seitan', 'barley', 'couscous', 'noodles', 'tortilla']
+STYLES = ['grilled', 'baked', 'roasted', 'steamed', 'fried', 'raw', 'smoked', 'braised', 'poached', 'sauteed',
+          'spicy', 'honey glazed', 'lemon herb', 'garlic', 'teriyaki', 'curried', 'bbq', 'pesto', 'cajun', 'mediterranean']
+SIDES = ['', 'salad', 'bowl', 'wrap', 'soup', 'stir fry', 'skewers', 'sandwich', 'casserole', 'curry', 'tacos',
+         'with rice', 'with greens', 'with quinoa', 'with vegetables']
+BRANDS = ['', 'Acme', 'Green Valley', 'Northfield', 'Sunrise', 'Harvest Co', 'Blue Ridge', 'Oakwood', 'Prairie']
+CATEGORIES = ['vegetarian', 'vegan', 'high_protein', 'low_carb', 'gluten_free', 'dairy_free', '']
+
+QUERIES = {
+    'prefix (as typed)': ['c', 'ch', 'chi', 'chic', 'chick', 'chicke', 'chicken'],
+    'multi-word': ['grilled chicken', 'salmon bowl', 'lemon herb cod', 'sweet pot', 'acme tofu wr'],
+    'misspelled': ['chikcen', 'salmn', 'brocoli', 'quinao', 'avacado bo'],
+}
+
+
+def synthetic_foods(n, rng):
+    names = set()
+    while len(names) < n:
+        parts = [rng.choice(BRANDS), rng.choice(STYLES), rng.choice(FOODS), rng.choice(SIDES)]
+        name = ' '.join(p for p in parts if p).title()
+        if name in names:
+            name = f"{name} #{len(names)}"
+        names.add(name)
+    for name in sorted(names, key=lambda _: rng.random()):
+        yield name, rng.randint(40, 900), rng.choice(CATEGORIES)
+
+
+def per_call_ms(fn, queries, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (iterations * len(queries)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', default=None, help="Scratch database file (default: a temporary file)")
+    args = parser.parse_args()
+
+    from django.conf import settings
+    scratch = args.db or os.path.join(tempfile.mkdtemp(), 'food_search.sqlite3')
+    settings.DATABASES['default']['NAME'] = scratch
+    django.setup()
+    warnings.filterwarnings('ignore')
+
+    from django.core.management import call_command
+    from fitness_diet import food_search
+    from fitness_diet.models import FoodDatabase
+
+    call_command('migrate', verbosity=0)
+    if FoodDatabase.objects.count() != args.rows:
+        FoodDatabase.objects.all().delete()
+        start = time.perf_counter()
+        FoodDatabase.objects.bulk_create(
+            (FoodDatabase(name=name, calories=calories, category=category)
+             for name, calories, category in synthetic_foods(args.rows, random.Random(0))),
+            batch_size=5000)
+        indexed = food_search.rebuild()
+        print(f"{indexed} foods loaded and indexed in {time.perf_counter() - start:.1f}s ({scratch})")
+
+    def orm_search(query):
+        foods = FoodDatabase.objects.all()
+        for word in food_search.words(query):
+            foods = foods.filter(name__icontains=word)
+        return list(foods.values('id', 'name')[:10])
+
+    food_search.search('warm up')  # loads the vocabulary
+    print(f"{'':<20}{'index (ms)':>12}{'icontains (ms)':>16}")
+    for label, queries in QUERIES.items():
+        index_ms = per_call_ms(food_search.search, queries, args.iterations)
+        orm_ms = per_call_ms(orm_search, queries, max(1, args.iterations // 10))
+        print(f"{label:<20}{index_ms:>12.2f}{orm_ms:>16.2f}")
+    for query in QUERIES['misspelled']:
+        foods, corrected = food_search.search(query, limit=3)
+        print(f"  {query!r:<14} -> {[food['name'] for food in foods]}{' (corrected)' if corrected else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-request cost of the heart disease prediction path.
+
+Compares the original dict-based feature building plus separate
+predict()/predict_proba() calls against the precompiled
+HeartFeatureEncoder with a single predict_proba() call.
+
+Usage: python benchmark_heart_encoder.py [iterations]
+"""
+
+import os
+import random
+import sys
+import time
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from fitness_diet.feature_encoders import get_heart_encoder, predict_with_proba
+from fitness_diet.model_registry import model_registry
+
+
+def legacy_encode(data, feature_names):
+    """Feature building as heart_disease_prediction did it before the encoder"""
+    age = float(data.get('age', 50))
+    sex = int(data.get('sex', 1))
+    chest_pain_type = data.get('chest_pain_type', 'ASY')
+    resting_bp = float(data.get('resting_bp', 120))
+    cholesterol = float(data.get('cholesterol', 200))
+    fasting_bs = int(data.get('fasting_bs', 0))
+    resting_ecg = data.get('resting_ecg', 'Normal')
+    max_hr = float(data.get('max_hr', 150))
+    exercise_angina = int(data.get('exercise_angina', 0))
+    oldpeak = float(data.get('oldpeak', 1.0))
+    st_slope = data.get('st_slope', 'Flat')
+
+    features_dict = {
+        'Age': age, 'RestingBP': resting_bp, 'Cholesterol': cholesterol,
+        'FastingBS': fasting_bs, 'MaxHR': max_hr, 'Oldpeak': oldpeak,
+        'Sex_F': 1 if sex == 0 else 0, 'Sex_M': 1 if sex == 1 else 0,
+        'ChestPainType_ASY': 1 if chest_pain_type == 'ASY' else 0,
+        'ChestPainType_ATA': 1 if chest_pain_type == 'ATA' else 0,
+        'ChestPainType_NAP': 1 if chest_pain_type == 'NAP' else 0,
+        'ChestPainType_TA': 1 if chest_pain_type == 'TA' else 0,
+        'RestingECG_LVH': 1 if resting_ecg == 'LVH' else 0,
+        'RestingECG_Normal': 1 if resting_ecg == 'Normal' else 0,
+        'RestingECG_ST': 1 if resting_ecg == 'ST' else 0,
+        'ExerciseAngina_N': 1 if exercise_angina == 0 else 0,
+        'ExerciseAngina_Y': 1 if exercise_angina == 1 else 0,
+        'ST_Slope_Down': 1 if st_slope == 'Down' else 0,
+        'ST_Slope_Flat': 1 if st_slope == 'Flat' else 0,
+        'ST_Slope_Up': 1 if st_slope == 'Up' else 0,
+    }
+    return np.array([[features_dict[feature] for feature in feature_names]])
+
+
+def random_payload(rng):
+    return {
+        'age': rng.randint(28, 77),
+        'sex': rng.choice([0, 1]),
+        'chest_pain_type': rng.choice(['ASY', 'ATA', 'NAP', 'TA', 'XX']),
+        'resting_bp': rng.randint(90, 200),
+        'cholesterol': rng.randint(0, 600),
+        'fasting_bs': rng.choice([0, 1]),
+        'resting_ecg': rng.choice(['Normal', 'LVH', 'ST']),
+        'max_hr': rng.randint(60, 202),
+        'exercise_angina': rng.choice([0, 1]),
+        'oldpeak': round(rng.uniform(-2.6, 6.2), 1),
+        'st_slope': rng.choice(['Flat', 'Up', 'Down']),
+    }
+
+
+def per_call_us(fn, payloads):
+    start = time.perf_counter()
+    for payload in payloads:
+        fn(payload)
+    return (time.perf_counter() - start) / len(payloads) * 1e6
+
+
+def main(iterations=200):
+    rng = random.Random(0)
+    payloads = [random_payload(rng) for _ in range(iterations)]
+    model = model_registry.get('heart_disease/heart_model.pkl')
+    feature_names = model_registry.get('heart_disease/model_features.pkl')
+    encoder = get_heart_encoder()
+
+    for payload in payloads:
+        assert np.array_equal(legacy_encode(payload, feature_names), encoder.encode_row(payload))
+
+    def legacy_request(payload):
+        features = legacy_encode(payload, feature_names)
+        return model.predict(features)[0], model.predict_proba(features)[0][1]
+
+    def encoder_request(payload):
+        labels, proba = predict_with_proba(model, encoder.encode_row(payload))
+        return labels[0], proba[0][1]
+
+    legacy_encode_us = per_call_us(lambda p: legacy_encode(p, feature_names), payloads)
+    encoder_encode_us = per_call_us(encoder.encode_row, payloads)
+    legacy_total_us = per_call_us(legacy_request, payloads)
+    encoder_total_us = per_call_us(encoder_request, payloads)
+
+    print(f"{'':<24}{'legacy':>12}{'encoder':>12}{'speedup':>10}")
+    print(f"{'encode only (us)':<24}{legacy_encode_us:>12.1f}{encoder_encode_us:>12.1f}"
+          f"{legacy_encode_us / encoder_encode_us:>9.1f}x")
+    print(f"{'encode + predict (us)':<24}{legacy_total_us:>12.1f}{encoder_total_us:>12.1f}"
+          f"{legacy_total_us / encoder_total_us:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
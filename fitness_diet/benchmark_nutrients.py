@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: nutrient extraction from USDA search responses.
+
+Compares the original name-matching extraction, which formatted values into
+strings and split them back into numbers for the FoodRecognition row, with
+Nutrients.from_search_food, which keys on nutrient ids. Also counts the
+payloads where the two disagree (usually fat read from a fatty-acid entry).
+
+Usage: python benchmark_nutrients.py [recorded.json ...] [--iterations N]
+
+A recorded file holds one USDA ``foods/search`` response (``{"foods": [...]}``)
+or a list of them. Without files, synthetic payloads shaped like SR Legacy
+search results (about 60 nutrients per food) are used.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from fitness_diet.nutrients import Nutrients
+
+# (id, name, unit) in the order the search API lists SR Legacy nutrients
+NUTRIENT_SHAPES = [
+    (1003, 'Protein', 'G'), (1004, 'Total lipid (fat)', 'G'), (1005, 'Carbohydrate, by difference', 'G'),
+    (1007, 'Ash', 'G'), (1008, 'Energy', 'KCAL'), (1062, 'Energy', 'kJ'), (1051, 'Water', 'G'),
+    (1079, 'Fiber, total dietary', 'G'), (2000, 'Sugars, total including NLEA', 'G'),
+] + [(1087 + i, f'Mineral {i}', 'MG') for i in range(12)] + [
+    (1258, 'Fatty acids, total saturated', 'G'), (1292, 'Fatty acids, total monounsaturated', 'G'),
+    (1293, 'Fatty acids, total polyunsaturated', 'G'), (1253, 'Cholesterol', 'MG'),
+] + [(1210 + i, f'Amino acid {i}', 'G') for i in range(18)] + [(1104 + i, f'Vitamin {i}', 'MG') for i in range(14)]
+
+
+def synthetic_responses(n, rng):
+    responses = []
+    for i in range(n):
+        shapes = list(NUTRIENT_SHAPES)
+        rng.shuffle(shapes)
+        responses.append({'foods': [{
+            'fdcId': 100000 + i, 'description': f'Food {i}',
+            'foodNutrients': [{'nutrientId': nid, 'nutrientName': name, 'unitName': unit,
+                               'value': round(rng.uniform(0, 500), 2)} for nid, name, unit in shapes],
+        }]})
+    return responses
+
+
+def load_responses(paths):
+    responses = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        responses.extend(data if isinstance(data, list) else [data])
+    return responses
+
+
+def legacy_extract(data):
+    """food_recognition_page before the nutrients module: names, strings, then split() back to numbers"""
+    calories = protein = carbs = fat = 'Not found'
+    if 'foods' in data and len(data['foods']) > 0:
+        food = data['foods'][0]
+        for nutrient in food.get('foodNutrients', []):
+            nutrient_name = nutrient.get('nutrientName', '')
+            if 'Energy' in nutrient_name and 'kcal' in nutrient.get('unitName', '').lower():
+                calories = f"{nutrient['value']} kcal"
+            elif 'Protein' in nutrient_name:
+                protein = f"{nutrient['value']}g"
+            elif 'Carbohydrate' in nutrient_name:
+                carbs = f"{nutrient['value']}g"
+            elif 'Total lipid' in nutrient_name or 'Fat' in nutrient_name:
+                fat = f"{nutrient['value']}g"
+    return (float(calories.split()[0]) if calories != 'Not found' else 0,
+            float(protein.split('g')[0]) if protein != 'Not found' else None,
+            float(carbs.split('g')[0]) if carbs != 'Not found' else None,
+            float(fat.split('g')[0]) if fat != 'Not found' else None)
+
+
+def typed_extract(data):
+    foods = data.get('foods') or []
+    nutrients = Nutrients.from_search_food(foods[0]) if foods else Nutrients()
+    nutrients.display()  # the page still shows strings
+    return (nutrients.calories or 0, nutrients.protein, nutrients.carbs, nutrients.fat)
+
+
+def per_call_us(fn, payloads, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for payload in payloads:
+            fn(payload)
+    return (time.perf_counter() - start) / (iterations * len(payloads)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('recorded', nargs='*', help="Recorded USDA search responses (JSON)")
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = load_responses(args.recorded) if args.recorded else synthetic_responses(200, random.Random(0))
+    disagreements = sum(legacy_extract(p) != typed_extract(p) for p in payloads)
+    legacy_us = per_call_us(legacy_extract, payloads, args.iterations)
+    typed_us = per_call_us(typed_extract, payloads, args.iterations)
+
+    source = ', '.join(args.recorded) if args.recorded else 'synthetic'
+    print(f"{len(payloads)} payloads ({source})")
+    print(f"{'':<24}{'legacy':>12}{'by id':>12}{'speedup':>10}")
+    print(f"{'extract + persist (us)':<24}{legacy_us:>12.1f}{typed_us:>12.1f}{legacy_us / typed_us:>9.1f}x")
+    print(f"payloads where legacy extraction differs: {disagreements}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: latency of the pickled tree ensembles against the
+flattened engine from ``manage.py export_tree_models``.
+
+Times one prediction call per batch size for the heart, lung and
+calorie-burn models and prints per-call and per-row latency.
+
+Usage: python benchmark_tree_engine.py [repeats]
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from fitness_diet.management.commands.export_tree_models import TREE_MODELS, parity_inputs
+from fitness_diet.model_registry import model_registry
+from fitness_diet.tree_engine import FlatTreeEnsemble
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def best_ms(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main(repeats=5):
+    for name in TREE_MODELS:
+        model = model_registry.get(name)
+        engine = FlatTreeEnsemble.from_model(model)
+        is_classifier = engine.classes_ is not None
+        original = model.predict_proba if is_classifier else model.predict
+        flat = engine.predict_proba if is_classifier else engine.predict
+        X = parity_inputs(engine, max(BATCH_SIZES))
+
+        print(f"\n{name} ({engine.n_trees} trees, {engine.n_nodes} nodes, depth {engine.max_depth})")
+        print(f"{'batch':>8}{'original ms':>14}{'flat ms':>12}{'flat us/row':>14}{'speedup':>10}")
+        for batch_size in BATCH_SIZES:
+            batch = X[:batch_size]
+            original_ms = best_ms(original, batch, repeats)
+            flat_ms = best_ms(flat, batch, repeats)
+            print(f"{batch_size:>8}{original_ms:>14.2f}{flat_ms:>12.2f}"
+                  f"{flat_ms * 1000 / batch_size:>14.1f}{original_ms / flat_ms:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
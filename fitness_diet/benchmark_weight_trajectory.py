@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cost of a weight trajectory against plan length.
+
+Compares scoring each week with its own model call (what calling
+predict_weight_change once per week amounts to) against the single
+batched call made by weight_trajectory.simulate_trajectory.
+
+Usage: python benchmark_weight_trajectory.py [repeats]
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from fitness_diet.linear_engine import get_linear_model
+from fitness_diet.weight_trajectory import simulate_trajectory, trajectory_features
+
+DURATIONS = [4, 12, 26, 52, 104, 260, 520]
+PLAN = {'age': 34, 'gender': 'female', 'current_weight': 82.0, 'target_weight': 74.0,
+        'physical_activity_level': 'very_active'}
+
+
+def per_week_calls(model, duration_weeks):
+    X, _ = trajectory_features(34, 'female', 82.0, 74.0, duration_weeks, 'very_active')
+    return [model.predict(row)[0, 0] / (duration_weeks - k) for k, row in enumerate(X)]
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main(repeats=20):
+    model = get_linear_model()
+    print(f"{'weeks':>6}{'per-week ms':>14}{'batched ms':>13}{'speedup':>10}")
+    for duration_weeks in DURATIONS:
+        plan = dict(PLAN, duration_weeks=duration_weeks)
+        looped_ms = best_ms(lambda: per_week_calls(model, duration_weeks), repeats)
+        batched_ms = best_ms(lambda: simulate_trajectory(model, plan), repeats)
+        print(f"{duration_weeks:>6}{looped_ms:>14.3f}{batched_ms:>13.3f}{looped_ms / batched_ms:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
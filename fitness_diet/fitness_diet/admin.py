@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db.models import Count
+
+from .models import FoodRecognition, UsdaSearchResult
+from .usda_cache import usda_cache
+
+
+def most_common_foods(queryset, limit):
+    """The ``limit`` most frequent ``recognized_food`` values in ``queryset``."""
+    rows = (queryset.order_by().values('recognized_food').annotate(n=Count('id'))
+            .order_by('-n', 'recognized_food')[:limit])
+    return [row['recognized_food'] for row in rows]
+
+
+@admin.register(FoodRecognition)
+class FoodRecognitionAdmin(admin.ModelAdmin):
+    list_display = ('recognized_food', 'calories', 'user', 'created_at')
+    search_fields = ('recognized_food',)
+    actions = ['warm_usda_cache']
+
+    @admin.action(description="Pre-warm the USDA search cache with the most common foods")
+    def warm_usda_cache(self, request, queryset):
+        foods = most_common_foods(queryset, getattr(settings, 'USDA_CACHE_WARM_LABELS', 50))
+        counts = usda_cache().warm(foods)
+        self.message_user(request, f"{counts['queued']} of {len(foods)} foods queued for a USDA search; "
+                                   f"{counts['fresh']} already cached.", messages.SUCCESS)
+
+
+@admin.register(UsdaSearchResult)
+class UsdaSearchResultAdmin(admin.ModelAdmin):
+    list_display = ('query', 'found', 'fetched_at')
+    search_fields = ('query',)
+
+    @admin.display(boolean=True)
+    def found(self, obj):
+        return obj.result is not None
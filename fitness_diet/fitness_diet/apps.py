@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class FitnessDietConfig(AppConfig):
+    name = 'fitness_diet'
+
+    def ready(self):
+        # Keep the food search and swap indexes and the diet plan catalog in sync with FoodDatabase
+        from . import food_catalog, food_search, food_swaps  # noqa: F401
@@ -0,0 +1,16 @@
+"""
+Helpers shared by the streaming bulk imports (``manage.py import_fdc`` and
+``manage.py import_foods``).
+"""
+
+
+def chunks(rows, size):
+    """Lists of up to ``size`` items from an iterator, so only one chunk is in memory at a time"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,290 @@
+"""
+Local USDA FoodData Central nutrient store.
+
+``manage.py import_fdc`` streams an FDC download (the CSV directory or zip,
+or a JSON export) into the ``FdcFood`` / ``FdcNutrient`` /
+``FdcFoodNutrient`` tables. :func:`lookup_nutrition` then answers the food
+recognition views from those indexed tables. A label the store does not
+know is looked up on ``api.nal.usda.gov`` instead, through the pooled
+:mod:`http_client`, while ``settings.USDA_REMOTE_FALLBACK`` is on; those
+answers are cached by :mod:`usda_cache`.
+
+Amounts are per 100 g, as in FDC.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import zipfile
+
+from django.conf import settings
+
+from .http_client import http_client
+from .nutrients import CARBS_ID, ENERGY_IDS, FAT_ID, PROTEIN_ID, Nutrients
+
+USDA_SEARCH_URL = 'https://api.nal.usda.gov/fdc/v1/foods/search'
+
+# Imported by default; ``import_fdc --nutrients all`` keeps every nutrient
+DEFAULT_NUTRIENT_IDS = frozenset(ENERGY_IDS + (PROTEIN_ID, FAT_ID, CARBS_ID, 1079, 2000, 1063, 1093, 1253, 1258))
+
+# CSV ``data_type`` values; JSON ``dataType`` values are mapped onto them
+DATA_TYPE_PRIORITY = {
+    'foundation_food': 0,
+    'sr_legacy_food': 1,
+    'survey_fndds_food': 2,
+    'branded_food': 3,
+}
+JSON_DATA_TYPES = {
+    'Foundation': 'foundation_food',
+    'SR Legacy': 'sr_legacy_food',
+    'Survey (FNDDS)': 'survey_fndds_food',
+    'Branded': 'branded_food',
+}
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def search_name(text):
+    """``'Pie, apple'`` -> ``'pie apple'``; Food-101 labels like ``'apple_pie'`` -> ``'apple pie'``"""
+    return _NON_WORD.sub(' ', str(text).lower()).strip()
+
+
+def food_row(fdc_id, description, data_type, category=''):
+    """Field values of one ``FdcFood``, from either dump format."""
+    data_type = JSON_DATA_TYPES.get(data_type, data_type)
+    return {
+        'fdc_id': int(fdc_id),
+        'description': description[:500],
+        'search_name': search_name(description)[:500],
+        'data_type': data_type,
+        'priority': DATA_TYPE_PRIORITY.get(data_type, 9),
+        'category': (category or '')[:200],
+    }
+
+
+class FdcCsvDump:
+    """
+    The FDC "Full Download" CSV files (``food.csv``, ``nutrient.csv``,
+    ``food_nutrient.csv``, ``food_category.csv``) in a directory or zip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def _open(self, filename):
+        if self._zip is None:
+            return open(os.path.join(self.path, filename), newline='', encoding='utf-8')
+        member = next((n for n in self._zip.namelist() if n.rsplit('/', 1)[-1] == filename), None)
+        if member is None:
+            raise FileNotFoundError(f"{filename} not found in {self.path}")
+        return io.TextIOWrapper(self._zip.open(member), newline='', encoding='utf-8')
+
+    def _rows(self, filename):
+        with self._open(filename) as f:
+            yield from csv.DictReader(f)
+
+    def nutrients(self):
+        for row in self._rows('nutrient.csv'):
+            yield int(row['id']), row['name'], row['unit_name']
+
+    def foods(self):
+        try:
+            categories = {row['id']: row['description'] for row in self._rows('food_category.csv')}
+        except FileNotFoundError:
+            categories = {}
+        for row in self._rows('food.csv'):
+            yield food_row(row['fdc_id'], row['description'], row['data_type'],
+                           categories.get(row.get('food_category_id', ''), ''))
+
+    def food_nutrients(self):
+        for row in self._rows('food_nutrient.csv'):
+            if row.get('amount') not in (None, ''):
+                yield int(row['fdc_id']), int(row['nutrient_id']), float(row['amount'])
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """
+    Yield the elements of the first JSON array in ``f`` one at a time,
+    holding only the current element and one read chunk in memory. FDC's
+    JSON exports are a single object such as ``{"FoundationFoods": [...]}``.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        data = f.read(chunk_size)
+        eof = not data
+        buffer = buffer[pos:] + data
+        pos = 0
+
+    while True:
+        start = buffer.find('[', pos)
+        if start >= 0:
+            pos = start + 1
+            break
+        if eof:
+            return
+        fill()
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("JSON array is not terminated")
+            fill()
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A number at the end of the buffer may continue in the next chunk
+            fill()
+            continue
+        pos = end
+        yield element
+
+
+class FdcJsonDump:
+    """An FDC JSON export (Foundation, SR Legacy, FNDDS or Branded), read as a stream."""
+
+    def __init__(self, path):
+        self.path = path
+        self._nutrients = {}
+
+    def records(self):
+        """``(food fields, [(nutrient_id, amount)])`` per food; nutrient definitions are collected on the way."""
+        if zipfile.is_zipfile(self.path):
+            with zipfile.ZipFile(self.path) as archive:
+                name = next(n for n in archive.namelist() if n.endswith('.json'))
+                with io.TextIOWrapper(archive.open(name), encoding='utf-8') as f:
+                    yield from self._parse(f)
+        else:
+            with open(self.path, encoding='utf-8') as f:
+                yield from self._parse(f)
+
+    def _parse(self, f):
+        for food in iter_json_array(f):
+            category = food.get('foodCategory') or food.get('wweiaFoodCategory') or {}
+            if isinstance(category, dict):
+                category = category.get('description') or category.get('wweiaFoodCategoryDescription') or ''
+            category = category or food.get('brandedFoodCategory', '')
+            amounts = []
+            for entry in food.get('foodNutrients', []):
+                nutrient = entry.get('nutrient') or {}
+                if 'id' not in nutrient or entry.get('amount') is None:
+                    continue
+                self._nutrients[nutrient['id']] = (nutrient.get('name', ''), nutrient.get('unitName', ''))
+                amounts.append((int(nutrient['id']), float(entry['amount'])))
+            yield food_row(food['fdcId'], food.get('description', ''), food.get('dataType', ''), category), amounts
+
+    def nutrients(self):
+        """Nutrient definitions seen so far by :meth:`records`."""
+        for nutrient_id, (name, unit_name) in self._nutrients.items():
+            yield nutrient_id, name, unit_name
+
+
+def find_food(query):
+    """
+    Best local ``FdcFood`` for a label, or ``None``.
+
+    Tries, in order, an exact name match, then names starting with the
+    label, then names containing every word of it. Within each step,
+    foundation and SR legacy foods win over survey and branded ones. The
+    first two steps are range scans on ``fdc_food_search_idx``.
+    """
+    from .models import FdcFood
+
+    name = search_name(query)
+    if not name:
+        return None
+    foods = FdcFood.objects.only('fdc_id', 'description').order_by('priority', 'fdc_id')
+    food = foods.filter(search_name=name).first()
+    if food is None:
+        # Index-friendly prefix match (LIKE 'x%' cannot use the index on SQLite)
+        food = foods.filter(search_name__gte=name, search_name__lt=name + '\uffff').order_by(
+            'priority', 'search_name').first()
+    if food is None:
+        words = foods
+        for word in name.split():
+            words = words.filter(search_name__contains=word)
+        food = words.first()
+    return food
+
+
+def _local_nutrition(food):
+    from .models import FdcFoodNutrient
+
+    amounts = dict(FdcFoodNutrient.objects.filter(food_id=food.fdc_id).values_list('nutrient_id', 'amount'))
+    return Nutrients.from_amounts(amounts, food.fdc_id, food.description, 'local')
+
+
+def lookup_local(query):
+    food = find_food(query)
+    return _local_nutrition(food) if food is not None else None
+
+
+def lookup_fdc_id(fdc_id):
+    """:class:`Nutrients` of one local food by its FDC id, or ``None``."""
+    from .models import FdcFood
+
+    food = FdcFood.objects.only('fdc_id', 'description').filter(fdc_id=fdc_id).first()
+    return _local_nutrition(food) if food is not None else None
+
+
+def search_remote(query):
+    """
+    Search ``api.nal.usda.gov`` for ``query``.
+
+    Returns:
+        Nutrients | None: The best match, ``None`` if there is none.
+
+    Raises:
+        requests.RequestException, ValueError: If the request fails, or the
+            circuit of the shared ``usda`` client is open.
+    """
+    response = http_client('usda').get(
+        getattr(settings, 'USDA_API_URL', USDA_SEARCH_URL),
+        params={'query': query, 'pageSize': 1, 'api_key': getattr(settings, 'USDA_API_KEY', '')},
+        timeout=getattr(settings, 'USDA_API_TIMEOUT', 5.0),
+    )
+    response.raise_for_status()
+    foods = response.json().get('foods') or []
+    if not foods:
+        return None
+
+    return Nutrients.from_search_food(foods[0])
+
+
+def lookup_remote(query):
+    """:func:`search_remote` through the persistent USDA cache; ``None`` when it fails or finds nothing."""
+    from .usda_cache import usda_cache
+
+    return usda_cache().get(query)
+
+
+def lookup_nutrition(query, remote=None):
+    """
+    Calories, protein, carbs and fat per 100 g for a food label.
+
+    Returns a :class:`~fitness_diet.nutrients.Nutrients` record, or ``None``
+    when neither the local store nor, if enabled, the USDA API knows the
+    food. ``remote`` overrides ``settings.USDA_REMOTE_FALLBACK``.
+    """
+    if getattr(settings, 'USDA_LOCAL_STORE', True):
+        result = lookup_local(query)
+        if result is not None:
+            return result
+    if remote is None:
+        remote = getattr(settings, 'USDA_REMOTE_FALLBACK', True)
+    return lookup_remote(query) if remote else None
@@ -0,0 +1,133 @@
+"""
+Precompiled feature encoders for the tabular health models.
+
+An encoder is compiled once from the feature order in the model's bundle
+manifest into column indices and one-hot lookup tables, so turning a JSON payload into
+a model row is a handful of dict lookups and array stores instead of
+building intermediate dicts per request.
+"""
+
+import threading
+
+import numpy as np
+
+from .model_bundle import bundle_manifest_name
+from .model_registry import model_registry
+from .tree_engine import FlatTreeEnsemble
+
+HEART_MODEL = 'heart_disease/heart_model.pkl'
+
+
+class HeartFeatureEncoder:
+    """
+    Maps heart-disease JSON fields straight into the model's column order.
+
+    Args:
+        feature_names (list[str]): Column order from the heart model's bundle manifest.
+    """
+
+    # (column, JSON field, default, cast)
+    NUMERIC = [
+        ('Age', 'age', 50, float),
+        ('RestingBP', 'resting_bp', 120, float),
+        ('Cholesterol', 'cholesterol', 200, float),
+        ('FastingBS', 'fasting_bs', 0, int),
+        ('MaxHR', 'max_hr', 150, float),
+        ('Oldpeak', 'oldpeak', 1.0, float),
+    ]
+    # (JSON field, default, cast, {raw value: one-hot column})
+    CATEGORICAL = [
+        ('sex', 1, int, {0: 'Sex_F', 1: 'Sex_M'}),
+        ('chest_pain_type', 'ASY', None, {
+            'ASY': 'ChestPainType_ASY', 'ATA': 'ChestPainType_ATA',
+            'NAP': 'ChestPainType_NAP', 'TA': 'ChestPainType_TA',
+        }),
+        ('resting_ecg', 'Normal', None, {
+            'Normal': 'RestingECG_Normal', 'LVH': 'RestingECG_LVH', 'ST': 'RestingECG_ST',
+        }),
+        ('exercise_angina', 0, int, {0: 'ExerciseAngina_N', 1: 'ExerciseAngina_Y'}),
+        ('st_slope', 'Flat', None, {
+            'Flat': 'ST_Slope_Flat', 'Up': 'ST_Slope_Up', 'Down': 'ST_Slope_Down',
+        }),
+    ]
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        column = {name: i for i, name in enumerate(self.feature_names)}
+        self.n_features = len(self.feature_names)
+        self._numeric = [(column[name], field, default, cast) for name, field, default, cast in self.NUMERIC]
+        self._categorical = [
+            (field, default, cast, {value: column[name] for value, name in mapping.items()})
+            for field, default, cast, mapping in self.CATEGORICAL
+        ]
+        self._local = threading.local()
+
+    def _fill(self, row, data):
+        row.fill(0.0)
+        for index, field, default, cast in self._numeric:
+            row[index] = cast(data.get(field, default))
+        for field, default, cast, lookup in self._categorical:
+            value = data.get(field, default)
+            if cast is not None:
+                value = cast(value)
+            # Unknown categories leave every column of the group at 0
+            index = lookup.get(value)
+            if index is not None:
+                row[index] = 1.0
+        return row
+
+    def encode_row(self, data):
+        """
+        Encode one payload into a ``(1, n_features)`` matrix.
+
+        The matrix is a per-thread buffer reused by the next call on the
+        same thread, so consume it before encoding again.
+        """
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = np.zeros((1, self.n_features))
+        self._fill(buffer[0], data)
+        return buffer
+
+    def encode_batch(self, records):
+        """Encode many payloads into a fresh ``(len(records), n_features)`` matrix."""
+        X = np.empty((len(records), self.n_features))
+        for row, data in zip(X, records):
+            self._fill(row, data)
+        return X
+
+
+def predict_with_proba(model, X):
+    """
+    Run the classifier once and derive both labels and class probabilities.
+
+    Equivalent to calling ``predict`` and ``predict_proba`` for estimators
+    whose ``predict`` is the arg-max of ``predict_proba`` (e.g. forests).
+    """
+    proba = model.predict_proba(X)
+    return model.classes_[proba.argmax(axis=1)], proba
+
+
+_heart_encoders = {}
+
+
+def get_heart_encoder():
+    """
+    Heart encoder for the feature order in the heart model's bundle manifest,
+    compiled once per bundle version.
+
+    Raises:
+        FileNotFoundError: If the heart model has no bundle, or its manifest
+            records no feature order.
+    """
+    name = bundle_manifest_name(HEART_MODEL)
+    engine = model_registry.get(name, loader=FlatTreeEnsemble.load)
+    if engine.feature_names is None:
+        raise FileNotFoundError(f"{name} records no feature order; re-run export_tree_models")
+    version = model_registry.version(name)
+    encoder = _heart_encoders.get(version)
+    if encoder is None:
+        encoder = HeartFeatureEncoder(engine.feature_names)
+        _heart_encoders.clear()
+        _heart_encoders[version] = encoder
+    return encoder
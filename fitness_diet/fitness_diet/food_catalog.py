@@ -0,0 +1,176 @@
+"""
+Read-only, columnar food catalog for the rule-based diet plan generator.
+
+:class:`FoodCatalog` keeps every food as one row index into parallel NumPy
+columns (calories and the ``NUTRIENTS``) plus a name array, instead of a
+pandas DataFrame rebuilt on every request. The foods of each diet type
+(``DIET_TYPES``) are precomputed as a boolean mask and as an index array
+ordered by calories, so a meal is picked and summed with fancy indexing
+and no per-row lookups.
+
+:func:`catalog` builds it once per process from ``FoodDatabase`` (filled by
+``manage.py import_foods``), or from the built-in ``SAMPLE_FOODS`` while
+that table is empty. ``FoodDatabase`` only has calories and macros: its
+other nutrients are 0. The cached catalog is dropped when this process
+saves or deletes a food or runs ``import_foods`` (:func:`invalidate`).
+Other processes are not notified: after an import from the command line,
+every server worker keeps its catalog until it is ``FOOD_CATALOG_MAX_AGE``
+seconds old.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FoodDatabase
+
+NUTRIENTS = ('protein_g', 'carbs_g', 'fats_g', 'fiber_g', 'sugar_g', 'sodium_mg', 'potassium_mg', 'calcium_mg',
+             'iron_mg', 'vitamin_c_mg', 'vitamin_a_iu', 'cholesterol_mg', 'saturated_fat_g', 'trans_fat_g')
+
+# Foods each diet type draws from, as a mask over the raw columns (an unknown value is NaN and never matches)
+DIET_TYPES = {
+    'balanced': lambda columns: np.ones(len(columns['calories']), dtype=bool),
+    'protein_rich': lambda columns: columns['protein_g'] > 15,
+    'low_carb': lambda columns: columns['carbs_g'] < 20,
+}
+DEFAULT_DIET_TYPE = 'balanced'
+
+# FoodDatabase fields behind the catalog columns
+_DATABASE_COLUMNS = {'food_name': 'name', 'calories': 'calories', 'protein_g': 'protein', 'carbs_g': 'carbs',
+                     'fats_g': 'fat'}
+
+# Used while FoodDatabase is empty
+SAMPLE_FOODS = {
+    'food_name': [
+        'Chicken Breast', 'Brown Rice', 'Broccoli', 'Sweet Potato', 'Greek Yogurt',
+        'Salmon', 'Quinoa', 'Spinach', 'Banana', 'Almonds',
+        'Eggs', 'Oats', 'Avocado', 'Blueberries', 'Cottage Cheese',
+        'Turkey', 'Lentils', 'Kale', 'Apple', 'Walnuts'
+    ],
+    'calories': [165, 123, 34, 86, 100, 208, 120, 23, 89, 164, 155, 68, 234, 57, 98, 135, 116, 33, 52, 185],
+    'protein_g': [31, 2.6, 2.8, 2, 17, 25, 4.4, 2.9, 1.1, 6, 13, 2.4, 2.9, 0.7, 11, 30, 9, 2.9, 0.3, 4.3],
+    'carbs_g': [0, 26, 7, 20, 6, 0, 22, 4, 23, 6, 1, 12, 12, 14, 3, 0, 20, 7, 14, 4],
+    'fats_g': [3.6, 1, 0.4, 0.1, 0, 12, 1.9, 0.4, 0.3, 14, 11, 1.4, 21, 0.3, 4, 1, 0.4, 0.5, 0.2, 18],
+    'fiber_g': [0, 1.8, 2.6, 3, 0, 0, 3, 2.2, 2.6, 3.5, 0, 1.7, 10, 2.4, 0, 0, 8, 2.6, 2.4, 2],
+    'sugar_g': [0, 0.4, 1.7, 4.2, 4, 0, 0, 0.4, 12, 1.2, 1.1, 0.5, 0.3, 10, 3, 0, 2, 0.9, 10, 0.7],
+    'sodium_mg': [74, 1, 33, 55, 36, 59, 7, 79, 1, 1, 124, 2, 10, 1, 364, 99, 2, 43, 1, 1],
+    'potassium_mg': [256, 43, 316, 337, 141, 490, 172, 558, 358, 208, 126, 61, 485, 77, 104, 239, 369, 447, 107, 125],
+    'calcium_mg': [15, 10, 47, 30, 110, 12, 17, 99, 5, 76, 56, 8, 12, 6, 83, 8, 19, 135, 6, 28],
+    'iron_mg': [0.9, 0.4, 0.7, 0.6, 0.1, 0.8, 1.5, 2.7, 0.3, 1.0, 1.8, 0.8, 0.6, 0.3, 0.1, 1.4, 3.3, 1.7, 0.1, 0.8],
+    'vitamin_c_mg': [0, 0, 89, 2.4, 0, 0, 0, 28, 8.7, 0, 0, 0, 10, 9.7, 0, 0, 4.4, 120, 4.6, 0.4],
+    'vitamin_a_iu': [0, 0, 623, 14187, 0, 26, 0, 9377, 64, 0, 540, 0, 146, 54, 37, 0, 68, 10302, 54, 0],
+    'cholesterol_mg': [85, 0, 0, 0, 0, 55, 0, 0, 0, 0, 373, 0, 0, 0, 17, 84, 0, 0, 0, 0],
+    'saturated_fat_g': [1, 0.2, 0.1, 0, 0, 3, 0.2, 0.1, 0.1, 1.1, 3.3, 0.3, 3, 0, 2.6, 0.2, 0.1, 0.1, 0, 1.7],
+    'trans_fat_g': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+}
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+class FoodCatalog:
+    """
+    Immutable struct-of-arrays food catalog: row ``i`` of every column is one food.
+
+    Args:
+        columns (dict): ``food_name`` and ``calories`` sequences, plus any
+            of ``NUTRIENTS``; ``None`` marks an unknown value, a missing
+            nutrient column is unknown for every food. Unknown nutrients
+            count as 0 but never match a diet type's filter.
+    """
+
+    __slots__ = ('names', 'calories', 'nutrients', 'masks', '_diet_indices', 'loaded_at')
+
+    def __init__(self, columns):
+        self.names = _read_only(np.array(columns['food_name'], dtype=object))
+        n = len(self.names)
+        raw = {'calories': np.array(columns['calories'], dtype=np.float64)}
+        for nutrient in NUTRIENTS:
+            # float64 arrays read None as NaN
+            raw[nutrient] = np.array(columns[nutrient], dtype=np.float64) if nutrient in columns else np.full(n, np.nan)
+        self.calories = _read_only(raw['calories'].astype(np.int64))
+        self.nutrients = {nutrient: _read_only(np.nan_to_num(raw[nutrient])) for nutrient in NUTRIENTS}
+        self.masks = {diet_type: _read_only(np.asarray(matches(raw))) for diet_type, matches in DIET_TYPES.items()}
+
+        by_calories = np.argsort(self.calories, kind='stable')
+        self._diet_indices = {diet_type: _read_only(by_calories[mask[by_calories]])
+                              for diet_type, mask in self.masks.items()}
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_database(cls):
+        """The catalog of every ``FoodDatabase`` food, or ``None`` while there is none."""
+        fields = list(_DATABASE_COLUMNS.values())
+        rows = list(FoodDatabase.objects.order_by('id').values_list(*fields).iterator(chunk_size=10000))
+        if not rows:
+            return None
+        return cls(dict(zip(_DATABASE_COLUMNS, zip(*rows))))
+
+    def __len__(self):
+        return len(self.names)
+
+    def diet_indices(self, diet_type):
+        """Row indices of the foods of a diet type (unknown types: ``balanced``), lowest calories first."""
+        return self._diet_indices.get(diet_type, self._diet_indices[DEFAULT_DIET_TYPE])
+
+    def food(self, index):
+        """One food as ``{'name', 'calories', 'nutrients'}``."""
+        return {
+            'name': self.names[index],
+            'calories': int(self.calories[index]),
+            'nutrients': {nutrient: float(column[index]) for nutrient, column in self.nutrients.items()},
+        }
+
+    def totals(self, indices):
+        """Summed ``NUTRIENTS`` of the foods at ``indices``."""
+        return {nutrient: float(column[indices].sum()) for nutrient, column in self.nutrients.items()}
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+# Bumped by invalidate(): a load that started before a change is returned but not kept
+_generation = 0
+
+
+def _stale(current):
+    max_age = getattr(settings, 'FOOD_CATALOG_MAX_AGE', 600.0)
+    return current is None or bool(max_age and time.monotonic() - current.loaded_at > max_age)
+
+
+def catalog():
+    """The process-wide food catalog, loaded on first use and again once invalidated or too old."""
+    global _catalog
+    current = _catalog
+    if _stale(current):
+        with _catalog_lock:
+            current = _catalog
+            if _stale(current):
+                generation = _generation
+                current = FoodCatalog.from_database() or FoodCatalog(SAMPLE_FOODS)
+                if generation == _generation:
+                    _catalog = current
+    return current
+
+
+def invalidate():
+    """Drop this process's catalog (other processes keep theirs); the next :func:`catalog` call reloads it."""
+    global _catalog, _generation
+    _generation += 1
+    _catalog = None
+
+
+@receiver(post_save, sender=FoodDatabase)
+def _food_saved(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate()
+
+
+@receiver(post_delete, sender=FoodDatabase)
+def _food_deleted(sender, **kwargs):
+    invalidate()
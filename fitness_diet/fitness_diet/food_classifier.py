@@ -0,0 +1,106 @@
+"""
+Shared Hugging Face food classifier.
+
+The image-classification pipeline is built once per worker on first use
+(or during gunicorn's worker boot when FOOD_CLASSIFIER_WARMUP is on) and
+reused by every food recognition request. When FOOD_INFERENCE_SOCKET is
+set, images are sent to the batching sidecar in ``inference_server``
+instead, so the weights live in a single process.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .metrics import model_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class FoodClassifier:
+    """
+    Lazily constructed, thread-safe wrapper around ``transformers.pipeline``.
+
+    Args:
+        model (str): Hub model id or path to a local model directory.
+            Defaults to ``settings.FOOD_CLASSIFIER_MODEL``.
+    """
+
+    def __init__(self, model=None):
+        self._model = model
+        self._pipeline = None
+        self._client = None
+        self._lock = threading.Lock()
+        self.build_seconds = None
+
+    @property
+    def model_name(self):
+        return self._model or getattr(settings, 'FOOD_CLASSIFIER_MODEL', 'nateraw/food')
+
+    @property
+    def is_loaded(self):
+        return self._pipeline is not None
+
+    def get_pipeline(self):
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    self._pipeline = self._build()
+        return self._pipeline
+
+    def _build(self):
+        from transformers import pipeline
+        import torch
+
+        # Load model with GPU if available
+        device = 0 if torch.cuda.is_available() else -1
+        start = time.perf_counter()
+        classifier = pipeline('image-classification', model=self.model_name, device=device)
+        self.build_seconds = time.perf_counter() - start
+        logger.info("Built food classifier %s in %.2fs", self.model_name, self.build_seconds)
+        return classifier
+
+    def get_client(self):
+        """Client for the inference sidecar, or ``None`` when no socket is configured."""
+        socket_path = getattr(settings, 'FOOD_INFERENCE_SOCKET', '')
+        if not socket_path:
+            return None
+        if self._client is None or self._client.socket_path != socket_path:
+            from .inference_server import InferenceClient
+            self._client = InferenceClient(socket_path, timeout=getattr(settings, 'FOOD_INFERENCE_TIMEOUT', 30.0),
+                                           max_side=getattr(settings, 'FOOD_INFERENCE_MAX_SIDE', 448))
+        return self._client
+
+    def classify(self, image, top_k=1):
+        """Return the pipeline's ``[{'label': ..., 'score': ...}]`` list for a PIL image."""
+        client = self.get_client()
+        if client is not None:
+            try:
+                return client.classify(image, top_k=top_k)
+            except OSError as e:
+                logger.warning("Inference sidecar unavailable (%s), classifying in-process", e)
+        return self.get_pipeline()(image, top_k=top_k)
+
+    def warm_up(self):
+        """Build the pipeline and run one forward pass so the first request is not slow."""
+        from PIL import Image
+
+        self.get_pipeline()(Image.new('RGB', (224, 224)), top_k=1)
+
+    def versions(self):
+        """``[(model, revision)]`` of the weights serving requests, for metrics; empty before the first build."""
+        if self.get_client() is not None:
+            return [(self.model_name, 'sidecar')]
+        if self._pipeline is None:
+            return []
+        return [(self.model_name, getattr(self._pipeline.model.config, '_commit_hash', None) or 'local')]
+
+    def reset(self):
+        with self._lock:
+            self._pipeline = None
+
+
+food_classifier = FoodClassifier()
+food_metrics = model_metrics('food_vit', versions=food_classifier.versions)
@@ -0,0 +1,145 @@
+"""
+Reading and validating food catalog files for ``manage.py import_foods``.
+
+A catalog file is a CSV with a header row, a JSON array of objects (or an
+object holding one, e.g. ``{"foods": [...]}``), or JSON Lines (``.jsonl`` /
+``.ndjson``, one object per line). Every format is read as a stream, one row
+at a time, so file size is not limited by memory.
+
+Column names are matched case-insensitively, with the aliases in
+``FIELD_ALIASES``: the 20-food ``food_catalog.SAMPLE_FOODS``
+(``food_name``, ``protein_g``, ``fats_g``...) imports as is.
+:func:`validate_row` turns one row into ``FoodDatabase`` field values or
+raises :class:`InvalidRow` saying why it was rejected.
+"""
+
+import csv
+import json
+import math
+import re
+
+from .fdc_store import iter_json_array
+from .models import FoodDatabase
+
+FIELD_ALIASES = {
+    'name': ('name', 'food_name', 'food', 'description'),
+    'calories': ('calories', 'kcal', 'energy_kcal', 'energy'),
+    'protein': ('protein', 'protein_g'),
+    'carbs': ('carbs', 'carbs_g', 'carbohydrates', 'carbohydrate_g'),
+    'fat': ('fat', 'fats', 'fat_g', 'fats_g', 'total_fat'),
+    'category': ('category', 'diet_category'),
+    'is_healthy': ('is_healthy', 'healthy'),
+}
+# Upper bounds of a plausible food (per serving); larger values are data errors
+MAX_CALORIES = 10000
+MAX_GRAMS = 1000
+
+NAME_MAX_LENGTH = FoodDatabase._meta.get_field('name').max_length
+CATEGORIES = {value for value, _ in FoodDatabase._meta.get_field('category').choices}
+FIELDS = ('name', 'calories', 'protein', 'carbs', 'fat', 'category', 'is_healthy')
+
+_SPACE = re.compile(r'\s+')
+_TRUE = {'true', '1', 'yes', 'y'}
+_FALSE = {'false', '0', 'no', 'n'}
+
+
+class InvalidRow(ValueError):
+    """A catalog row that cannot become a FoodDatabase food."""
+
+
+def read_rows(path):
+    """
+    Yield ``(line, row)`` per food in a catalog file; ``line`` is the CSV or
+    JSON Lines line number, or the position in a JSON array.
+    """
+    lower = path.lower()
+    if lower.endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line, text in enumerate(f, 1):
+                if text.strip():
+                    try:
+                        yield line, json.loads(text)
+                    except json.JSONDecodeError as e:
+                        yield line, InvalidRow(f"invalid JSON: {e.msg}")
+    elif lower.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            yield from enumerate(iter_json_array(f), 1)
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _lookup(row, field):
+    for alias in FIELD_ALIASES[field]:
+        if alias in row:
+            return row[alias]
+    return None
+
+
+def _number(row, field, required=False, maximum=MAX_GRAMS):
+    value = _lookup(row, field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise InvalidRow(f"missing {field}")
+        return None
+    if isinstance(value, bool):
+        raise InvalidRow(f"{field} is not a number: {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidRow(f"{field} is not a number: {value!r}")
+    if not math.isfinite(number) or not 0 <= number <= maximum:
+        raise InvalidRow(f"{field} out of range: {value!r}")
+    return number
+
+
+def category_value(value):
+    """``'High Protein'`` / ``'high-protein'`` -> ``'high_protein'``; ``''`` for a category FoodDatabase lacks"""
+    value = _SPACE.sub('_', str(value or '').strip().lower().replace('-', ' '))
+    return value if value in CATEGORIES else ''
+
+
+def validate_row(row):
+    """
+    ``FoodDatabase`` field values of one catalog row.
+
+    Names are stripped with inner whitespace collapsed, calories rounded to
+    whole kcal, an unknown category stored as blank, and ``is_healthy``
+    defaults to True.
+
+    Raises:
+        InvalidRow: Missing name or calories, a value that is not a number
+            or out of range, a name too long, or a row that is not an object.
+    """
+    if isinstance(row, InvalidRow):
+        raise row
+    if not isinstance(row, dict):
+        raise InvalidRow("not an object")
+    row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+
+    name = _SPACE.sub(' ', str(_lookup(row, 'name') or '')).strip()
+    if not name:
+        raise InvalidRow("missing name")
+    if len(name) > NAME_MAX_LENGTH:
+        raise InvalidRow(f"name longer than {NAME_MAX_LENGTH} characters")
+
+    healthy = _lookup(row, 'is_healthy')
+    if healthy is None or healthy == '':
+        healthy = True
+    elif not isinstance(healthy, bool):
+        text = str(healthy).strip().lower()
+        if text not in _TRUE | _FALSE:
+            raise InvalidRow(f"is_healthy is not a boolean: {healthy!r}")
+        healthy = text in _TRUE
+
+    return {
+        'name': name,
+        'calories': int(round(_number(row, 'calories', required=True, maximum=MAX_CALORIES))),
+        'protein': _number(row, 'protein'),
+        'carbs': _number(row, 'carbs'),
+        'fat': _number(row, 'fat'),
+        'category': category_value(_lookup(row, 'category')),
+        'is_healthy': healthy,
+    }
@@ -0,0 +1,161 @@
+"""
+Nutrition for every label the food classifier can emit, resolved offline.
+
+``nateraw/food`` is a Food-101 model, so it only ever predicts one of 101
+labels. ``manage.py build_food_label_map`` resolves each label to a
+nutrient record once, through the local FDC store (and optionally the
+USDA API), and writes ``ml_models/food_recognition/food101_nutrition.json``.
+The model registry loads that file into a dict on first use (or at
+preload) and reloads it when it is rebuilt, so recognising a food is a
+classifier call plus a dict lookup. Labels missing from the map fall back
+to :func:`fdc_store.lookup_nutrition`; :func:`nutrition_for_labels` runs
+those fallbacks for several candidates concurrently.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .fdc_store import lookup_fdc_id, lookup_nutrition, search_name
+from .model_registry import model_registry
+from .nutrients import Nutrients
+
+FORMAT_VERSION = 1
+LABEL_MAP = 'food_recognition/food101_nutrition.json'
+
+FOOD101_LABELS = (
+    'apple_pie', 'baby_back_ribs', 'baklava', 'beef_carpaccio', 'beef_tartare', 'beet_salad', 'beignets',
+    'bibimbap', 'bread_pudding', 'breakfast_burrito', 'bruschetta', 'caesar_salad', 'cannoli',
+    'caprese_salad', 'carrot_cake', 'ceviche', 'cheese_plate', 'cheesecake', 'chicken_curry',
+    'chicken_quesadilla', 'chicken_wings', 'chocolate_cake', 'chocolate_mousse', 'churros', 'clam_chowder',
+    'club_sandwich', 'crab_cakes', 'creme_brulee', 'croque_madame', 'cup_cakes', 'deviled_eggs', 'donuts',
+    'dumplings', 'edamame', 'eggs_benedict', 'escargots', 'falafel', 'filet_mignon', 'fish_and_chips',
+    'foie_gras', 'french_fries', 'french_onion_soup', 'french_toast', 'fried_calamari', 'fried_rice',
+    'frozen_yogurt', 'garlic_bread', 'gnocchi', 'greek_salad', 'grilled_cheese_sandwich', 'grilled_salmon',
+    'guacamole', 'gyoza', 'hamburger', 'hot_and_sour_soup', 'hot_dog', 'huevos_rancheros', 'hummus',
+    'ice_cream', 'lasagna', 'lobster_bisque', 'lobster_roll_sandwich', 'macaroni_and_cheese', 'macarons',
+    'miso_soup', 'mussels', 'nachos', 'omelette', 'onion_rings', 'oysters', 'pad_thai', 'paella',
+    'pancakes', 'panna_cotta', 'peking_duck', 'pho', 'pizza', 'pork_chop', 'poutine', 'prime_rib',
+    'pulled_pork_sandwich', 'ramen', 'ravioli', 'red_velvet_cake', 'risotto', 'samosa', 'sashimi',
+    'scallops', 'seaweed_salad', 'shrimp_and_grits', 'spaghetti_bolognese', 'spaghetti_carbonara',
+    'spring_rolls', 'steak', 'strawberry_shortcake', 'sushi', 'tacos', 'takoyaki', 'tiramisu',
+    'tuna_tartare', 'waffles',
+)
+
+
+def label_key(label):
+    """``'Apple Pie'`` / ``'apple_pie'`` -> ``'apple_pie'``"""
+    return search_name(label).replace(' ', '_')
+
+
+def classifier_labels(model_name):
+    """The labels in the model's config, or the Food-101 classes if it cannot be read."""
+    try:
+        from transformers import AutoConfig
+
+        labels = list(AutoConfig.from_pretrained(model_name).id2label.values())
+    except Exception:
+        return list(FOOD101_LABELS)
+    return labels or list(FOOD101_LABELS)
+
+
+def build_label_map(labels, overrides=None, remote=False, model_name=None):
+    """
+    Resolve ``labels`` and return the artifact as a dict.
+
+    Args:
+        overrides (dict): label -> search query (str) or FDC id (int) for
+            labels whose name does not find the right food.
+        remote (bool): Ask the USDA API about labels the local store does
+            not know.
+    """
+    overrides = {label_key(k): v for k, v in (overrides or {}).items()}
+    resolved, unresolved = {}, []
+    for label in labels:
+        key = label_key(label)
+        query = overrides.get(key, key.replace('_', ' '))
+        if isinstance(query, int):
+            record = lookup_fdc_id(query)
+        else:
+            record = lookup_nutrition(query, remote=remote)
+        if record is None or record.calories is None:
+            unresolved.append(key)
+        else:
+            resolved[key] = dict(record.as_dict(), query=query)
+    return {
+        'format_version': FORMAT_VERSION,
+        'model': model_name,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'labels': resolved,
+        'unresolved': unresolved,
+    }
+
+
+def load_label_map(path):
+    """Registry loader: ``{label key: Nutrients}`` from the artifact."""
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported label map format {artifact.get('format_version')}")
+    return {key: Nutrients.from_dict(record) for key, record in artifact['labels'].items()}
+
+
+def get_label_map():
+    """label key -> :class:`Nutrients`, or an empty dict before the map is built."""
+    try:
+        return model_registry.get(LABEL_MAP, loader=load_label_map)
+    except FileNotFoundError:
+        return {}
+
+
+def nutrition_for_label(label):
+    """The precomputed record for a classifier label, else a live :func:`lookup_nutrition`."""
+    record = get_label_map().get(label_key(label))
+    if record is not None:
+        return record
+    return lookup_nutrition(label.replace('_', ' '))
+
+
+_lookup_pool = None
+_lookup_pool_lock = threading.Lock()
+
+
+def _lookup_executor():
+    # Created on first use so no thread exists before gunicorn forks
+    global _lookup_pool
+    if _lookup_pool is None:
+        with _lookup_pool_lock:
+            if _lookup_pool is None:
+                _lookup_pool = ThreadPoolExecutor(getattr(settings, 'FOOD_LOOKUP_THREADS', 4),
+                                                  thread_name_prefix='food-lookup')
+    return _lookup_pool
+
+
+def _pooled_lookup(label):
+    try:
+        return lookup_nutrition(label.replace('_', ' '))
+    finally:
+        close_old_connections()
+
+
+def nutrition_for_labels(labels):
+    """
+    :func:`nutrition_for_label` of every label, in order. Labels missing
+    from the map are looked up concurrently, so the candidates together
+    take about as long as the slowest lookup rather than the sum.
+    """
+    label_map = get_label_map()
+    records = [label_map.get(label_key(label)) for label in labels]
+    missing = [i for i, record in enumerate(records) if record is None]
+    if len(missing) == 1:
+        records[missing[0]] = lookup_nutrition(labels[missing[0]].replace('_', ' '))
+    elif missing:
+        pool = _lookup_executor()
+        futures = [(i, pool.submit(_pooled_lookup, labels[i])) for i in missing]
+        for i, future in futures:
+            records[i] = future.result()
+    return records
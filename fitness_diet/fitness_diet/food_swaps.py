@@ -0,0 +1,238 @@
+"""
+Similar-food suggestions for meal swaps.
+
+:class:`SwapIndex` holds every ``FoodDatabase`` row as a nutrient vector
+(calories, protein, carbs, fat) in a NumPy matrix and finds the foods
+closest to a meal with a KD-tree. Each column is divided by its standard
+deviation and multiplied by its ``FEATURE_WEIGHTS`` entry, so a suggestion
+matches calories first and the macro split second. Missing macros are
+filled with the column median.
+
+A food saved or deleted after the tree was built does not rebuild it. The
+model signals put the food's new vector into a small delta that queries
+scan by brute force, and mark its old tree row as removed. The next query
+rebuilds from the database once the delta grows past ``rebuild_fraction``
+of the tree, or once the tree is older than ``max_age`` (to pick up changes
+made by other worker processes).
+
+scikit-learn is imported on first use so that loading the URLConf stays light.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FoodDatabase
+
+FEATURES = ('calories', 'protein', 'carbs', 'fat')
+# Calories count double: a swap should keep the meal's energy before its macro split
+FEATURE_WEIGHTS = np.array([2.0, 1.0, 1.0, 1.0])
+_FIELDS = ('id', 'name') + FEATURES + ('category',)
+
+
+def load_foods():
+    """Every food as a dict of id, name, calories, protein, carbs, fat and category."""
+    return [dict(zip(_FIELDS, row)) for row in FoodDatabase.objects.values_list(*_FIELDS).iterator(chunk_size=10000)]
+
+
+def _raw_vectors(foods):
+    """``(n, 4)`` float matrix of the foods' FEATURES, NaN where a value is missing."""
+    return np.array([[np.nan if food[f] is None else food[f] for f in FEATURES] for food in foods],
+                    dtype=np.float64).reshape(len(foods), len(FEATURES))
+
+
+class _Tree:
+    """One immutable build: the foods, their scaled vectors and the KD-tree over them."""
+
+    __slots__ = ('foods', 'ids', 'categories', 'medians', 'scale', 'macros_per_kcal', 'tree', 'built_at')
+
+    def __init__(self, foods, leaf_size):
+        from sklearn.neighbors import KDTree
+
+        self.foods = foods
+        self.ids = {food['id']: row for row, food in enumerate(foods)}
+        self.categories = np.array([food['category'] or '' for food in foods], dtype=object)
+        raw = _raw_vectors(foods)
+        if len(foods):
+            with np.errstate(invalid='ignore'):
+                medians = np.nanmedian(raw, axis=0)
+        else:
+            medians = np.zeros(len(FEATURES))
+        self.medians = np.nan_to_num(medians)
+        filled = np.where(np.isnan(raw), self.medians, raw)
+        std = filled.std(axis=0) if len(foods) else np.ones(len(FEATURES))
+        self.scale = FEATURE_WEIGHTS / np.where(std > 0, std, 1.0)
+        # Median grams of each macro per kcal, to place a meal that is not in the catalog
+        calories = filled[:, 0]
+        per_kcal = filled[calories > 0, 1:] / calories[calories > 0, None]
+        self.macros_per_kcal = np.median(per_kcal, axis=0) if len(per_kcal) else np.zeros(len(FEATURES) - 1)
+        self.tree = KDTree(filled * self.scale, leaf_size=leaf_size) if len(foods) else None
+        self.built_at = time.monotonic()
+
+    def scaled(self, foods):
+        raw = _raw_vectors(foods)
+        return np.where(np.isnan(raw), self.medians, raw) * self.scale
+
+    def vector_for_calories(self, calories):
+        """Scaled vector of a food with these calories and the catalog's typical macros per kcal"""
+        return np.concatenate(([calories], self.macros_per_kcal * calories)) * self.scale
+
+
+class SwapIndex:
+    """
+    Nearest-neighbour index over the food catalog's nutrient vectors.
+
+    Args:
+        load (callable): Returns every food as a dict (see :func:`load_foods`).
+        rebuild_fraction (float): Rebuild once the foods changed since the
+            last build exceed this share of the tree (and ``rebuild_min``).
+        rebuild_min (int): Changes always absorbed without a rebuild.
+        max_age (float): Seconds before a tree is rebuilt regardless; ``0``
+            keeps it until enough changes.
+        leaf_size (int): KD-tree leaf size.
+    """
+
+    def __init__(self, load=load_foods, rebuild_fraction=0.05, rebuild_min=256, max_age=600.0, leaf_size=40):
+        self.load = load
+        self.rebuild_fraction = rebuild_fraction
+        self.rebuild_min = rebuild_min
+        self.max_age = max_age
+        self.leaf_size = leaf_size
+        self.builds = 0
+        self._tree = None
+        self._delta = {}
+        self._removed = set()
+        self._lock = threading.Lock()
+
+    def _needs_rebuild(self):
+        tree = self._tree
+        if tree is None:
+            return True
+        if self.max_age and time.monotonic() - tree.built_at > self.max_age:
+            return True
+        changes = len(self._delta) + len(self._removed)
+        return changes > max(self.rebuild_min, self.rebuild_fraction * len(tree.foods))
+
+    def _current(self):
+        """The tree and a copy of the changes since it was built, rebuilding first if due."""
+        with self._lock:
+            if self._needs_rebuild():
+                self._tree = _Tree(self.load(), self.leaf_size)
+                self._delta, self._removed = {}, set()
+                self.builds += 1
+            return self._tree, list(self._delta.values()), set(self._removed)
+
+    def food_changed(self, food):
+        """Apply a saved food (dict as from :func:`load_foods`) without rebuilding the tree."""
+        with self._lock:
+            if self._tree is None:
+                return
+            if food['id'] in self._tree.ids:
+                self._removed.add(food['id'])
+            self._delta[food['id']] = food
+
+    def food_removed(self, food_id):
+        with self._lock:
+            if self._tree is None:
+                return
+            if food_id in self._tree.ids:
+                self._removed.add(food_id)
+            self._delta.pop(food_id, None)
+
+    def nearest(self, k=5, food=None, calories=None, category=None, exclude=()):
+        """
+        The ``k`` foods closest to ``food`` (a dict with FEATURES) or, for a
+        meal not in the catalog, to a food of ``calories`` with typical macros.
+
+        Args:
+            category (str): Only foods of this ``FoodDatabase.category``.
+            exclude (collection): Food ids never returned.
+
+        Returns:
+            list: Food dicts, nearest first, each with its ``distance``.
+        """
+        if k < 1:
+            return []
+        tree, delta, removed = self._current()
+        query = tree.scaled([food])[0] if food is not None else tree.vector_for_calories(calories)
+        exclude = set(exclude)
+        # Removed ids only hide stale tree rows: an edited food's new version is in the delta
+        skip = removed | exclude
+
+        matches = []
+        n = len(tree.foods)
+        fetch = min(n, k + len(skip))
+        while fetch:
+            # Filtered-out foods take slots; widen the query until k survive or the tree is exhausted
+            distances, rows = tree.tree.query(query[None], k=fetch)
+            matches = [(d, tree.foods[row]) for d, row in zip(distances[0], rows[0])
+                       if tree.foods[row]['id'] not in skip
+                       and (not category or tree.categories[row] == category)]
+            if len(matches) >= k or fetch == n:
+                break
+            fetch = min(n, fetch * 4)
+
+        delta = [f for f in delta if f['id'] not in exclude and (not category or f['category'] == category)]
+        if delta:
+            distances = np.linalg.norm(tree.scaled(delta) - query, axis=1)
+            matches.extend(zip(distances, delta))
+        matches.sort(key=lambda match: match[0])
+        return [dict(food, distance=round(float(distance), 4)) for distance, food in matches[:k]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'foods': len(self._tree.foods) if self._tree else 0,
+                'delta': len(self._delta),
+                'removed': len(self._removed),
+                'builds': self.builds,
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def swap_index():
+    """The process-wide swap index, configured from settings on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SwapIndex(
+                    rebuild_fraction=getattr(settings, 'FOOD_SWAPS_REBUILD_FRACTION', 0.05),
+                    max_age=getattr(settings, 'FOOD_SWAPS_MAX_AGE', 600.0),
+                )
+    return _index
+
+
+def suggest_swaps(meal, k=5, category=None):
+    """
+    Catalog foods nutritionally closest to a ``MealPlan`` item.
+
+    The meal's food is looked up in the catalog by name; a meal the
+    catalog does not know is matched on its calories alone.
+
+    Returns:
+        list: Food dicts, nearest first, each with its ``distance``; never
+        the meal's own food.
+    """
+    food = FoodDatabase.objects.filter(name__iexact=meal.food_item).values(*_FIELDS).first()
+    exclude = {food['id']} if food else ()
+    return swap_index().nearest(k, food=food, calories=meal.calories, category=category, exclude=exclude)
+
+
+@receiver(post_save, sender=FoodDatabase)
+def _food_saved(sender, instance, raw=False, **kwargs):
+    if _index is not None and not raw:
+        _index.food_changed({field: getattr(instance, field) for field in _FIELDS})
+
+
+@receiver(post_delete, sender=FoodDatabase)
+def _food_deleted(sender, instance, **kwargs):
+    if _index is not None:
+        _index.food_removed(instance.pk)
@@ -0,0 +1,223 @@
+"""
+Shared HTTP client for external APIs (the USDA FoodData Central search).
+
+A bare ``requests.get`` opens a new TCP+TLS connection per call and, without
+a timeout, can hang a worker for as long as the upstream does. Every outbound
+call goes through an :class:`HttpClient` from :func:`http_client` instead:
+
+* one ``requests.Session`` per worker process keeps a pool of keep-alive
+  connections (rebuilt after a fork, so workers never share sockets);
+* every request has a connect and a read timeout;
+* connection errors, timeouts and 429/5xx responses are retried a bounded
+  number of times, sleeping a random ("full jitter") exponential backoff so
+  workers do not retry in lockstep;
+* a :class:`CircuitBreaker` opens after repeated failed calls and then
+  rejects calls at once with :class:`CircuitOpenError` until
+  ``reset_timeout`` has passed, when a single trial call decides whether
+  it closes again.
+
+:class:`CircuitOpenError` is a ``requests.RequestException``, so callers
+that already handle request failures need no changes.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+# Responses worth another attempt: rate limiting and transient upstream failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Args:
+        failure_threshold (int): Consecutive failed calls that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now. In half-open state only one trial call is let through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with timeouts, retries and a circuit breaker.
+
+    Args:
+        name (str): Label used in reports.
+        connect_timeout (float): Seconds to establish a connection.
+        read_timeout (float): Default seconds to wait for response data.
+        retries (int): Extra attempts after a retryable failure.
+        backoff (float): Base of the exponential backoff in seconds.
+        max_backoff (float): Upper bound of one backoff sleep.
+        pool_size (int): Keep-alive connections per host.
+        breaker (CircuitBreaker): Shared by every call of this client.
+    """
+
+    def __init__(self, name, connect_timeout=3.05, read_timeout=10.0, retries=2, backoff=0.2, max_backoff=2.0,
+                 pool_size=10, breaker=None):
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.attempts = 0
+        self.failures = 0
+        self.rejected = 0
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        """This process's session; a forked worker builds its own instead of reusing the parent's sockets."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session, self._pid = session, pid
+        return self._session
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """
+        ``GET url`` with retries.
+
+        Args:
+            timeout (float): Read timeout for this call; the connect timeout
+                is always the client's.
+
+        Returns:
+            requests.Response: The first non-retryable response, or the last
+            retryable one (e.g. a 503) once the retries are used up.
+
+        Raises:
+            CircuitOpenError: If the circuit is open; no request is made.
+            requests.RequestException: The last connection error or timeout.
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError(f"{self.name}: circuit open, not calling {url}")
+        timeout = (self.connect_timeout, timeout or self.read_timeout)
+        with self._lock:
+            self.calls += 1
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._sleep_before_retry(attempt - 1)
+            with self._lock:
+                self.attempts += 1
+            try:
+                response = self.session().get(url, params=params, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error, response = e, None
+                continue
+            except Exception:
+                # Not retryable (e.g. an invalid URL), but a half-open trial must still end
+                self.breaker.record_failure()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+            error = None
+            if attempt < self.retries:
+                response.close()  # hand the connection back to the pool
+
+        self.breaker.record_failure()
+        with self._lock:
+            self.failures += 1
+        if response is None:
+            raise error
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'calls': self.calls,
+                'retries': self.attempts - self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'state': self.breaker.state,
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def http_client(name):
+    """The process-wide client ``name``, configured from settings on first use."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = HttpClient(
+                    name,
+                    connect_timeout=getattr(settings, 'HTTP_CLIENT_CONNECT_TIMEOUT', 3.05),
+                    retries=getattr(settings, 'HTTP_CLIENT_RETRIES', 2),
+                    backoff=getattr(settings, 'HTTP_CLIENT_BACKOFF', 0.2),
+                    pool_size=getattr(settings, 'HTTP_CLIENT_POOL_SIZE', 10),
+                    breaker=CircuitBreaker(
+                        failure_threshold=getattr(settings, 'HTTP_CLIENT_BREAKER_FAILURES', 5),
+                        reset_timeout=getattr(settings, 'HTTP_CLIENT_BREAKER_RESET', 30.0),
+                    ),
+                )
+    return client
+
+
+def client_stats():
+    """Counters of every HTTP client used by this process."""
+    with _clients_lock:
+        clients = sorted(_clients.items())
+    return [client.stats() for _, client in clients]
@@ -0,0 +1,246 @@
+"""
+Out-of-process food image inference with dynamic micro-batching.
+
+A single sidecar process (``manage.py run_inference_server``) holds the ViT
+weights and listens on a Unix socket. Web workers send decoded RGB pixels
+through :class:`InferenceClient`; the sidecar gathers requests arriving
+within ``max_wait_ms`` of each other (up to ``max_batch_size``) and runs
+them through the pipeline as one batched forward pass.
+
+Wire format, both directions: a 4-byte big-endian length followed by a JSON
+header. Requests carry ``width``, ``height`` and ``top_k`` in the header and
+are followed by ``width * height * 3`` bytes of RGB pixels.
+
+The client shrinks images to ``max_side`` pixels on their longer side before
+sending them (the model resizes its input to 224x224 anyway), and the server
+closes the connection on a header announcing more than ``max_pixels`` pixels
+instead of reading its body.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('>I')
+# Longer side of the images a client sends: twice the 224px input of the ViT food models
+MAX_IMAGE_SIDE = 448
+# Largest image the server accepts: the pixel buffer is read into memory before decoding
+MAX_IMAGE_PIXELS = 1024 * 1024
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("inference socket closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _send_json(sock, payload):
+    data = json.dumps(payload).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_json(sock):
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+class MicroBatcher:
+    """
+    Collects single-image requests into batches for one pipeline call.
+
+    Args:
+        pipeline: Callable accepting ``(images, top_k=..., batch_size=...)``.
+        max_batch_size (int): Upper bound on images per forward pass.
+        max_wait_ms (float): How long the first request of a batch waits
+            for company before the batch is run anyway.
+    """
+
+    def __init__(self, pipeline, max_batch_size=8, max_wait_ms=5.0):
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.images = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, image, top_k=1):
+        future = Future()
+        self._queue.put((image, top_k, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            images = [item[0] for item in batch]
+            top_k = max(item[1] for item in batch)
+            try:
+                results = self.pipeline(images, top_k=top_k, batch_size=len(images))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.images += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, k, future), preds in zip(batch, results):
+                future.set_result([
+                    {'label': p['label'], 'score': float(p['score'])} for p in preds[:k]
+                ])
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'images': self.images,
+            'largest_batch': self.largest_batch,
+            'mean_batch': self.images / self.batches if self.batches else 0.0,
+        }
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        from PIL import Image
+
+        sock = self.request
+        while True:
+            try:
+                header = _recv_json(sock)
+            except ConnectionError:
+                return
+            if header.get('op') == 'stats':
+                _send_json(sock, self.server.batcher.stats())
+                continue
+            try:
+                width, height = int(header['width']), int(header['height'])
+            except (KeyError, TypeError, ValueError):
+                # The stream can no longer be framed reliably
+                return
+            if width < 1 or height < 1 or width * height > self.server.max_pixels:
+                # Answer without reading the body, then drop the connection it is still queued on
+                _send_json(sock, {'error': f"image size {width}x{height} exceeds {self.server.max_pixels} pixels"})
+                return
+            try:
+                pixels = _recv_exact(sock, width * height * 3)
+            except ConnectionError:
+                return
+            try:
+                image = Image.frombytes('RGB', (width, height), pixels)
+                preds = self.server.batcher.submit(image, int(header.get('top_k', 1))).result()
+                _send_json(sock, {'predictions': preds})
+            except Exception as e:
+                _send_json(sock, {'error': str(e)})
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded Unix socket server feeding a shared :class:`MicroBatcher`.
+
+    Args:
+        max_pixels (int): Largest ``width * height`` a request may announce.
+    """
+
+    daemon_threads = True
+    # Every web worker thread connects once; with socketserver's backlog of 5 a
+    # burst of connects with a timeout fails with EAGAIN instead of waiting
+    request_queue_size = 128
+
+    def __init__(self, socket_path, batcher, max_pixels=MAX_IMAGE_PIXELS):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.batcher = batcher
+        self.max_pixels = max_pixels
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class InferenceClient:
+    """
+    Per-thread connection to the inference sidecar.
+
+    Args:
+        socket_path (str): Path of the sidecar's Unix socket.
+        timeout (float): Seconds to wait for connect and for a response.
+        max_side (int): Images are shrunk to at most this many pixels on
+            their longer side before they are sent.
+    """
+
+    def __init__(self, socket_path, timeout=30.0, max_side=MAX_IMAGE_SIDE):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_side = max_side
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, header, body=b''):
+        try:
+            sock = self._connection()
+            data = json.dumps(header).encode()
+            sock.sendall(_LENGTH.pack(len(data)) + data + body)
+            return _recv_json(sock)
+        except (OSError, ConnectionError):
+            # Drop the broken connection so the next call reconnects
+            self._close()
+            raise
+
+    def classify(self, image, top_k=1):
+        """Classify a PIL image remotely; returns the pipeline's label/score list."""
+        rgb = image.convert('RGB')
+        # convert() returned a copy, so shrinking it in place leaves the caller's image alone
+        rgb.thumbnail((self.max_side, self.max_side))
+        width, height = rgb.size
+        response = self._call({'width': width, 'height': height, 'top_k': top_k}, rgb.tobytes())
+        if 'error' in response:
+            raise RuntimeError(f"inference server error: {response['error']}")
+        return response['predictions']
+
+    def stats(self):
+        return self._call({'op': 'stats'})
@@ -0,0 +1,131 @@
+"""
+Fused, NumPy-only evaluation of the weight-change pipeline.
+
+``weight_change_model.pkl`` holds a ``StandardScaler`` and a
+``MultiOutputRegressor`` of linear regressions. Standardising and then
+applying a linear map is itself one linear map:
+
+    y = ((x - mean) / scale) @ coef.T + intercept
+      = x @ (coef / scale).T + (intercept - (mean / scale) @ coef.T)
+
+``export_linear_models`` folds the pipeline into that single weight matrix
+and bias, checks it against the original, and writes it as a
+``<name>.bundle`` next to the pickle (see ``model_bundle``). Scoring is
+then one matrix product for any batch size and never imports
+scikit-learn.
+"""
+
+import numpy as np
+
+from .model_bundle import bundle_manifest_name, read_bundle, write_bundle
+from .model_registry import model_registry
+
+BUNDLE_KIND = 'linear'
+WEIGHT_CHANGE_MODEL = 'weight_change/weight_change_model.pkl'
+
+
+class FusedLinearModel:
+    """
+    A scaler plus linear regressor reduced to ``X @ weights + bias``.
+
+    Args:
+        weights (ndarray): ``(n_features, n_targets)`` matrix.
+        bias (ndarray): ``(n_targets,)`` vector.
+        feature_names (list[str]): Expected column order, for reference.
+        target_names (list[str]): Meaning of each output column.
+    """
+
+    ARRAYS = ('weights', 'bias')
+
+    def __init__(self, weights, bias, feature_names=None, target_names=None, source_sha256=None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float64)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.target_names = list(target_names) if target_names is not None else None
+        self.source_sha256 = source_sha256
+
+    @property
+    def n_features_in_(self):
+        return self.weights.shape[0]
+
+    def predict(self, X):
+        """Return the ``(n_rows, n_targets)`` predictions for a row or a matrix."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, expected {self.n_features_in_}")
+        return X @ self.weights + self.bias
+
+    @classmethod
+    def from_pipeline(cls, model_dict, source_sha256=None):
+        """Fold the ``{'model', 'scaler'}`` dict saved by the training script."""
+        model = model_dict['model']
+        estimators = getattr(model, 'estimators_', [model])
+        for estimator in estimators:
+            if not hasattr(estimator, 'coef_'):
+                raise ValueError(f"Cannot fuse non-linear estimator {type(estimator).__name__}")
+        coef = np.vstack([np.reshape(estimator.coef_, (-1, np.shape(estimator.coef_)[-1]))
+                          for estimator in estimators])
+        intercept = np.concatenate([np.ravel(estimator.intercept_) for estimator in estimators])
+
+        scaler = model_dict.get('scaler')
+        if scaler is not None:
+            mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else np.zeros(coef.shape[1])
+            scale = scaler.scale_ if getattr(scaler, 'with_std', True) else np.ones(coef.shape[1])
+            coef = coef / scale
+            intercept = intercept - coef @ mean
+
+        return cls(
+            weights=coef.T,
+            bias=intercept,
+            feature_names=model_dict.get('feature_names'),
+            target_names=model_dict.get('target_names'),
+            source_sha256=source_sha256,
+        )
+
+    def save(self, path, source_path=None):
+        """Write a ``linear`` bundle whose manifest is ``path``, fused from the pickle ``source_path``."""
+        meta = {'target_names': self.target_names, 'source_sha256': self.source_sha256}
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        return write_bundle(path, BUNDLE_KIND, arrays, meta, feature_names=self.feature_names, source_path=source_path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a bundle with the weights memory-mapped."""
+        manifest, arrays = read_bundle(path, kind=BUNDLE_KIND)
+        return cls(feature_names=manifest['feature_names'], source_sha256=manifest['source_sha256'],
+                   target_names=manifest['meta']['target_names'], **arrays)
+
+
+def pipeline_predict(model_dict, X):
+    """The original scaler + regressor prediction, used to check an export."""
+    scaler = model_dict.get('scaler')
+    if scaler is not None:
+        X = scaler.transform(X)
+    return np.asarray(model_dict['model'].predict(X)).reshape(len(X), -1)
+
+
+_fused_from_pickle = {}
+
+
+def get_linear_model(name=WEIGHT_CHANGE_MODEL):
+    """
+    Return the fused model for the pickle ``name``.
+
+    Uses the exported bundle while it matches the pickle; otherwise
+    unpickles the pipeline and folds it in memory, once per pickle version.
+    """
+    try:
+        fused = model_registry.get_export(bundle_manifest_name(name), name, loader=FusedLinearModel.load)
+    except FileNotFoundError:
+        fused = None
+    if fused is not None:
+        return fused
+
+    model_dict = model_registry.get(name)
+    version = model_registry.version(name)
+    cached = _fused_from_pickle.get(name)
+    if cached is None or cached[0] != version:
+        cached = _fused_from_pickle[name] = (version, FusedLinearModel.from_pipeline(model_dict))
+    return cached[1]
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness_diet.model_registry import file_sha256, model_registry
+from fitness_diet.surrogate_table import CALORIE_GRID, CALORIE_MODEL, CALORIE_TABLE, LookupTable
+
+
+def holdout_inputs(table, n_rows, seed=0):
+    """Random in-grid rows shaped like form input: whole numbers, body temperature to 0.1"""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(table.lower, table.upper, (n_rows, len(table.columns)))
+    X[:, :-1] = np.round(X[:, :-1])
+    X[:, -1] = np.round(X[:, -1], 1)
+    return np.clip(X, table.lower, table.upper)
+
+
+def holdout_errors(model, table, X):
+    error = np.abs(table.predict(X) - model.predict(X))
+    return {
+        'rows': len(X),
+        'max_abs': round(float(error.max()), 3),
+        'mean_abs': round(float(error.mean()), 3),
+        'p99_abs': round(float(np.percentile(error, 99)), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = "Tabulate the calorie-burn model on a grid (calorie_burn_lut.bundle/) and report its interpolation error"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=str, default=None,
+                            help="Grid points per column as 7 comma-separated integers "
+                                 f"(default: {','.join(str(p) for *_, p in CALORIE_GRID)})")
+        parser.add_argument('--holdout', type=int, default=20000, help="Random rows used to measure the error")
+        parser.add_argument('--max-mean-error', type=float, default=None,
+                            help="Refuse to write the table if the mean absolute error (kcal) exceeds this")
+
+    def handle(self, *args, **options):
+        grid = CALORIE_GRID
+        if options['points']:
+            points = [int(p) for p in options['points'].split(',')]
+            if len(points) != len(grid) or min(points) < 2:
+                raise CommandError(f"--points needs {len(grid)} integers of at least 2")
+            grid = [(column, lower, upper, n) for (column, lower, upper, _), n in zip(grid, points)]
+
+        model = model_registry.get(CALORIE_MODEL)
+        source_path = model_registry.path_for(CALORIE_MODEL)
+        start = time.perf_counter()
+        table = LookupTable.build(model, grid, source_sha256=file_sha256(source_path))
+        build_seconds = time.perf_counter() - start
+
+        table.errors = holdout_errors(model, table, holdout_inputs(table, options['holdout']))
+        if options['max_mean_error'] is not None and table.errors['mean_abs'] > options['max_mean_error']:
+            raise CommandError(f"Mean error {table.errors['mean_abs']} kcal exceeds "
+                               f"{options['max_mean_error']} kcal; table not written")
+
+        table.save(model_registry.path_for(CALORIE_TABLE), source_path=source_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{CALORIE_TABLE}: grid {'x'.join(str(n) for n in table.shape)} "
+            f"({table.values.nbytes / 1e6:.1f} MB) built in {build_seconds:.1f}s; "
+            f"holdout error max {table.errors['max_abs']} kcal, mean {table.errors['mean_abs']} kcal, "
+            f"p99 {table.errors['p99_abs']} kcal"))
@@ -0,0 +1,49 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness_diet.food_label_map import FOOD101_LABELS, LABEL_MAP, build_label_map, classifier_labels
+from fitness_diet.model_registry import model_registry
+
+
+class Command(BaseCommand):
+    help = ("Resolve every food classifier label to a nutrient record through the local FDC store "
+            f"(manage.py import_fdc) and write ml_models/{LABEL_MAP}")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=None,
+                            help="Classifier whose config lists the labels (default: FOOD_CLASSIFIER_MODEL)")
+        parser.add_argument('--builtin-labels', action='store_true',
+                            help="Use the built-in Food-101 label list instead of reading the model config")
+        parser.add_argument('--overrides', help="JSON file mapping labels to a search query or an FDC id")
+        parser.add_argument('--remote', action='store_true',
+                            help="Ask the USDA API about labels the local store does not know")
+        parser.add_argument('--allow-unresolved', action='store_true',
+                            help="Write the map even if some labels could not be resolved")
+
+    def handle(self, *args, **options):
+        model_name = options['model'] or getattr(settings, 'FOOD_CLASSIFIER_MODEL', 'nateraw/food')
+        labels = list(FOOD101_LABELS) if options['builtin_labels'] else classifier_labels(model_name)
+
+        overrides = {}
+        if options['overrides']:
+            with open(options['overrides']) as f:
+                overrides = json.load(f)
+
+        artifact = build_label_map(labels, overrides, remote=options['remote'], model_name=model_name)
+        for label in artifact['unresolved']:
+            self.stdout.write(self.style.WARNING(f"unresolved: {label}"))
+        if artifact['unresolved'] and not options['allow_unresolved']:
+            raise CommandError(f"{len(artifact['unresolved'])} of {len(labels)} labels unresolved; add them to "
+                               "--overrides, import more FDC data, or pass --allow-unresolved")
+
+        path = model_registry.path_for(LABEL_MAP)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(artifact, f, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{LABEL_MAP}: {len(artifact['labels'])} of {len(labels)} labels resolved "
+            f"({os.path.getsize(path) / 1024:.1f} KB)"))
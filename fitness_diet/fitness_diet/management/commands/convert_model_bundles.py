@@ -0,0 +1,29 @@
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from fitness_diet.model_bundle import MANIFEST, read_bundle
+from fitness_diet.model_registry import model_registry
+
+
+class Command(BaseCommand):
+    help = "Re-export every derived model as a memory-mapped bundle and list the bundles with their versions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--with-table', action='store_true',
+                            help="Also rebuild the calorie-burn lookup table (slow)")
+
+    def handle(self, *args, **options):
+        call_command('export_tree_models', stdout=self.stdout)
+        call_command('export_linear_models', stdout=self.stdout)
+        if options['with_table']:
+            call_command('build_calorie_table', stdout=self.stdout)
+
+        root = model_registry.root
+        for directory, dirnames, filenames in os.walk(root):
+            if MANIFEST in filenames:
+                manifest, arrays = read_bundle(os.path.join(directory, MANIFEST))
+                size = sum(array.nbytes for array in arrays.values())
+                self.stdout.write(f"{os.path.relpath(directory, root)}: {manifest['kind']} "
+                                  f"version {manifest['version']}, {len(arrays)} arrays, {size / 2**10:.0f} KiB")
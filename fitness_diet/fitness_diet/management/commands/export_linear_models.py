@@ -0,0 +1,56 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness_diet.linear_engine import FusedLinearModel, pipeline_predict, WEIGHT_CHANGE_MODEL
+from fitness_diet.model_bundle import bundle_manifest_name
+from fitness_diet.model_registry import file_sha256, model_registry
+
+LINEAR_MODELS = [WEIGHT_CHANGE_MODEL]
+
+
+def parity_inputs(model_dict, n_rows, seed=0):
+    """Random rows around the training distribution (from the scaler), or standard normal without one"""
+    rng = np.random.default_rng(seed)
+    fused = FusedLinearModel.from_pipeline(model_dict)
+    scaler = model_dict.get('scaler')
+    if scaler is None:
+        return rng.normal(size=(n_rows, fused.n_features_in_))
+    return scaler.mean_ + rng.normal(scale=3.0, size=(n_rows, fused.n_features_in_)) * scaler.scale_
+
+
+def max_difference(model_dict, fused, X):
+    """Largest difference from the original pipeline, relative for outputs larger than 1"""
+    expected, actual = pipeline_predict(model_dict, X), fused.predict(X)
+    return float((np.abs(expected - actual) / np.maximum(1.0, np.abs(expected))).max())
+
+
+class Command(BaseCommand):
+    help = "Fold scaler + linear regressor pickles into one weight-matrix bundle (<name>.bundle/) after a parity check"
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', default=LINEAR_MODELS,
+                            help="Artifacts relative to ml_models/ (default: the weight-change model)")
+        parser.add_argument('--rows', type=int, default=5000, help="Random rows used for the parity check")
+        parser.add_argument('--tolerance', type=float, default=1e-9,
+                            help="Largest allowed difference from the original pipeline (relative above 1)")
+
+    def handle(self, *args, **options):
+        for name in options['models']:
+            path = model_registry.path_for(name)
+            model_dict = model_registry.get(name)
+            try:
+                fused = FusedLinearModel.from_pipeline(model_dict, source_sha256=file_sha256(path))
+            except (KeyError, ValueError) as e:
+                raise CommandError(f"{name}: cannot fuse: {e}")
+
+            X = parity_inputs(model_dict, options['rows'])
+            difference = max_difference(model_dict, fused, X)
+            if difference > options['tolerance']:
+                raise CommandError(f"{name}: fused model differs by {difference:.3g} "
+                                   f"(tolerance {options['tolerance']:g}); not exported")
+
+            bundle_name = bundle_manifest_name(name)
+            manifest = fused.save(model_registry.path_for(bundle_name), source_path=path)
+            self.stdout.write(self.style.SUCCESS(
+                f"{bundle_name} (version {manifest['version']}): {fused.n_features_in_} features -> {fused.weights.shape[1]} targets, "
+                f"max difference {difference:.2g}"))
@@ -0,0 +1,78 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness_diet.model_bundle import bundle_manifest_name
+from fitness_diet.model_registry import file_sha256, model_registry
+from fitness_diet.tabular_models import TABULAR_MODELS
+from fitness_diet.tree_engine import FlatTreeEnsemble
+
+TREE_MODELS = [
+    'heart_disease/heart_model.pkl',
+    'lung_disease/lungs_model.pkl',
+    'calories_burnt/calorie_burn_model.pkl',
+]
+
+# Where each model's column order comes from, recorded in the bundle manifest
+FEATURE_NAMES = {
+    'heart_disease/heart_model.pkl': lambda: model_registry.get('heart_disease/model_features.pkl'),
+    'lung_disease/lungs_model.pkl': lambda: model_registry.get('lung_disease/lungs_model_features.pkl'),
+    'calories_burnt/calorie_burn_model.pkl': lambda: TABULAR_MODELS['calories_burnt'].COLUMNS,
+}
+
+
+def parity_inputs(engine, n_rows, seed=0):
+    """Random rows spanning each feature's split thresholds, so every branch side is exercised"""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n_rows, engine.n_features_in_))
+    is_split = engine.left != np.arange(engine.n_nodes)
+    for f in range(engine.n_features_in_):
+        thresholds = engine.threshold[is_split & (engine.feature == f)]
+        low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        margin = max(high - low, 1.0) * 0.1
+        X[:, f] = rng.uniform(low - margin, high + margin, n_rows)
+        # Also hit thresholds exactly to check the <= / < convention
+        if len(thresholds):
+            exact = rng.random(n_rows) < 0.2
+            X[exact, f] = rng.choice(thresholds, exact.sum())
+    return X
+
+
+def max_difference(model, engine, X):
+    """Largest difference from the original model, relative for outputs larger than 1"""
+    if engine.classes_ is not None:
+        expected, actual = model.predict_proba(X), engine.predict_proba(X)
+    else:
+        # XGBoost sums leaves in float32, so large regression outputs differ in the last digits
+        expected, actual = model.predict(X), engine.predict(X)
+    return float((np.abs(expected - actual) / np.maximum(1.0, np.abs(expected))).max())
+
+
+class Command(BaseCommand):
+    help = "Export the pickled tree ensembles to memory-mapped node-array bundles (<name>.bundle/) after a parity check"
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', default=TREE_MODELS,
+                            help="Artifacts relative to ml_models/ (default: heart, lung and calorie-burn models)")
+        parser.add_argument('--rows', type=int, default=5000, help="Random rows used for the parity check")
+        parser.add_argument('--tolerance', type=float, default=1e-4,
+                            help="Largest allowed difference from the original model (relative above 1)")
+
+    def handle(self, *args, **options):
+        for name in options['models']:
+            path = model_registry.path_for(name)
+            model = model_registry.get(name)
+            engine = FlatTreeEnsemble.from_model(model, source_sha256=file_sha256(path))
+
+            X = parity_inputs(engine, options['rows'])
+            difference = max_difference(model, engine, X)
+            if difference > options['tolerance']:
+                raise CommandError(f"{name}: flat engine differs by {difference:.3g} "
+                                   f"(tolerance {options['tolerance']:g}); not exported")
+
+            if name in FEATURE_NAMES:
+                engine.feature_names = list(FEATURE_NAMES[name]())
+            bundle_name = bundle_manifest_name(name)
+            manifest = engine.save(model_registry.path_for(bundle_name), source_path=path)
+            self.stdout.write(self.style.SUCCESS(
+                f"{bundle_name} (version {manifest['version']}): {engine.n_trees} trees, {engine.n_nodes} nodes, depth {engine.max_depth}, "
+                f"max difference {difference:.2g}"))
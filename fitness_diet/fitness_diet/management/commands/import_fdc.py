@@ -0,0 +1,141 @@
+import os
+import time
+import zipfile
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from fitness_diet.bulk import chunks
+from fitness_diet.fdc_store import DEFAULT_NUTRIENT_IDS, DATA_TYPE_PRIORITY, FdcCsvDump, FdcJsonDump
+from fitness_diet.models import FdcFood, FdcFoodNutrient, FdcNutrient
+
+FOOD_FIELDS = ['description', 'search_name', 'data_type', 'priority', 'category']
+
+
+class Command(BaseCommand):
+    help = ("Stream a USDA FoodData Central download (CSV directory/zip or JSON export) into the local "
+            "FdcFood/FdcNutrient/FdcFoodNutrient tables used by the food recognition views")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="FDC CSV directory or zip (food.csv, nutrient.csv, food_nutrient.csv), "
+                                         "or a .json/.zip JSON export")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per bulk insert and transaction")
+        parser.add_argument('--data-types', default='',
+                            help="Comma-separated FDC data types to keep, e.g. foundation_food,sr_legacy_food "
+                                 f"(default: all of {', '.join(DATA_TYPE_PRIORITY)})")
+        parser.add_argument('--nutrients', default='default',
+                            help="Comma-separated FDC nutrient ids to keep, 'default' (energy, macros, fiber, "
+                                 "sugars, sodium, fat subtypes) or 'all'")
+        parser.add_argument('--replace', action='store_true', help="Delete the existing FDC rows first")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+        self.chunk_size = options['chunk_size']
+        self.data_types = {t.strip() for t in options['data_types'].split(',') if t.strip()}
+        if options['nutrients'] == 'all':
+            self.nutrient_ids = None
+        elif options['nutrients'] == 'default':
+            self.nutrient_ids = DEFAULT_NUTRIENT_IDS
+        else:
+            try:
+                self.nutrient_ids = frozenset(int(n) for n in options['nutrients'].split(','))
+            except ValueError:
+                raise CommandError("--nutrients takes nutrient ids, 'default' or 'all'")
+
+        if options['replace']:
+            with transaction.atomic():
+                FdcFoodNutrient.objects.all().delete()
+                FdcFood.objects.all().delete()
+
+        start = time.perf_counter()
+        is_json = path.lower().endswith('.json') or (path.lower().endswith('.zip') and self._zip_has_json(path))
+        foods, amounts = self.import_json(path) if is_json else self.import_csv(path)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {foods} foods and {amounts} nutrient amounts in {elapsed:.1f}s "
+            f"({(foods + amounts) / max(elapsed, 1e-9):,.0f} rows/s)"))
+
+    def _zip_has_json(self, path):
+        with zipfile.ZipFile(path) as archive:
+            return any(name.endswith('.json') for name in archive.namelist())
+
+    def keep_food(self, row):
+        return not self.data_types or row['data_type'] in self.data_types
+
+    def keep_nutrient(self, nutrient_id):
+        return self.nutrient_ids is None or nutrient_id in self.nutrient_ids
+
+    def save_nutrients(self, nutrients):
+        FdcNutrient.objects.bulk_create(
+            [FdcNutrient(id=i, name=name[:200], unit_name=unit[:20]) for i, name, unit in nutrients
+             if self.keep_nutrient(i)],
+            update_conflicts=True, unique_fields=['id'], update_fields=['name', 'unit_name'],
+        )
+
+    def save_foods(self, rows):
+        FdcFood.objects.bulk_create([FdcFood(**row) for row in rows], batch_size=self.chunk_size,
+                                    update_conflicts=True, unique_fields=['fdc_id'], update_fields=FOOD_FIELDS)
+
+    def save_amounts(self, amounts):
+        FdcFoodNutrient.objects.bulk_create(
+            [FdcFoodNutrient(food_id=f, nutrient_id=n, amount=a) for f, n, a in amounts],
+            batch_size=self.chunk_size,
+            update_conflicts=True, unique_fields=['food', 'nutrient'], update_fields=['amount'],
+        )
+
+    def import_csv(self, path):
+        dump = FdcCsvDump(path)
+        with transaction.atomic():
+            self.save_nutrients(dump.nutrients())
+        known_nutrients = set(FdcNutrient.objects.values_list('id', flat=True))
+
+        # Imported fdc_ids as one sorted int64 array (8 bytes per food) to filter food_nutrient.csv
+        imported, food_count = [], 0
+        for chunk in chunks((row for row in dump.foods() if self.keep_food(row)), self.chunk_size):
+            with transaction.atomic():
+                self.save_foods(chunk)
+            imported.append(np.fromiter((row['fdc_id'] for row in chunk), dtype=np.int64, count=len(chunk)))
+            food_count += len(chunk)
+            self.progress('foods', food_count)
+        imported = np.unique(np.concatenate(imported)) if imported else np.empty(0, dtype=np.int64)
+
+        amount_count = 0
+        rows = (r for r in dump.food_nutrients() if r[1] in known_nutrients and self.keep_nutrient(r[1]))
+        for chunk in chunks(rows, self.chunk_size):
+            fdc_ids = np.fromiter((r[0] for r in chunk), dtype=np.int64, count=len(chunk))
+            position = np.minimum(np.searchsorted(imported, fdc_ids), max(len(imported) - 1, 0))
+            present = imported[position] == fdc_ids if len(imported) else np.zeros(len(chunk), dtype=bool)
+            chunk = [row for row, keep in zip(chunk, present) if keep]
+            if chunk:
+                with transaction.atomic():
+                    self.save_amounts(chunk)
+                amount_count += len(chunk)
+                self.progress('nutrient amounts', amount_count)
+        return food_count, amount_count
+
+    def import_json(self, path):
+        dump = FdcJsonDump(path)
+        food_count = amount_count = 0
+        saved_nutrients = set()
+        records = (record for record in dump.records() if self.keep_food(record[0]))
+        for chunk in chunks(records, self.chunk_size):
+            amounts = [(food['fdc_id'], n, a) for food, food_amounts in chunk
+                       for n, a in food_amounts if self.keep_nutrient(n)]
+            with transaction.atomic():
+                new = [n for n in dump.nutrients() if n[0] not in saved_nutrients]
+                if new:
+                    self.save_nutrients(new)
+                    saved_nutrients.update(n[0] for n in new)
+                self.save_foods([food for food, _ in chunk])
+                self.save_amounts(amounts)
+            food_count += len(chunk)
+            amount_count += len(amounts)
+            self.progress('foods', food_count)
+        return food_count, amount_count
+
+    def progress(self, what, count):
+        if count % (self.chunk_size * 20) < self.chunk_size:
+            self.stdout.write(f"  {count:,} {what}")
@@ -0,0 +1,94 @@
+import contextlib
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from fitness_diet import food_catalog, food_search
+from fitness_diet.bulk import chunks
+from fitness_diet.food_import import FIELDS, InvalidRow, read_rows, validate_row
+from fitness_diet.models import FoodDatabase
+
+UPDATE_FIELDS = [field for field in FIELDS if field != 'name']
+
+
+class Command(BaseCommand):
+    help = ("Stream food catalog files (CSV, JSON array or JSON Lines) into FoodDatabase: validate rows, "
+            "dedupe on name and upsert in chunks, one transaction per chunk (with --replace, one for the whole run)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Catalog files (.csv, .json, .jsonl/.ndjson)")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per bulk upsert and transaction")
+        parser.add_argument('--replace', action='store_true',
+                            help="Delete every existing food first; a failed run keeps the old catalog")
+        parser.add_argument('--max-invalid', type=int, default=None,
+                            help="Stop once more rows than this were rejected (default: never)")
+        parser.add_argument('--show-invalid', type=int, default=10, help="Rejected rows to print")
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            if not os.path.exists(path):
+                raise CommandError(f"{path} does not exist")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        self.chunk_size = options['chunk_size']
+        self.max_invalid = options['max_invalid']
+        self.show_invalid = options['show_invalid']
+        self.replace = options['replace']
+        self.read = self.invalid = self.duplicates = self.upserted = 0
+
+        start = time.perf_counter()
+        try:
+            # With --replace the delete commits together with every chunk, or not at all
+            with transaction.atomic() if self.replace else contextlib.nullcontext():
+                if self.replace:
+                    with connection.cursor() as cursor:
+                        # Raw delete: per-row post_delete signals are pointless before the index rebuild below
+                        cursor.execute(f"DELETE FROM {FoodDatabase._meta.db_table}")
+                for path in options['paths']:
+                    for chunk in chunks(self.valid_rows(path), self.chunk_size):
+                        self.save(chunk)
+                        self.progress()
+            elapsed = time.perf_counter() - start
+        finally:
+            # bulk_create sends no signals: re-index the whole catalog once, even when a failed run kept some chunks
+            index_start = time.perf_counter()
+            indexed = food_search.rebuild()
+            index_elapsed = time.perf_counter() - index_start
+            # Only this process's catalog; server workers reload theirs after FOOD_CATALOG_MAX_AGE
+            food_catalog.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Upserted {self.upserted:,} foods from {self.read:,} rows in {elapsed:.1f}s "
+            f"({self.read / max(elapsed, 1e-9):,.0f} rows/s); "
+            f"{self.invalid:,} invalid, {self.duplicates:,} duplicate names"))
+        self.stdout.write(f"Search index: {indexed:,} foods in {index_elapsed:.1f}s")
+
+    def valid_rows(self, path):
+        for line, row in read_rows(path):
+            self.read += 1
+            try:
+                yield validate_row(row)
+            except InvalidRow as e:
+                self.invalid += 1
+                if self.invalid <= self.show_invalid:
+                    self.stderr.write(f"{path}:{line}: {e}")
+                if self.max_invalid is not None and self.invalid > self.max_invalid:
+                    kept = "nothing replaced" if self.replace else f"{self.upserted:,} foods upserted"
+                    raise CommandError(f"More than {self.max_invalid} invalid rows; stopped at {path}:{line}, {kept}")
+
+    def save(self, rows):
+        # One upsert cannot update the same row twice: the last row of a name wins
+        foods = {row['name']: row for row in rows}
+        self.duplicates += len(rows) - len(foods)
+        with transaction.atomic():
+            FoodDatabase.objects.bulk_create(
+                [FoodDatabase(**row) for row in foods.values()], batch_size=self.chunk_size,
+                update_conflicts=True, unique_fields=['name'], update_fields=UPDATE_FIELDS,
+            )
+        self.upserted += len(foods)
+
+    def progress(self):
+        if self.read % (self.chunk_size * 20) < self.chunk_size:
+            self.stdout.write(f"  {self.read:,} rows")
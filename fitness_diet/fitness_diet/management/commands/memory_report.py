@@ -0,0 +1,125 @@
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def smaps_rollup(pid):
+    """RSS, PSS and USS (private clean + dirty) of ``pid`` in bytes, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; the parent pid follows the closing parenthesis
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def process_tree_memory(master_pid):
+    """Memory of a gunicorn master and each of its workers."""
+    rows = [dict(pid=master_pid, role='master', **smaps_rollup(master_pid))]
+    for pid in child_pids(master_pid):
+        try:
+            rows.append(dict(pid=pid, role='worker', **smaps_rollup(pid)))
+        except OSError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = ("Report RSS/PSS/USS of a gunicorn master and its workers, or start gunicorn with models "
+            "loaded per worker and then preloaded in the master and compare the two")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pid', type=int, help="PID of a running gunicorn master")
+        parser.add_argument('--compare', action='store_true',
+                            help="Start gunicorn twice (GUNICORN_MODEL_PRELOAD=worker, then master) and compare")
+        parser.add_argument('--workers', type=int, default=3, help="Workers per gunicorn run with --compare")
+        parser.add_argument('--timeout', type=float, default=120.0,
+                            help="Seconds to wait for the workers to finish loading with --compare")
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            before = self.measure_gunicorn('worker', options['workers'], options['timeout'])
+            after = self.measure_gunicorn('master', options['workers'], options['timeout'])
+            self.print_rows("Models loaded in every worker (GUNICORN_MODEL_PRELOAD=worker)", before)
+            self.print_rows("Models preloaded in the master + gc.freeze() (GUNICORN_MODEL_PRELOAD=master)", after)
+            saved = sum(r['pss'] for r in before) - sum(r['pss'] for r in after)
+            self.stdout.write(self.style.SUCCESS(f"\nTotal PSS saved by preloading: {saved / 2**20:.1f} MB"))
+        elif options['pid']:
+            try:
+                rows = process_tree_memory(options['pid'])
+            except OSError as e:
+                raise CommandError(f"Cannot read memory of pid {options['pid']}: {e}")
+            self.print_rows(f"gunicorn master {options['pid']}", rows)
+        else:
+            raise CommandError("Pass --pid <gunicorn master pid> or --compare")
+
+    def measure_gunicorn(self, preload, workers, timeout):
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn is None:
+            raise CommandError("gunicorn is not installed")
+        socket_dir = tempfile.mkdtemp()
+        env = dict(os.environ, GUNICORN_MODEL_PRELOAD=preload)
+        process = subprocess.Popen(
+            [gunicorn, '-c', 'gunicorn.conf.py', '--workers', str(workers),
+             '--bind', f"unix:{os.path.join(socket_dir, 'gunicorn.sock')}", 'fitness_diet.wsgi:application'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            return self.wait_until_settled(process, workers, timeout)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+    def wait_until_settled(self, process, workers, timeout):
+        """Sample until every worker is up and total PSS stops growing."""
+        deadline = time.monotonic() + timeout
+        previous = None
+        while time.monotonic() < deadline:
+            time.sleep(1.0)
+            if process.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {process.returncode}")
+            rows = process_tree_memory(process.pid)
+            if len(rows) < workers + 1:
+                continue
+            total = sum(r['pss'] for r in rows)
+            if previous is not None and abs(total - previous) < 2**20:
+                return rows
+            previous = total
+        raise CommandError("gunicorn workers did not settle before the timeout")
+
+    def print_rows(self, title, rows):
+        self.stdout.write(f"\n{title}")
+        self.stdout.write(f"{'pid':>8} {'role':<8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9}")
+        for row in rows:
+            self.stdout.write(f"{row['pid']:>8} {row['role']:<8} {row['rss'] / 2**20:>9.1f} "
+                              f"{row['pss'] / 2**20:>9.1f} {row['uss'] / 2**20:>9.1f}")
+        self.stdout.write(f"{'':>8} {'total':<8} {sum(r['rss'] for r in rows) / 2**20:>9.1f} "
+                          f"{sum(r['pss'] for r in rows) / 2**20:>9.1f} {sum(r['uss'] for r in rows) / 2**20:>9.1f}")
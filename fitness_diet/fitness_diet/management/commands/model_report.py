@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from fitness_diet.model_registry import model_registry
+
+
+class Command(BaseCommand):
+    help = "Load every artifact under ml_models/ through the model registry and report load time and memory"
+
+    def handle(self, *args, **options):
+        stats = model_registry.preload()
+        if not stats:
+            self.stdout.write("No model artifacts could be loaded.")
+            return
+
+        self.stdout.write(f"{'model':<45} {'version':<14} {'file KB':>9} {'load ms':>9} {'memory KB':>10}")
+        for row in stats:
+            self.stdout.write(
+                f"{row['name']:<45} {row['version']:<14} {row['size_bytes'] / 1024:>9.1f} "
+                f"{row['load_seconds'] * 1000:>9.1f} {(row['memory_bytes'] or 0) / 1024:>10.1f}"
+            )
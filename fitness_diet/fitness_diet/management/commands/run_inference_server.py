@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness_diet.food_classifier import FoodClassifier
+from fitness_diet.inference_server import InferenceServer, MicroBatcher
+
+
+class Command(BaseCommand):
+    help = "Serve the food image classifier to all web workers over a Unix socket with micro-batching"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=settings.FOOD_INFERENCE_SOCKET,
+                            help="Unix socket path (default: FOOD_INFERENCE_SOCKET)")
+        parser.add_argument('--max-batch-size', type=int, default=settings.FOOD_INFERENCE_MAX_BATCH_SIZE,
+                            help="Maximum images per forward pass")
+        parser.add_argument('--max-wait-ms', type=float, default=settings.FOOD_INFERENCE_MAX_WAIT_MS,
+                            help="Maximum time a request waits for a batch to fill")
+        parser.add_argument('--max-pixels', type=int, default=settings.FOOD_INFERENCE_MAX_PIXELS,
+                            help="Largest image (width * height) accepted")
+
+    def handle(self, *args, **options):
+        socket_path = options['socket']
+        if not socket_path:
+            raise CommandError("No socket path given; pass --socket or set FOOD_INFERENCE_SOCKET.")
+
+        classifier = FoodClassifier()
+        self.stdout.write(f"Loading {classifier.model_name}...")
+        classifier.warm_up()
+        self.stdout.write(f"Model ready in {classifier.build_seconds:.2f}s")
+
+        batcher = MicroBatcher(classifier.get_pipeline(),
+                               max_batch_size=options['max_batch_size'],
+                               max_wait_ms=options['max_wait_ms'])
+        server = InferenceServer(socket_path, batcher, max_pixels=options['max_pixels'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Listening on {socket_path} (max batch {options['max_batch_size']}, "
+            f"max wait {options['max_wait_ms']} ms)"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Batching stats: {batcher.stats()}")
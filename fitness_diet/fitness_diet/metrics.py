@@ -0,0 +1,335 @@
+"""
+Per-model inference metrics, exported in the Prometheus text format.
+
+Every prediction view owns a :class:`ModelMetrics` (from
+:func:`model_metrics`). It counts requests and errors and keeps a latency
+histogram per stage: ``encode`` (request data to feature vector),
+``inference``, ``persist`` (the ORM write), plus ``lookup`` for the food
+views' nutrition fetch and ``batch_*`` for the batch endpoint.
+:func:`render_metrics` produces the ``/metrics`` page, including the
+prediction-cache, USDA search cache and outbound HTTP client counters and
+the version of every loaded model artifact.
+
+Recording runs on every request, so counters and histograms are sharded per
+thread: a thread only ever writes its own shard and never takes a lock
+after its first observation. A scrape sums the shards. The shard of a
+thread that has exited is folded into a retired total, so under a
+thread-per-request server the shards stay as many as the live threads.
+Each gunicorn worker keeps its own numbers, so every sample carries a
+``worker`` label; aggregate across workers with ``sum by (model)``.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from .http_client import client_stats
+from .model_registry import model_registry
+from .prediction_cache import cache_stats
+from .usda_cache import usda_cache_stats
+
+# Upper bounds in seconds: sub-millisecond tree walks up to multi-second image classification
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ('encode', 'inference', 'persist')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Sharded:
+    """Base for metrics whose state is one mutable list per writing thread."""
+
+    # Shards registered before exited threads are first pruned
+    MIN_PRUNE_AT = 64
+
+    def __init__(self, shard_size):
+        self._shard_size = shard_size
+        self._local = threading.local()
+        self._shards = []  # (thread, shard)
+        self._retired = [0] * shard_size
+        self._prune_at = self.MIN_PRUNE_AT
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0] * self._shard_size
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) >= self._prune_at:
+                    self._prune()
+            return shard
+
+    def _prune(self):
+        """Fold the shards of exited threads into ``_retired``; call with ``_lock`` held."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                # An exited thread never writes its shard again
+                self._retired = [a + b for a, b in zip(self._retired, shard)]
+        self._shards = live
+        # Amortized: prune again once the shard count has doubled
+        self._prune_at = max(self.MIN_PRUNE_AT, 2 * len(live))
+
+    def _collect(self):
+        """Element-wise sum of every thread's shard, exited threads included."""
+        with self._lock:
+            self._prune()
+            shards = [shard for _, shard in self._shards] + [self._retired]
+        return [sum(values) for values in zip(*shards)]
+
+
+class Counter(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self._shard()[0] += amount
+
+    @property
+    def value(self):
+        return self._collect()[0]
+
+
+class Histogram(_Sharded):
+    """
+    Prometheus histogram. A shard holds one count per bucket, one for
+    ``+Inf`` and the running sum.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(len(self.buckets) + 2)
+
+    def observe(self, value):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self):
+        """``(cumulative bucket counts including +Inf, count, sum)``"""
+        collected = self._collect()
+        cumulative, total = [], 0
+        for count in collected[:-1]:
+            total += count
+            cumulative.append(total)
+        return cumulative, total, collected[-1]
+
+
+class _StageTimer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.count_error(self.stage)
+        return False
+
+
+class ModelMetrics:
+    """
+    Request, error and latency metrics of one model.
+
+    Args:
+        name (str): ``model`` label value.
+        artifact_prefix (str): Registry names whose loaded versions are
+            reported for this model (e.g. ``'heart_disease/'``).
+        versions (callable): Returns ``[(artifact, version)]`` for models not
+            loaded through the registry; overrides ``artifact_prefix``.
+    """
+
+    def __init__(self, name, artifact_prefix=None, versions=None):
+        self.name = name
+        self.artifact_prefix = artifact_prefix
+        self._versions = versions
+        self.requests = Counter()
+        self.request_latency = Histogram()
+        self.errors = {}
+        self.latency = {stage: Histogram() for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def _get(self, table, stage, factory):
+        metric = table.get(stage)
+        if metric is None:
+            with self._lock:
+                metric = table.setdefault(stage, factory())
+        return metric
+
+    def time(self, stage):
+        """Context manager recording the duration of ``stage``; an exception counts as an error."""
+        return _StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        self._get(self.latency, stage, Histogram).observe(seconds)
+
+    def count_error(self, stage='request'):
+        self._get(self.errors, stage, Counter).inc()
+
+    def versions(self):
+        if self._versions is not None:
+            return self._versions()
+        if self.artifact_prefix is None:
+            return []
+        return model_registry.versions(self.artifact_prefix)
+
+    def instrument(self, view):
+        """
+        Decorate a view: each non-GET request is counted and timed, and an
+        exception or a 4xx/5xx response counts as a ``request`` error.
+        Rendering the empty form (GET) is not a prediction and is skipped.
+        """
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'GET':
+                return view(request, *args, **kwargs)
+            self.requests.inc()
+            start = time.perf_counter()
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                self.count_error()
+                raise
+            finally:
+                self.request_latency.observe(time.perf_counter() - start)
+            if response.status_code >= 400:
+                self.count_error()
+            return response
+        return wrapper
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def model_metrics(name, artifact_prefix=None, versions=None):
+    """
+    The process-wide metrics of model ``name``, created on first use. A
+    later call may supply the ``artifact_prefix``/``versions`` an earlier
+    lookup by name alone did not.
+    """
+    metrics = _models.get(name)
+    if metrics is None or (artifact_prefix and not metrics.artifact_prefix) or (versions and not metrics._versions):
+        with _models_lock:
+            metrics = _models.get(name)
+            if metrics is None:
+                metrics = _models[name] = ModelMetrics(name, artifact_prefix, versions)
+            metrics.artifact_prefix = metrics.artifact_prefix or artifact_prefix
+            metrics._versions = metrics._versions or versions
+    return metrics
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    """Collects samples grouped by metric family, each family headed by its HELP and TYPE lines."""
+
+    def __init__(self):
+        self.families = {}
+
+    def sample(self, family, kind, help_text, labels, value, suffix=''):
+        lines = self.families.get(family)
+        if lines is None:
+            lines = self.families[family] = [f'# HELP {family} {help_text}', f'# TYPE {family} {kind}']
+        lines.append(f'{family}{suffix}{_labels(**labels)} {_number(value)}')
+
+    def render(self):
+        return ''.join(line + '\n' for lines in self.families.values() for line in lines)
+
+    def histogram(self, family, help_text, labels, histogram):
+        cumulative, count, total = histogram.snapshot()
+        for bound, value in zip(histogram.buckets + ('+Inf',), cumulative):
+            le = bound if isinstance(bound, str) else repr(float(bound))
+            self.sample(family, 'histogram', help_text, dict(labels, le=le), value, '_bucket')
+        self.sample(family, 'histogram', help_text, labels, total, '_sum')
+        self.sample(family, 'histogram', help_text, labels, count, '_count')
+
+
+def render_metrics():
+    """This worker's metrics as a Prometheus text exposition."""
+    out = _Exposition()
+    worker = os.getpid()
+    with _models_lock:
+        models = sorted(_models.values(), key=lambda m: m.name)
+
+    for m in models:
+        out.sample('fitness_model_requests_total', 'counter', 'Prediction requests handled.',
+                   dict(worker=worker, model=m.name), m.requests.value)
+    for m in models:
+        for stage, counter in sorted(m.errors.items()):
+            out.sample('fitness_model_errors_total', 'counter',
+                       'Failed prediction requests (stage=request) and failures inside a stage.',
+                       dict(worker=worker, model=m.name, stage=stage), counter.value)
+    for m in models:
+        out.histogram('fitness_model_request_duration_seconds', 'Wall time of prediction requests.',
+                      dict(worker=worker, model=m.name), m.request_latency)
+    for m in models:
+        for stage, histogram in sorted(m.latency.items()):
+            out.histogram('fitness_model_stage_duration_seconds',
+                          'Time spent per stage of a prediction request.',
+                          dict(worker=worker, model=m.name, stage=stage), histogram)
+    for m in models:
+        for artifact, version in m.versions():
+            out.sample('fitness_model_info', 'gauge', 'Model artifacts currently loaded, with their version.',
+                       dict(worker=worker, model=m.name, artifact=artifact, version=version), 1)
+
+    for stats in cache_stats():
+        labels = dict(worker=worker, cache=stats['name'])
+        out.sample('fitness_prediction_cache_hits_total', 'counter', 'Prediction cache hits.',
+                   labels, stats['hits'])
+        out.sample('fitness_prediction_cache_misses_total', 'counter', 'Prediction cache misses.',
+                   labels, stats['misses'])
+        out.sample('fitness_prediction_cache_evictions_total', 'counter', 'Prediction cache LRU evictions.',
+                   labels, stats['evictions'])
+        out.sample('fitness_prediction_cache_entries', 'gauge', 'Entries in the prediction cache.',
+                   labels, stats['entries'])
+        out.sample('fitness_prediction_cache_hit_ratio', 'gauge', 'Hits / lookups since the worker started.',
+                   labels, float(stats['hit_rate']))
+
+    usda = usda_cache_stats()
+    if usda is not None:
+        for outcome, count in usda['lookups'].items():
+            out.sample('fitness_usda_cache_lookups_total', 'counter',
+                       'USDA search cache lookups by outcome (hit, stale, negative, miss).',
+                       dict(worker=worker, result=outcome), count)
+        out.sample('fitness_usda_cache_refreshes_total', 'counter', 'Background USDA cache refreshes.',
+                   dict(worker=worker, outcome='ok'), usda['refreshes'])
+        out.sample('fitness_usda_cache_refreshes_total', 'counter', 'Background USDA cache refreshes.',
+                   dict(worker=worker, outcome='error'), usda['refresh_errors'])
+        out.sample('fitness_usda_cache_hit_ratio', 'gauge', 'Lookups answered from the cache / all lookups.',
+                   dict(worker=worker), float(usda['hit_rate']))
+
+    for stats in client_stats():
+        labels = dict(worker=worker, client=stats['name'])
+        out.sample('fitness_http_client_calls_total', 'counter', 'Outbound HTTP calls, retries not included.',
+                   labels, stats['calls'])
+        out.sample('fitness_http_client_retries_total', 'counter', 'Retried outbound HTTP attempts.',
+                   labels, stats['retries'])
+        out.sample('fitness_http_client_failures_total', 'counter', 'Outbound HTTP calls that failed after retries.',
+                   labels, stats['failures'])
+        out.sample('fitness_http_client_rejected_total', 'counter', 'Calls refused because the circuit was open.',
+                   labels, stats['rejected'])
+        out.sample('fitness_http_client_circuit_open', 'gauge', '1 while the circuit is open or half-open.',
+                   labels, int(stats['state'] != 'closed'))
+    return out.render()
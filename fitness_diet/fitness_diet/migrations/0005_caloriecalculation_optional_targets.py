@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitness_diet', '0004_userprofile_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='caloriecalculation',
+            name='dream_weight',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='caloriecalculation',
+            name='total_daily_calorie_need',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
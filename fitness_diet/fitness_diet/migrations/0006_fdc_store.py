@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitness_diet', '0005_caloriecalculation_optional_targets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FdcNutrient',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('unit_name', models.CharField(max_length=20)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FdcFood',
+            fields=[
+                ('fdc_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(max_length=500)),
+                ('search_name', models.CharField(max_length=500)),
+                ('data_type', models.CharField(max_length=40)),
+                ('priority', models.SmallIntegerField(default=9)),
+                ('category', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['search_name', 'priority'], name='fdc_food_search_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FdcFoodNutrient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField()),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nutrients', to='fitness_diet.fdcfood')),
+                ('nutrient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='fitness_diet.fdcnutrient')),
+            ],
+            options={
+                'unique_together': {('food', 'nutrient')},
+            },
+        ),
+    ]
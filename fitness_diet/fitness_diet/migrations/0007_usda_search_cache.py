@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitness_diet', '0006_fdc_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsdaSearchResult',
+            fields=[
+                ('query', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
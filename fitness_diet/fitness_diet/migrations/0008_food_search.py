@@ -0,0 +1,39 @@
+# FTS5 index over FoodDatabase names and categories for the meal-swap autocomplete.
+# The SQL is a snapshot: this migration must not follow later changes to fitness_diet.food_search.
+
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS fitness_diet_food_search USING fts5("
+    "name, category, tokenize=\"unicode61 remove_diacritics 2\", prefix='1 2 3')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS fitness_diet_food_search_vocab "
+    "USING fts5vocab(fitness_diet_food_search, 'row')",
+    # Index rowid: name length << 32 | food id
+    "INSERT INTO fitness_diet_food_search(rowid, name, category) "
+    "SELECT (length(name) << 32) | id, name, category FROM fitness_diet_fooddatabase ORDER BY 1",
+)
+DROP_SQL = (
+    "DROP TABLE IF EXISTS fitness_diet_food_search_vocab",
+    "DROP TABLE IF EXISTS fitness_diet_food_search",
+)
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite's; other databases search names with icontains instead
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitness_diet', '0007_usda_search_cache'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,140 @@
+"""
+Self-describing, memory-mappable model bundles.
+
+A bundle is a directory next to the pickle it was built from::
+
+    ml_models/heart_disease/heart_model.bundle/
+        manifest.json
+        threshold.3f2a9c01b7de.npy
+        ...
+
+``manifest.json`` records the bundle format, the model kind, a version, the
+feature order the model expects, the library versions it was exported
+with, the source pickle's SHA-256 and, for every array, its file, dtype,
+shape and SHA-256. Arrays are plain ``.npy`` files opened with
+``mmap_mode='r'``, so a loaded model is backed by the page cache and
+shared between every process that maps it.
+
+Array files are named after their content and the manifest is replaced
+atomically, last. A re-export therefore never rewrites a file another
+worker still has mapped: the registry sees the new manifest and loads the
+new files, and stale files are removed (mapped copies stay readable).
+"""
+
+import hashlib
+import json
+import os
+import platform
+import time
+from importlib import metadata
+
+import numpy as np
+
+from .model_registry import file_sha256
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+BUNDLE_SUFFIX = '.bundle'
+
+
+class BundleError(ValueError):
+    """A bundle is missing files, has been modified, or is of an unknown format."""
+
+
+def bundle_manifest_name(name):
+    """``'heart_disease/heart_model.pkl'`` -> ``'heart_disease/heart_model.bundle/manifest.json'``"""
+    stem = name[:-len('.pkl')] if name.endswith('.pkl') else name
+    return f'{stem}{BUNDLE_SUFFIX}/{MANIFEST}'
+
+
+def _library_versions():
+    versions = {'python': platform.python_version()}
+    for package in ('numpy', 'scikit-learn', 'xgboost'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def write_bundle(manifest_path, kind, arrays, meta, feature_names=None, source_path=None):
+    """
+    Write ``arrays`` (name -> ndarray) and a manifest to the bundle directory
+    of ``manifest_path``. Returns the manifest dict.
+    """
+    directory = os.path.dirname(manifest_path)
+    os.makedirs(directory, exist_ok=True)
+
+    entries = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        digest = hashlib.sha256(array.tobytes()).hexdigest()
+        filename = f'{name}.{digest[:12]}.npy'
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            np.save(path + '.tmp.npy', array)
+            os.replace(path + '.tmp.npy', path)
+        entries[name] = {
+            'file': filename,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'sha256': file_sha256(path),
+        }
+
+    source_sha256 = file_sha256(source_path) if source_path else meta.get('source_sha256')
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'kind': kind,
+        'version': (source_sha256 or hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest())[:12],
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'source': os.path.basename(source_path) if source_path else None,
+        'source_sha256': source_sha256,
+        'feature_names': list(feature_names) if feature_names is not None else None,
+        'libraries': _library_versions(),
+        'meta': {k: v for k, v in meta.items() if k != 'source_sha256'},
+        'arrays': entries,
+    }
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    referenced = {entry['file'] for entry in entries.values()}
+    for filename in os.listdir(directory):
+        if filename.endswith('.npy') and filename not in referenced:
+            os.remove(os.path.join(directory, filename))
+    return manifest
+
+
+def read_bundle(manifest_path, kind=None, verify=True):
+    """
+    Return ``(manifest, arrays)`` with every array memory-mapped read-only.
+
+    With ``verify`` every array file is checked against the manifest's
+    SHA-256, dtype and shape before use.
+
+    Raises:
+        BundleError: If the bundle is incomplete, modified or not ``kind``.
+        FileNotFoundError: If the manifest does not exist.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise BundleError(f"{manifest_path}: unsupported bundle format {manifest.get('format_version')}")
+    if kind is not None and manifest.get('kind') != kind:
+        raise BundleError(f"{manifest_path}: expected a {kind} bundle, found {manifest.get('kind')}")
+
+    directory = os.path.dirname(manifest_path)
+    arrays = {}
+    for name, entry in manifest['arrays'].items():
+        path = os.path.join(directory, entry['file'])
+        if not os.path.exists(path):
+            raise BundleError(f"{manifest_path}: missing array file {entry['file']}")
+        if verify and file_sha256(path) != entry['sha256']:
+            raise BundleError(f"{manifest_path}: checksum mismatch for {entry['file']}")
+        array = np.load(path, mmap_mode='r', allow_pickle=False)
+        if array.dtype.str != entry['dtype'] or list(array.shape) != entry['shape']:
+            raise BundleError(f"{manifest_path}: {entry['file']} is {array.dtype.str}{list(array.shape)}, "
+                              f"expected {entry['dtype']}{entry['shape']}")
+        arrays[name] = array
+    return manifest, arrays
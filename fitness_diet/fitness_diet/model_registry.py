@@ -0,0 +1,250 @@
+"""
+Process-wide registry for the pickled artifacts under ``ml_models/``.
+
+Every artifact is unpickled at most once per worker. On each lookup the
+registry compares the file's mtime and size against the loaded copy and,
+when the file has changed on disk, loads the new version and swaps it in
+atomically so running requests keep the object they already hold.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import joblib
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """A single loaded artifact plus the bookkeeping used for reloads and reports."""
+
+    __slots__ = ('name', 'path', 'obj', 'mtime_ns', 'size', 'sha256',
+                 'load_seconds', 'memory_bytes', 'loaded_at', 'checked_at')
+
+    def __init__(self, name, path, obj, mtime_ns, size, sha256, load_seconds, memory_bytes):
+        self.name = name
+        self.path = path
+        self.obj = obj
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.checked_at = time.monotonic()
+
+    @property
+    def version(self):
+        """Short content hash identifying this copy of the artifact."""
+        return self.sha256[:12]
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'version': self.version,
+            'sha256': self.sha256,
+            'size_bytes': self.size,
+            'load_seconds': round(self.load_seconds, 4),
+            'memory_bytes': self.memory_bytes,
+            'loaded_at': self.loaded_at,
+        }
+
+
+def _rss_bytes():
+    """Resident set size of this process, or ``None`` where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Load-once cache of model artifacts keyed by their path relative to ``root``.
+
+    Args:
+        root (str): Directory the artifact names are relative to.
+        check_interval (float): Minimum seconds between two on-disk freshness
+            checks of the same artifact. ``0`` checks on every lookup.
+    """
+
+    def __init__(self, root, check_interval=2.0):
+        self.root = str(root)
+        self.check_interval = check_interval
+        self._models = {}
+        self._loaders = {}
+        # export name -> (source mtime_ns, source size, export object, checksum matches)
+        self._export_checks = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def path_for(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def register_loader(self, name, loader):
+        """Use ``loader(path)`` instead of ``joblib.load`` for ``name``."""
+        self._loaders[name] = loader
+
+    def add_listener(self, callback):
+        """
+        Call ``callback(name)`` whenever a loaded artifact is replaced by a new
+        version, and ``callback(None)`` when the registry is cleared.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, name):
+        for callback in self._listeners:
+            try:
+                callback(name)
+            except Exception:
+                logger.exception("Model registry listener failed for %s", name)
+
+    def get(self, name, loader=None):
+        """
+        Return the loaded object for ``name``, loading or reloading it if needed.
+
+        ``loader`` overrides the registered (or default ``joblib.load``) loader
+        and is remembered for later reloads and :meth:`preload`.
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist on disk.
+        """
+        if loader is not None and self._loaders.get(name) is not loader:
+            self._loaders[name] = loader
+        entry = self._models.get(name)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry.obj
+
+        path = self.path_for(name)
+        stat = os.stat(path)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            entry.checked_at = time.monotonic()
+            return entry.obj
+
+        with self._lock:
+            # Another thread may have finished the same load while we waited.
+            current = self._models.get(name)
+            if current is not None and current is not entry:
+                return current.obj
+            new_entry = self._load(name, path, stat, self._loaders.get(name, joblib.load))
+            self._models[name] = new_entry
+
+        if entry is not None:
+            logger.info("Reloaded model %s (%s -> %s)", name, entry.version, new_entry.version)
+            self._notify(name)
+        return new_entry.obj
+
+    def get_export(self, name, source_name, loader):
+        """
+        Return the compiled export ``name`` of the artifact ``source_name``, or
+        ``None`` when it was built from a different version of the source.
+
+        Exports carry the ``source_sha256`` of the file they were built from.
+        The source is re-hashed only when its mtime or size changes, and an
+        export deployed without its source is trusted as is.
+
+        An export the loader rejects with ``ValueError`` (e.g. a failed
+        checksum) is logged and treated like a stale one.
+
+        Raises:
+            FileNotFoundError: If the export does not exist on disk.
+        """
+        try:
+            export = self.get(name, loader=loader)
+        except ValueError as e:
+            logger.warning("Ignoring export %s: %s", name, e)
+            return None
+        source_path = self.path_for(source_name)
+        try:
+            stat = os.stat(source_path)
+        except FileNotFoundError:
+            return export
+
+        signature = (stat.st_mtime_ns, stat.st_size, export)
+        checked = self._export_checks.get(name)
+        if checked is None or checked[:3] != signature:
+            matches = export.source_sha256 == file_sha256(source_path)
+            if not matches:
+                logger.warning("%s is stale for %s; using the source until it is re-exported",
+                               name, source_name)
+            checked = self._export_checks[name] = signature + (matches,)
+        return export if checked[3] else None
+
+    def _load(self, name, path, stat, loader):
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        obj = loader(path)
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        # RSS growth is an approximation: allocator reuse can hide some of it
+        memory_bytes = max(rss_after - rss_before, 0) if rss_before is not None else None
+
+        entry = LoadedModel(
+            name=name,
+            path=path,
+            obj=obj,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=file_sha256(path),
+            load_seconds=load_seconds,
+            memory_bytes=memory_bytes,
+        )
+        logger.info("Loaded model %s version %s in %.3fs (RSS +%s bytes)",
+                    name, entry.version, load_seconds, entry.memory_bytes)
+        return entry
+
+    def version(self, name):
+        """Version string of the currently loaded copy of ``name``, or ``None``."""
+        entry = self._models.get(name)
+        return entry.version if entry is not None else None
+
+    def versions(self, prefix=''):
+        """``(name, version)`` pairs of the loaded artifacts whose name starts with ``prefix``."""
+        return tuple(sorted((name, entry.version) for name, entry in list(self._models.items())
+                            if name.startswith(prefix)))
+
+    def preload(self, names=None):
+        """Load every ``.pkl`` under ``root`` (or just ``names``) and return their stats."""
+        if names is None:
+            names = []
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in sorted(filenames):
+                    if filename.endswith('.pkl'):
+                        rel = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                        names.append(rel.replace(os.sep, '/'))
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning("Could not preload model %s: %s", name, e)
+        return self.stats()
+
+    def stats(self):
+        """Load time, memory and version for every loaded artifact."""
+        return [entry.as_dict() for entry in sorted(self._models.values(), key=lambda e: e.name)]
+
+    def clear(self):
+        with self._lock:
+            self._models = {}
+            self._export_checks = {}
+        self._notify(None)
+
+
+model_registry = ModelRegistry(
+    os.path.join(settings.BASE_DIR, 'ml_models'),
+    check_interval=getattr(settings, 'MODEL_REGISTRY_CHECK_INTERVAL', 2.0),
+)
@@ -126,8 +126,8 @@ class CalorieCalculation(models.Model):
     age = models.IntegerField()
     height = models.FloatField()
     actual_weight = models.FloatField()
-    dream_weight = models.FloatField()
-    total_daily_calorie_need = models.FloatField()
+    dream_weight = models.FloatField(null=True, blank=True)
+    total_daily_calorie_need = models.FloatField(null=True, blank=True)
     calories_burned = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -164,3 +164,49 @@ class HealthAssessment(models.Model):
 
     def __str__(self):
         return f"{self.assessment_type} Assessment - {self.risk_level} risk"
+
+class FdcNutrient(models.Model):
+    # USDA FoodData Central nutrient id, e.g. 1008 = Energy (kcal), 1003 = Protein
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    unit_name = models.CharField(max_length=20)
+
+    def __str__(self):
+        return f"{self.name} ({self.unit_name})"
+
+class FdcFood(models.Model):
+    fdc_id = models.IntegerField(primary_key=True)
+    description = models.CharField(max_length=500)
+    # Lowercased description with punctuation collapsed to single spaces, for indexed lookups
+    search_name = models.CharField(max_length=500)
+    data_type = models.CharField(max_length=40)
+    # Preferred match when several foods share a name: foundation < SR legacy < survey < branded
+    priority = models.SmallIntegerField(default=9)
+    category = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['search_name', 'priority'], name='fdc_food_search_idx')]
+
+    def __str__(self):
+        return f"{self.description} (FDC {self.fdc_id})"
+
+class FdcFoodNutrient(models.Model):
+    food = models.ForeignKey(FdcFood, on_delete=models.CASCADE, related_name='nutrients')
+    nutrient = models.ForeignKey(FdcNutrient, on_delete=models.CASCADE)
+    amount = models.FloatField()  # per 100 g
+
+    class Meta:
+        unique_together = ['food', 'nutrient']
+
+    def __str__(self):
+        return f"{self.food_id}: {self.nutrient_id} = {self.amount}"
+
+class UsdaSearchResult(models.Model):
+    # Normalized query (fdc_store.search_name) sent to the USDA search API
+    query = models.CharField(max_length=200, primary_key=True)
+    # The nutrition dict of the best match; null when USDA found nothing (negative entry)
+    result = models.JSONField(null=True, blank=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"USDA search {self.query!r} ({'found' if self.result else 'not found'})"
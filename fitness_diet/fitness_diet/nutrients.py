@@ -0,0 +1,107 @@
+"""
+Nutrient extraction for the food recognition paths.
+
+Every nutrition source (the local FDC tables, a USDA search response, the
+precomputed label map, the USDA search cache) becomes a :class:`Nutrients`
+record. Values are picked by FDC nutrient id, never by matching nutrient
+names ("Fat" would also match "Fatty acids, total saturated"). Views format
+a record for display with :meth:`Nutrients.display` and store its numbers
+directly, so nothing is formatted into a string and parsed back.
+
+Amounts are per 100 g, as in FDC.
+"""
+
+# FDC nutrient ids. Foundation foods report energy as Atwater factors
+# (2047/2048) instead of 1008.
+ENERGY_IDS = (1008, 2047, 2048)
+PROTEIN_ID = 1003
+FAT_ID = 1004
+CARBS_ID = 1005
+EXTRACTED_IDS = frozenset(ENERGY_IDS + (PROTEIN_ID, FAT_ID, CARBS_ID))
+
+NOT_FOUND = 'Not found'
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+class Nutrients:
+    """
+    Calories (kcal), protein, carbs and fat (g) per 100 g of one food;
+    ``None`` where FDC has no value.
+
+    ``fdc_id`` and ``description`` identify the matched food, ``source`` is
+    ``'local'`` (the FDC store) or ``'remote'`` (the USDA API).
+    """
+
+    __slots__ = ('fdc_id', 'description', 'calories', 'protein', 'carbs', 'fat', 'source')
+    FIELDS = __slots__
+
+    def __init__(self, fdc_id=None, description='', calories=None, protein=None, carbs=None, fat=None,
+                 source='local'):
+        self.fdc_id = None if fdc_id is None else int(fdc_id)
+        self.description = description
+        self.calories = _number(calories)
+        self.protein = _number(protein)
+        self.carbs = _number(carbs)
+        self.fat = _number(fat)
+        self.source = source
+
+    @classmethod
+    def from_amounts(cls, amounts, fdc_id=None, description='', source='local'):
+        """From ``{nutrient_id: amount}``."""
+        calories = next((amounts[i] for i in ENERGY_IDS if amounts.get(i) is not None), None)
+        return cls(fdc_id, description, calories, amounts.get(PROTEIN_ID), amounts.get(CARBS_ID),
+                   amounts.get(FAT_ID), source)
+
+    @classmethod
+    def from_search_food(cls, food, source='remote'):
+        """
+        From one entry of a USDA ``foods/search`` response's ``foods`` list
+        (``foodNutrients`` of ``{nutrientId, unitName, value}``). Energy
+        reported in kJ is skipped; the first value of a nutrient wins.
+        """
+        amounts = {}
+        for nutrient in food.get('foodNutrients', ()):
+            nutrient_id = nutrient.get('nutrientId')
+            # Foods list ~60 nutrients; skip the ones not shown before looking further
+            if nutrient_id not in EXTRACTED_IDS or nutrient_id in amounts:
+                continue
+            value = nutrient.get('value')
+            if value is None:
+                continue
+            if nutrient_id in ENERGY_IDS and 'kcal' not in str(nutrient.get('unitName', '')).lower():
+                continue
+            amounts[nutrient_id] = value
+        return cls.from_amounts(amounts, food.get('fdcId'), food.get('description', ''), source)
+
+    @classmethod
+    def from_dict(cls, record):
+        """From :meth:`as_dict` output (JSON artifacts, cache rows); unknown keys are ignored."""
+        return cls(**{field: record[field] for field in cls.FIELDS if field in record})
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def display(self):
+        """The values as the recognition pages show them: ``'52.0 kcal'``, ``'0.3g'`` or ``'Not found'``."""
+        return {
+            'calories': NOT_FOUND if self.calories is None else f"{self.calories} kcal",
+            'protein': NOT_FOUND if self.protein is None else f"{self.protein}g",
+            'carbs': NOT_FOUND if self.carbs is None else f"{self.carbs}g",
+            'fat': NOT_FOUND if self.fat is None else f"{self.fat}g",
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Nutrients):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    def __repr__(self):
+        return f"Nutrients({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+
+def display(nutrients):
+    """:meth:`Nutrients.display` that also accepts ``None`` (nothing found)."""
+    return (nutrients or Nutrients()).display()
@@ -0,0 +1,129 @@
+"""
+Memoized model outputs for the single-row prediction endpoints.
+
+The heart, lung, calorie-burn and weight-change models are deterministic,
+and users resubmit the same inputs often: page refreshes, untouched form
+defaults, or changing one field and going back. A :class:`PredictionCache`
+sits in front of one model. Keys are the canonical feature vector plus the
+versions of the model's loaded artifacts. Entries are kept in LRU order
+up to ``max_entries`` and expire after ``ttl`` seconds. The cache is
+emptied whenever the model registry swaps in a new artifact under the
+model's directory.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from .model_registry import model_registry
+
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache of model outputs keyed by feature vector.
+
+    Args:
+        name (str): Label used in reports.
+        artifact_prefix (str): Registry names the model depends on
+            (e.g. ``'heart_disease/'``). Their versions are part of every
+            key, and reloading any of them clears the cache.
+        max_entries (int): LRU capacity.
+        ttl (float): Seconds an entry stays valid; ``0`` disables expiry.
+        quantum (float): When set, features are rounded to multiples of it
+            before lookup *and* before scoring, so near-identical inputs
+            share one entry and one answer.
+        registry (ModelRegistry): Registry the model is loaded from.
+    """
+
+    def __init__(self, name, artifact_prefix, max_entries=1024, ttl=300.0, quantum=None, registry=None):
+        self.name = name
+        self.artifact_prefix = artifact_prefix
+        self.registry = registry or model_registry
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.quantum = quantum or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def canonicalize(self, features):
+        """Float64 copy of ``features``, quantized if configured, with ``-0.0`` folded into ``0.0``."""
+        X = np.array(features, dtype=np.float64)
+        if self.quantum:
+            # The second round keeps e.g. 37.3 from becoming 37.300000000000004
+            X = np.round(np.round(X / self.quantum) * self.quantum, 12)
+        return X + 0.0
+
+    def predict(self, features, compute):
+        """
+        Return ``compute(canonical_features)``, reusing the cached result for
+        identical canonical features and model versions.
+        """
+        X = self.canonicalize(features)
+        key = (self.registry.versions(self.artifact_prefix), X.shape, X.tobytes())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl or now - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute(X)
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, name=None):
+        """Registry listener: drop everything when an artifact of this model changes."""
+        if name is None or name.startswith(self.artifact_prefix):
+            with self._lock:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+_caches = {}
+
+
+def prediction_cache(name, artifact_prefix):
+    """The process-wide cache ``name``, created from settings on first use."""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = PredictionCache(
+            name,
+            artifact_prefix,
+            max_entries=getattr(settings, 'PREDICTION_CACHE_MAX_ENTRIES', 1024),
+            ttl=getattr(settings, 'PREDICTION_CACHE_TTL', 300.0),
+            quantum=getattr(settings, 'PREDICTION_CACHE_QUANTUM', 0.0),
+        )
+        cache.registry.add_listener(cache.invalidate)
+    return cache
+
+
+def cache_stats():
+    """Hit/miss counters for every prediction cache."""
+    return [cache.stats() for _, cache in sorted(_caches.items())]
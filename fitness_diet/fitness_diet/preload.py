@@ -0,0 +1,62 @@
+"""
+Load every model before gunicorn forks its workers.
+
+With ``preload_app`` the master imports the project, and
+:func:`preload_models` then loads every ``ml_models/`` artifact plus the
+derived engines (flattened trees, fused weight-change model, heart encoder,
+calorie lookup table, food label nutrition map). Forked workers inherit
+those pages copy-on-write, so N workers share one copy instead of holding N.
+
+CPython's refcounting and cyclic GC write to every object they touch,
+which would gradually copy the shared pages into each worker.
+:func:`freeze_heap` moves everything allocated so far into the permanent
+generation so the collector leaves it alone.
+
+Only load here, never predict: starting OpenMP or BLAS thread pools in the
+master before forking can deadlock the workers.
+"""
+
+import gc
+import logging
+import time
+from importlib import import_module
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def preload_models():
+    """Load all artifacts and derived engines into this process; returns the registry stats."""
+    start = time.perf_counter()
+    # The view modules register custom loaders and create the prediction caches on import
+    import_module(settings.ROOT_URLCONF)
+
+    from .feature_encoders import get_heart_encoder
+    from .food_label_map import get_label_map
+    from .model_registry import model_registry
+    from .surrogate_table import get_calorie_table
+    from .tabular_models import TABULAR_MODELS
+
+    model_registry.preload()
+    for spec in TABULAR_MODELS.values():
+        try:
+            spec.load()
+        except Exception as e:
+            logger.warning("Could not preload %s: %s", spec.name, e)
+    for loader in (get_heart_encoder, get_calorie_table, get_label_map):
+        try:
+            loader()
+        except Exception as e:
+            logger.warning("Could not preload %s: %s", loader.__name__, e)
+
+    stats = model_registry.stats()
+    logger.info("Preloaded %d model artifacts in %.2fs", len(stats), time.perf_counter() - start)
+    return stats
+
+
+def freeze_heap():
+    """Collect garbage once, then exempt every surviving object from future collections."""
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
@@ -184,3 +184,77 @@ SOCIALACCOUNT_PROVIDERS = {
 
 # Custom adapter to handle MultipleObjectsReturned
 SOCIALACCOUNT_ADAPTER = 'fitness_diet.adapters.CustomSocialAccountAdapter'
+
+# ML model registry: minimum seconds between on-disk freshness checks of a loaded artifact
+MODEL_REGISTRY_CHECK_INTERVAL = float(os.environ.get('MODEL_REGISTRY_CHECK_INTERVAL', '2.0'))
+
+# Food image classifier: Hugging Face hub id or a local model directory (e.g. for offline tests)
+FOOD_CLASSIFIER_MODEL = os.environ.get('FOOD_CLASSIFIER_MODEL', 'nateraw/food')
+# Build and run the classifier once when a gunicorn worker boots instead of on the first upload
+FOOD_CLASSIFIER_WARMUP = os.environ.get('FOOD_CLASSIFIER_WARMUP', 'False').lower() in ('true', '1', 'yes')
+# Unix socket of the batching inference sidecar (manage.py run_inference_server); empty = classify in-process
+FOOD_INFERENCE_SOCKET = os.environ.get('FOOD_INFERENCE_SOCKET', '')
+FOOD_INFERENCE_TIMEOUT = float(os.environ.get('FOOD_INFERENCE_TIMEOUT', '30'))
+FOOD_INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('FOOD_INFERENCE_MAX_BATCH_SIZE', '8'))
+FOOD_INFERENCE_MAX_WAIT_MS = float(os.environ.get('FOOD_INFERENCE_MAX_WAIT_MS', '5'))
+# Longer side web workers shrink uploads to before sending them, and the largest image (width * height) the sidecar accepts
+FOOD_INFERENCE_MAX_SIDE = int(os.environ.get('FOOD_INFERENCE_MAX_SIDE', '448'))
+FOOD_INFERENCE_MAX_PIXELS = int(os.environ.get('FOOD_INFERENCE_MAX_PIXELS', str(1024 * 1024)))
+
+# Largest number of records accepted by /api/predict/<model>/batch
+BATCH_PREDICTION_MAX_RECORDS = int(os.environ.get('BATCH_PREDICTION_MAX_RECORDS', '1000'))
+
+# Largest batch scored by the flattened tree engine (manage.py export_tree_models); bigger batches use the pickle
+TREE_ENGINE_MAX_BATCH = int(os.environ.get('TREE_ENGINE_MAX_BATCH', '64'))
+
+# Longest plan accepted by /api/predict/weight_change/trajectory
+WEIGHT_TRAJECTORY_MAX_WEEKS = int(os.environ.get('WEIGHT_TRAJECTORY_MAX_WEEKS', '520'))
+
+# Largest grid (product of the axis lengths) accepted by /api/calories-burnt/sweep
+CALORIE_SWEEP_MAX_POINTS = int(os.environ.get('CALORIE_SWEEP_MAX_POINTS', '10000'))
+# Answer calories_burnt_predictor from the interpolated table (manage.py build_calorie_table) when the input is on its grid
+CALORIE_BURN_LOOKUP_TABLE = os.environ.get('CALORIE_BURN_LOOKUP_TABLE', 'False').lower() in ('true', '1', 'yes')
+
+# Memoized single-row predictions (heart, lung, calorie burn, weight change): LRU size per model and entry lifetime in seconds
+PREDICTION_CACHE_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', '1024'))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '300'))
+# Round features to multiples of this before caching and scoring (e.g. 0.1); 0 = exact inputs only
+PREDICTION_CACHE_QUANTUM = float(os.environ.get('PREDICTION_CACHE_QUANTUM', '0'))
+
+# USDA FoodData Central: nutrients come from the local store (manage.py import_fdc) first, then the API if enabled
+USDA_API_KEY = os.environ.get('USDA_API_KEY', '')
+USDA_LOCAL_STORE = os.environ.get('USDA_LOCAL_STORE', 'True').lower() in ('true', '1', 'yes')
+USDA_REMOTE_FALLBACK = os.environ.get('USDA_REMOTE_FALLBACK', 'True').lower() in ('true', '1', 'yes')
+USDA_API_TIMEOUT = float(os.environ.get('USDA_API_TIMEOUT', '5'))
+USDA_API_URL = os.environ.get('USDA_API_URL', 'https://api.nal.usda.gov/fdc/v1/foods/search')
+# Persistent USDA search cache: seconds a result (and a "not found") stays fresh, then how long past that
+# it is still served while being refreshed in the background
+USDA_CACHE_TTL = float(os.environ.get('USDA_CACHE_TTL', '604800'))
+USDA_CACHE_NEGATIVE_TTL = float(os.environ.get('USDA_CACHE_NEGATIVE_TTL', '86400'))
+USDA_CACHE_STALE_TTL = float(os.environ.get('USDA_CACHE_STALE_TTL', '2592000'))
+# Distinct foods pre-warmed by the FoodRecognition admin action
+USDA_CACHE_WARM_LABELS = int(os.environ.get('USDA_CACHE_WARM_LABELS', '50'))
+
+# Outbound HTTP (fitness_diet.http_client): connect timeout, retries of failed attempts and their backoff base in
+# seconds, keep-alive connections per host, and the circuit breaker (failed calls to open it, seconds until a trial)
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CLIENT_CONNECT_TIMEOUT', '3.05'))
+HTTP_CLIENT_RETRIES = int(os.environ.get('HTTP_CLIENT_RETRIES', '2'))
+HTTP_CLIENT_BACKOFF = float(os.environ.get('HTTP_CLIENT_BACKOFF', '0.2'))
+HTTP_CLIENT_POOL_SIZE = int(os.environ.get('HTTP_CLIENT_POOL_SIZE', '10'))
+HTTP_CLIENT_BREAKER_FAILURES = int(os.environ.get('HTTP_CLIENT_BREAKER_FAILURES', '5'))
+HTTP_CLIENT_BREAKER_RESET = float(os.environ.get('HTTP_CLIENT_BREAKER_RESET', '30'))
+
+# Food recognition: classifier candidates returned per image, and threads resolving their nutrition concurrently
+FOOD_RECOGNITION_CANDIDATES = int(os.environ.get('FOOD_RECOGNITION_CANDIDATES', '3'))
+FOOD_LOOKUP_THREADS = int(os.environ.get('FOOD_LOOKUP_THREADS', '4'))
+
+# Meal-swap food search: seconds a worker keeps the index vocabulary used for typo corrections
+FOOD_SEARCH_VOCAB_TTL = float(os.environ.get('FOOD_SEARCH_VOCAB_TTL', '300'))
+
+# Similar-food swap suggestions: share of the catalog changed before the nearest-neighbour index is rebuilt,
+# and seconds before a worker rebuilds it anyway to pick up other workers' changes
+FOOD_SWAPS_REBUILD_FRACTION = float(os.environ.get('FOOD_SWAPS_REBUILD_FRACTION', '0.05'))
+FOOD_SWAPS_MAX_AGE = float(os.environ.get('FOOD_SWAPS_MAX_AGE', '600'))
+
+# Rule-based diet plans: seconds a worker keeps its columnar food catalog before reloading other workers' changes
+FOOD_CATALOG_MAX_AGE = float(os.environ.get('FOOD_CATALOG_MAX_AGE', '600'))
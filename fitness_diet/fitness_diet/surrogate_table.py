@@ -0,0 +1,130 @@
+"""
+Lookup-table surrogate for the calorie-burn model.
+
+The model has seven bounded inputs, so it can be tabulated once on a
+regular grid and then answered by multilinear interpolation between the
+``2**7`` surrounding grid points. That is a few small NumPy operations,
+with no tree walk at all.
+
+``manage.py build_calorie_table`` writes the grid as a bundle (see
+``model_bundle``) whose values are memory-mapped at load time, so workers
+share the pages. Its manifest holds the grid bounds, the source pickle's
+SHA-256 and the error measured on a holdout. Interpolating across the
+booster's steps is approximate, so the table answers only inside its
+bounds and only when ``settings.CALORIE_BURN_LOOKUP_TABLE`` is on.
+"""
+
+import itertools
+
+import numpy as np
+
+from .model_bundle import read_bundle, write_bundle
+from .model_registry import model_registry
+
+BUNDLE_KIND = 'lookup_table'
+CALORIE_MODEL = 'calories_burnt/calorie_burn_model.pkl'
+CALORIE_TABLE = 'calories_burnt/calorie_burn_lut.bundle/manifest.json'
+
+# Per column: lower bound, upper bound, grid points. The bounds cover the
+# model's split thresholds. Gender is 0/1, so its two points are exact.
+CALORIE_GRID = [
+    ('gender', 0, 1, 2),
+    ('age', 20, 80, 13),
+    ('height', 130, 225, 6),
+    ('weight', 35, 130, 6),
+    ('duration', 1, 30, 30),
+    ('heart_rate', 65, 130, 14),
+    ('body_temp', 37.0, 41.5, 10),
+]
+
+
+class LookupTable:
+    """
+    Model outputs on a regular grid, interpolated multilinearly.
+
+    Args:
+        values (ndarray): Outputs at every grid point, one axis per column.
+        lower (list[float]): Value of each column at its first grid point.
+        upper (list[float]): Value of each column at its last grid point.
+        columns (list[str]): Column names, in the model's order.
+        errors (dict): Holdout error measured when the table was built.
+    """
+
+    def __init__(self, values, lower, upper, columns, source_sha256=None, errors=None):
+        self.values = values
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.columns = list(columns)
+        self.source_sha256 = source_sha256
+        self.errors = errors or {}
+
+        shape = np.array(values.shape)
+        self._last_cell = shape - 2
+        self._step = (self.upper - self.lower) / (shape - 1)
+        strides = np.array(values.strides) // values.itemsize
+        self._strides = strides
+        # Every corner of a grid cell as 0/1 offsets, and as flat index offsets
+        self._corners = np.array(list(itertools.product((0, 1), repeat=values.ndim)), dtype=bool)
+        self._corner_offsets = self._corners.astype(np.intp) @ strides
+        self._flat = values.reshape(-1)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def contains(self, X):
+        """Boolean mask of the rows that lie inside the grid."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        return ((X >= self.lower) & (X <= self.upper)).all(axis=1)
+
+    def predict(self, X):
+        """Interpolated outputs; rows outside the grid are clamped to its edge."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        position = (np.clip(X, self.lower, self.upper) - self.lower) / self._step
+        cell = np.minimum(position.astype(np.intp), self._last_cell)
+        fraction = position - cell
+
+        # (n_rows, n_corners) weights: product of t or (1 - t) per column
+        weights = np.where(self._corners[None], fraction[:, None, :], 1.0 - fraction[:, None, :]).prod(axis=2)
+        index = (cell @ self._strides)[:, None] + self._corner_offsets[None]
+        return (weights * self._flat.take(index)).sum(axis=1)
+
+    @classmethod
+    def build(cls, model, grid, source_sha256=None, chunk_rows=500000):
+        """Tabulate ``model.predict`` on ``grid`` (``[(column, lower, upper, points)]``)."""
+        columns = [column for column, _, _, _ in grid]
+        axes = [np.linspace(lower, upper, points) for _, lower, upper, points in grid]
+        shape = tuple(len(axis) for axis in axes)
+        values = np.empty(int(np.prod(shape)), dtype=np.float32)
+        for start in range(0, len(values), chunk_rows):
+            flat_index = np.arange(start, min(start + chunk_rows, len(values)))
+            X = np.column_stack([axis[i] for axis, i in zip(axes, np.unravel_index(flat_index, shape))])
+            values[start:start + len(X)] = model.predict(X)
+        return cls(values.reshape(shape), [axis[0] for axis in axes], [axis[-1] for axis in axes],
+                   columns, source_sha256)
+
+    def save(self, path, source_path=None):
+        """Write a ``lookup_table`` bundle whose manifest is ``path``, built from the pickle ``source_path``."""
+        meta = {
+            'lower': self.lower.tolist(),
+            'upper': self.upper.tolist(),
+            'errors': self.errors,
+            'source_sha256': self.source_sha256,
+        }
+        return write_bundle(path, BUNDLE_KIND, {'values': self.values}, meta, feature_names=self.columns,
+                            source_path=source_path)
+
+    @classmethod
+    def load(cls, path):
+        manifest, arrays = read_bundle(path, kind=BUNDLE_KIND)
+        meta = manifest['meta']
+        return cls(arrays['values'], meta['lower'], meta['upper'], manifest['feature_names'],
+                   manifest['source_sha256'], meta.get('errors'))
+
+
+def get_calorie_table():
+    """The calorie-burn table if it is built and matches the current model, else ``None``."""
+    try:
+        return model_registry.get_export(CALORIE_TABLE, CALORIE_MODEL, loader=LookupTable.load)
+    except FileNotFoundError:
+        return None
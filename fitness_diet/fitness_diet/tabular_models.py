@@ -0,0 +1,234 @@
+"""
+Batch scoring for the tabular models (heart, lung, calorie-burn, weight-change).
+
+Each :class:`TabularModel` turns a list of JSON records into one NumPy
+matrix, scores the whole matrix with a single model call and persists the
+results with one ``bulk_create``. Field names and defaults match the
+single-row views so a record scores the same through either path.
+"""
+
+import abc
+
+import numpy as np
+
+from .models import CalorieCalculation, HealthAssessment, WeightPrediction
+from .model_registry import model_registry
+from .feature_encoders import get_heart_encoder, predict_with_proba
+from .linear_engine import WEIGHT_CHANGE_MODEL, get_linear_model
+from .tree_engine import get_tree_model
+
+ACTIVITY_LEVELS = {
+    'sedentary': 0,
+    'lightly_active': 1,
+    'moderately_active': 2,
+    'very_active': 3,
+    'extremely_active': 4,
+}
+
+
+class TabularModel(abc.ABC):
+    """Encode, score and persist a batch of records for one model."""
+
+    name = None
+    artifact = None
+    # Serve from the flattened tree engine when an export exists
+    tree_ensemble = False
+
+    def load(self, batch_size=1):
+        if self.tree_ensemble:
+            return get_tree_model(self.artifact, batch_size)
+        return model_registry.get(self.artifact)
+
+    @abc.abstractmethod
+    def encode(self, records):
+        """Return a ``(len(records), n_features)`` float matrix."""
+
+    @abc.abstractmethod
+    def predict(self, model, X):
+        """Return one JSON-serialisable result dict per row of ``X``."""
+
+    @abc.abstractmethod
+    def build_rows(self, records, results):
+        """Return unsaved model instances for ``bulk_create``."""
+
+    def persist(self, records, results):
+        rows = self.build_rows(records, results)
+        if rows:
+            rows[0].__class__.objects.bulk_create(rows)
+        return len(rows)
+
+
+class HeartDiseaseModel(TabularModel):
+    name = 'heart_disease'
+    artifact = 'heart_disease/heart_model.pkl'
+    tree_ensemble = True
+
+    HIGH_RISK_ADVICE = "Consult a cardiologist immediately. Monitor blood pressure, cholesterol, and maintain a heart-healthy diet."
+    LOW_RISK_ADVICE = "Continue regular health check-ups and maintain a healthy lifestyle."
+
+    def encode(self, records):
+        return get_heart_encoder().encode_batch(records)
+
+    def predict(self, model, X):
+        labels, proba = predict_with_proba(model, X)
+        positive = list(model.classes_).index(1)
+        results = []
+        for label, p in zip(labels, proba[:, positive]):
+            prediction = int(label)
+            results.append({
+                'prediction': prediction,
+                'probability': round(float(p) * 100, 2),
+                'risk_level': 'High' if prediction == 1 else 'Low',
+                'message': 'Heart disease detected' if prediction == 1 else 'No heart disease detected',
+            })
+        return results
+
+    def build_rows(self, records, results):
+        return [
+            HealthAssessment(
+                assessment_type='heart_disease',
+                risk_level=result['risk_level'],
+                probability=result['probability'],
+                recommendations=self.HIGH_RISK_ADVICE if result['prediction'] == 1 else self.LOW_RISK_ADVICE,
+            )
+            for result in results
+        ]
+
+
+class LungDiseaseModel(TabularModel):
+    name = 'lung_disease'
+    artifact = 'lung_disease/lungs_model.pkl'
+    tree_ensemble = True
+
+    # (JSON field, default) in the column order the model was trained on
+    FIELDS = [
+        ('age', 50), ('gender', 1), ('air_pollution', 2), ('alcohol_use', 1),
+        ('dust_allergy', 2), ('occupational_hazards', 1), ('genetic_risk', 1),
+        ('chronic_lung_disease', 0), ('balanced_diet', 1), ('obesity', 0),
+        ('smoking', 1), ('passive_smoker', 0), ('chest_pain', 1),
+        ('coughing_blood', 0), ('fatigue', 1), ('weight_loss', 0),
+        ('shortness_breath', 1), ('wheezing', 0), ('swallowing_diff', 1),
+        ('clubbing_nails', 0), ('frequent_cold', 1), ('dry_cough', 1), ('snoring', 0),
+    ]
+    RISK_LEVELS = ['Low', 'Medium', 'High']
+
+    HIGH_RISK_ADVICE = "Quit smoking, avoid pollutants, consult a pulmonologist, and practice breathing exercises."
+    LOW_RISK_ADVICE = "Maintain good air quality, avoid smoking, and have regular check-ups."
+
+    def encode(self, records):
+        X = np.empty((len(records), len(self.FIELDS)))
+        for i, data in enumerate(records):
+            X[i, 0] = float(data.get('age', 50))
+            for j, (field, default) in enumerate(self.FIELDS[1:], start=1):
+                X[i, j] = int(data.get(field, default))
+        return X
+
+    def predict(self, model, X):
+        labels, proba = predict_with_proba(model, X)
+        high = proba[:, 2] if proba.shape[1] > 2 else proba[:, -1]
+        results = []
+        for label, p in zip(labels, high):
+            prediction = int(label)
+            risk_level = self.RISK_LEVELS[prediction] if prediction < len(self.RISK_LEVELS) else 'Unknown'
+            results.append({
+                'prediction': prediction,
+                'probability': round(float(p) * 100, 2),
+                'risk_level': risk_level,
+                'message': f'Lung disease risk level: {risk_level}',
+            })
+        return results
+
+    def build_rows(self, records, results):
+        return [
+            HealthAssessment(
+                assessment_type='lung_disease',
+                risk_level=result['risk_level'],
+                probability=result['probability'],
+                recommendations=self.HIGH_RISK_ADVICE if result['risk_level'] == 'High' else self.LOW_RISK_ADVICE,
+            )
+            for result in results
+        ]
+
+
+class CaloriesBurntModel(TabularModel):
+    name = 'calories_burnt'
+    artifact = 'calories_burnt/calorie_burn_model.pkl'
+    tree_ensemble = True
+
+    # Column order the model was trained on
+    COLUMNS = ['gender', 'age', 'height', 'weight', 'duration', 'heart_rate', 'body_temp']
+
+    def encode(self, records):
+        X = np.empty((len(records), len(self.COLUMNS)))
+        for i, data in enumerate(records):
+            X[i] = [
+                1 if str(data.get('gender', '')).lower() == 'male' else 0,
+                float(data.get('age', 25)),
+                float(data.get('height', 170)),
+                float(data.get('weight', 65)),
+                float(data.get('duration', 30)),
+                float(data.get('heart_rate', 120)),
+                float(data.get('body_temp', 37.0)),
+            ]
+        return X
+
+    def predict(self, model, X):
+        return [{'calories_burnt': round(float(value), 1)} for value in model.predict(X)]
+
+    def build_rows(self, records, results):
+        return [
+            CalorieCalculation(
+                age=int(float(data.get('age', 25))),
+                height=float(data.get('height', 170)),
+                actual_weight=float(data.get('weight', 65)),
+                calories_burned=result['calories_burnt'],
+            )
+            for data, result in zip(records, results)
+        ]
+
+
+class WeightChangeModel(TabularModel):
+    name = 'weight_change'
+    artifact = WEIGHT_CHANGE_MODEL
+
+    def load(self, batch_size=1):
+        return get_linear_model(self.artifact)
+
+    def encode(self, records):
+        X = np.empty((len(records), 5))
+        for i, data in enumerate(records):
+            current_weight = float(data.get('current_weight', 70))
+            target_weight = float(data.get('target_weight', 65))
+            duration_weeks = int(data.get('duration_weeks', 8))
+            if duration_weeks < 1:
+                raise ValueError(f"duration_weeks must be at least 1, got {duration_weeks}")
+            daily_caloric_surplus_deficit = (target_weight - current_weight) * 7700 / (duration_weeks * 7)
+            X[i] = [
+                int(data.get('age', 25)),
+                1 if str(data.get('gender', 'male')).lower() == 'male' else 0,
+                current_weight,
+                daily_caloric_surplus_deficit,
+                ACTIVITY_LEVELS.get(data.get('physical_activity_level', 'moderately_active'), 2),
+            ]
+        return X
+
+    def predict(self, model, X):
+        predictions = model.predict(X)
+        return [{'prediction': round(float(row[0]), 2)} for row in predictions]
+
+    def build_rows(self, records, results):
+        return [
+            WeightPrediction(
+                current_weight=float(data.get('current_weight', 70)),
+                duration_weeks=int(data.get('duration_weeks', 8)),
+                weight_change_kg=result['prediction'],
+                physical_activity_level=data.get('physical_activity_level', 'moderately_active'),
+            )
+            for data, result in zip(records, results)
+        ]
+
+
+TABULAR_MODELS = {
+    model.name: model
+    for model in (HeartDiseaseModel(), LungDiseaseModel(), CaloriesBurntModel(), WeightChangeModel())
+}
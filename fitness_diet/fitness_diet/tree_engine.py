@@ -0,0 +1,267 @@
+"""
+Flattened, array-based inference for the pickled tree ensembles.
+
+``export_tree_models`` converts the heart and lung random forests
+(scikit-learn) and the calorie-burn booster (XGBoost) into one set of
+contiguous node arrays per model: ``feature``, ``threshold``, ``left``,
+``right``, ``default_left`` and ``value``. :class:`FlatTreeEnsemble` walks
+every tree for every row at once with vectorised NumPy gathers. That avoids
+the per-call validation and thread dispatch that dominate sklearn at
+batch size 1; see ``benchmark_tree_engine.py`` for the crossover.
+
+The export is a ``<name>.bundle`` directory next to the pickle (see
+``model_bundle``), with memory-mapped node arrays and the pickle's
+SHA-256. :func:`get_tree_model` uses the export only while that checksum
+still matches and otherwise falls back to the pickle.
+"""
+
+import json
+
+import numpy as np
+from django.conf import settings
+
+from .model_bundle import bundle_manifest_name, read_bundle, write_bundle
+from .model_registry import model_registry
+
+BUNDLE_KIND = 'tree_ensemble'
+
+
+class FlatTreeEnsemble:
+    """
+    A tree ensemble stored as flat node arrays.
+
+    Leaves point to themselves in ``left``/``right``. Node ids are
+    ``intp`` and thresholds ``float64``, so ``take`` gathers need no casts.
+
+    Args:
+        split (str): ``'le'`` sends ``x <= threshold`` left (scikit-learn),
+            ``'lt'`` sends ``x < threshold`` left (XGBoost).
+        aggregate (str): ``'mean'`` averages leaf values (random forests),
+            ``'sum'`` adds them to ``base_score`` (gradient boosting).
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'default_left', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 max_depth, n_features, split='le', aggregate='mean', base_score=0.0,
+                 classes=None, feature_names=None, source_sha256=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.split = split
+        self.aggregate = aggregate
+        self.base_score = float(base_score)
+        self.classes_ = None if classes is None else np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.source_sha256 = source_sha256
+        # children[2 * node + go_right], so one gather picks the next node
+        self._children = np.stack([self.left, self.right], axis=1).ravel()
+        self._is_leaf = self.left == np.arange(len(self.left))
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def leaf_values(self, X):
+        """Return the ``(n_rows, n_trees, n_outputs)`` leaf values reached by each row."""
+        # Both libraries round features to float32 before comparing
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, expected {self.n_features_in_}")
+        n_rows = X.shape[0]
+        flat_x = X.astype(np.float64).ravel()
+        check_missing = np.isnan(flat_x).any()
+
+        # One cursor per (row, tree); cursors drop out of the loop once they reach a leaf
+        nodes = np.tile(self.roots, n_rows)
+        active = np.flatnonzero(~self._is_leaf[nodes])
+        current = nodes[active]
+        row_start = (active // self.n_trees) * self.n_features_in_
+        while len(active):
+            x = flat_x.take(row_start + self.feature.take(current))
+            threshold = self.threshold.take(current)
+            go_right = x > threshold if self.split == 'le' else x >= threshold
+            if check_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left.take(current), go_right)
+            current = self._children.take(current * 2 + go_right)
+            nodes[active] = current
+            inner = ~self._is_leaf.take(current)
+            if not inner.all():
+                active, current, row_start = active[inner], current[inner], row_start[inner]
+        return self.value[nodes].reshape(n_rows, self.n_trees, -1)
+
+    def predict_raw(self, X):
+        values = self.leaf_values(X)
+        if self.aggregate == 'sum':
+            return values.sum(axis=1) + self.base_score
+        return values.mean(axis=1)
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self.predict_raw(X)
+
+    def predict(self, X):
+        raw = self.predict_raw(X)
+        if self.classes_ is not None:
+            return self.classes_[raw.argmax(axis=1)]
+        return raw[:, 0] if raw.shape[1] == 1 else raw
+
+    @classmethod
+    def from_sklearn(cls, model, source_sha256=None):
+        """Flatten a fitted scikit-learn forest or single decision tree."""
+        estimators = getattr(model, 'estimators_', [model])
+        trees = [estimator.tree_ for estimator in estimators]
+        is_classifier = hasattr(model, 'classes_')
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        feature, threshold, left, right, default_left, value = [], [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            node_ids = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, 0.0, tree.threshold))
+            left.append(np.where(leaf, node_ids, tree.children_left) + offset)
+            right.append(np.where(leaf, node_ids, tree.children_right) + offset)
+            missing_left = getattr(tree, 'missing_go_to_left', None)
+            default_left.append(np.zeros(tree.node_count, dtype=bool) if missing_left is None
+                                else missing_left.astype(bool))
+            node_value = tree.value[:, 0, :]
+            if is_classifier:
+                # Per-tree class probabilities, as DecisionTreeClassifier.predict_proba
+                totals = node_value.sum(axis=1, keepdims=True)
+                node_value = node_value / np.where(totals == 0, 1, totals)
+            value.append(node_value)
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=offsets,
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=model.n_features_in_,
+            split='le',
+            aggregate='mean',
+            classes=model.classes_ if is_classifier else None,
+            source_sha256=source_sha256,
+        )
+
+    @classmethod
+    def from_xgboost(cls, model, source_sha256=None):
+        """Flatten a fitted single-output ``XGBRegressor`` (gbtree booster)."""
+        config = json.loads(model.get_booster().save_raw('json'))
+        learner = config['learner']
+        objective = learner['objective']['name']
+        if objective not in ('reg:squarederror', 'reg:linear'):
+            raise ValueError(f"Unsupported XGBoost objective: {objective}")
+        trees = learner['gradient_booster']['model']['trees']
+
+        offset = 0
+        roots, feature, threshold, left, right, default_left, value, depths = [], [], [], [], [], [], [], []
+        for tree in trees:
+            left_children = np.asarray(tree['left_children'])
+            right_children = np.asarray(tree['right_children'])
+            node_ids = np.arange(len(left_children))
+            leaf = left_children == -1
+            split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+
+            roots.append(offset)
+            feature.append(np.where(leaf, 0, tree['split_indices']))
+            threshold.append(np.where(leaf, 0.0, split_conditions))
+            left.append(np.where(leaf, node_ids, left_children) + offset)
+            right.append(np.where(leaf, node_ids, right_children) + offset)
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            # XGBoost stores the (already shrunk) leaf weight in split_conditions
+            value.append(np.where(leaf, split_conditions, 0.0)[:, None])
+            depths.append(_tree_depth(left_children, right_children))
+            offset += len(left_children)
+
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=roots,
+            max_depth=max(depths),
+            n_features=int(learner['learner_model_param']['num_feature']),
+            split='lt',
+            aggregate='sum',
+            base_score=base_score,
+            source_sha256=source_sha256,
+        )
+
+    @classmethod
+    def from_model(cls, model, source_sha256=None):
+        if type(model).__module__.startswith('xgboost'):
+            return cls.from_xgboost(model, source_sha256)
+        return cls.from_sklearn(model, source_sha256)
+
+    def save(self, path, source_path=None):
+        """Write a ``tree_ensemble`` bundle whose manifest is ``path``, exported from the pickle ``source_path``."""
+        meta = {
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'split': self.split,
+            'aggregate': self.aggregate,
+            'base_score': self.base_score,
+            'classes': None if self.classes_ is None else self.classes_.tolist(),
+            'source_sha256': self.source_sha256,
+        }
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        return write_bundle(path, BUNDLE_KIND, arrays, meta, feature_names=self.feature_names, source_path=source_path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a bundle with its node arrays memory-mapped."""
+        manifest, arrays = read_bundle(path, kind=BUNDLE_KIND)
+        meta = dict(manifest['meta'])
+        return cls(n_features=meta.pop('n_features'), feature_names=manifest['feature_names'],
+                   source_sha256=manifest['source_sha256'], **meta, **arrays)
+
+
+def _tree_depth(left_children, right_children):
+    depth = 0
+    level = [0]
+    while level:
+        children = [c for node in level for c in (left_children[node], right_children[node]) if c != -1]
+        if not children:
+            break
+        depth += 1
+        level = children
+    return depth
+
+
+def get_tree_model(name, batch_size=1):
+    """
+    Return the flattened engine for the pickle ``name`` when an up-to-date
+    export exists, otherwise the unpickled model from the registry.
+
+    The engine wins on small batches where per-call overhead dominates;
+    batches above ``settings.TREE_ENGINE_MAX_BATCH`` go to the pickle,
+    whose compiled tree walk is faster per row.
+    """
+    if batch_size > getattr(settings, 'TREE_ENGINE_MAX_BATCH', 64):
+        return model_registry.get(name)
+    try:
+        engine = model_registry.get_export(bundle_manifest_name(name), name, loader=FlatTreeEnsemble.load)
+    except FileNotFoundError:
+        engine = None
+    return engine if engine is not None else model_registry.get(name)
@@ -21,8 +21,9 @@ from django.conf.urls.static import static
 from . import views_updated_final as views
 from .views_food_calorie import food_calorie_predictor
 from .views_health_prediction import heart_disease_prediction, lung_disease_prediction, heart_disease_page, lung_disease_page
-from .views_calories_burnt import calories_burnt_predictor
-from .views_meal_customization import customize_meals, swap_meal
+from .views_calories_burnt import calories_burnt_predictor, calories_burnt_sweep
+from .views_meal_customization import customize_meals, swap_meal, food_autocomplete, meal_swap_suggestions
+from .views_batch_prediction import batch_predict, weight_trajectory, prediction_cache_stats, prometheus_metrics
 from django.views.generic import RedirectView
 from . import views_rule_based
 
@@ -44,13 +45,20 @@ urlpatterns = [
     path('food-recognition/', views.food_recognition_page, name='food_recognition'),
     path('food-calorie-predictor/', food_calorie_predictor, name='food_calorie_predictor'),
     path('calories-burnt-predictor/', calories_burnt_predictor, name='calories_burnt_predictor'),
+    path('api/calories-burnt/sweep', calories_burnt_sweep, name='calories_burnt_sweep'),
     path('customize-meals/', customize_meals, name='customize_meals'),
     path('swap-meal/', swap_meal, name='swap_meal'),
+    path('api/foods/autocomplete', food_autocomplete, name='food_autocomplete'),
+    path('api/meals/<int:meal_id>/swaps', meal_swap_suggestions, name='meal_swap_suggestions'),
     # Health Prediction URLs
     path('heart-disease-prediction/', heart_disease_prediction, name='heart_disease_prediction'),
     path('lung-disease-prediction/', lung_disease_prediction, name='lung_disease_prediction'),
     path('heart-disease/', heart_disease_page, name='heart_disease_page'),
     path('lung-disease/', lung_disease_page, name='lung_disease_page'),
+    path('api/predict/<str:model_name>/batch', batch_predict, name='batch_predict'),
+    path('api/predict/weight_change/trajectory', weight_trajectory, name='weight_trajectory'),
+    path('api/predict/cache-stats', prediction_cache_stats, name='prediction_cache_stats'),
+    path('metrics', prometheus_metrics, name='metrics'),
     path('accounts/', include('allauth.urls')),
     path('accounts/profile/', views.landing_page, name='account_profile'),
 
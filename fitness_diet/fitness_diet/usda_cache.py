@@ -0,0 +1,207 @@
+"""
+Persistent cache of USDA FoodData Central search results.
+
+Foods the local FDC store does not know are searched on
+``api.nal.usda.gov``, and the same few labels ("pizza", "sushi") come up
+again and again. :class:`UsdaSearchCache` keeps the answer per normalized
+query in the ``UsdaSearchResult`` table, so it is shared by every worker and
+survives restarts:
+
+* an entry younger than ``ttl`` is served as is;
+* an older one, up to ``stale_ttl`` past expiry, is still served while a
+  background thread fetches a fresh copy (stale-while-revalidate);
+* "not found" is cached too, for the shorter ``negative_ttl``;
+* a failed request (timeout, 5xx) is never cached: a miss returns ``None``
+  and a failed refresh keeps serving the old entry.
+
+:meth:`UsdaSearchCache.warm` fills the cache ahead of time; the
+``FoodRecognition`` admin uses it to pre-warm the most recognized foods.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from .fdc_store import search_name, search_remote
+from .nutrients import Nutrients
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('hit', 'stale', 'negative', 'miss')
+
+
+class UsdaSearchCache:
+    """
+    Args:
+        fetch (callable): ``fetch(query)`` returns the :class:`Nutrients` of
+            the best match, ``None`` when USDA has none, and raises on failure.
+        ttl (float): Seconds a found result is fresh.
+        negative_ttl (float): Seconds a "not found" is fresh.
+        stale_ttl (float): Seconds past expiry an entry is still served
+            while it is refreshed; ``0`` refreshes synchronously.
+        max_refreshes (int): Background refresh threads.
+    """
+
+    def __init__(self, fetch, ttl=7 * 86400.0, negative_ttl=86400.0, stale_ttl=30 * 86400.0, max_refreshes=2):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_refreshes = max_refreshes
+        self.lookups = dict.fromkeys(OUTCOMES, 0)
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._pending = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.lookups[outcome] += 1
+
+    def _age(self, row):
+        """``(seconds since fetched, the entry's ttl)``"""
+        age = (timezone.now() - row.fetched_at).total_seconds()
+        return age, self.negative_ttl if row.result is None else self.ttl
+
+    def get(self, query):
+        """
+        The cached search result for ``query``, fetching it on a miss.
+
+        Returns:
+            Nutrients | None: ``None`` when USDA has no match or the request
+            failed.
+        """
+        from .models import UsdaSearchResult
+
+        key = search_name(query)
+        if not key:
+            return None
+        row = UsdaSearchResult.objects.filter(query=key).first()
+        if row is not None:
+            age, ttl = self._age(row)
+            if age < ttl:
+                self._count('hit' if row.result is not None else 'negative')
+                return self._record(row)
+            if age < ttl + self.stale_ttl:
+                self._count('stale')
+                self.refresh(key)
+                return self._record(row)
+        self._count('miss')
+        try:
+            return self._fetch_and_store(key)
+        except Exception as e:
+            logger.warning("USDA search for %r failed: %r", key, e)
+            return None
+
+    @staticmethod
+    def _record(row):
+        return None if row.result is None else Nutrients.from_dict(row.result)
+
+    def _fetch_and_store(self, key):
+        from .models import UsdaSearchResult
+
+        result = self.fetch(key)
+        try:
+            # One INSERT ... ON CONFLICT statement: a read-then-write transaction
+            # would fail on SQLite when another thread or worker writes concurrently
+            UsdaSearchResult.objects.bulk_create(
+                [UsdaSearchResult(query=key, result=None if result is None else result.as_dict(),
+                                  fetched_at=timezone.now())],
+                update_conflicts=True, unique_fields=['query'], update_fields=['result', 'fetched_at'])
+        except DatabaseError as e:
+            logger.warning("Could not cache USDA search for %r: %s", key, e)
+        return result
+
+    def refresh(self, query):
+        """
+        Fetch ``query`` again on a background thread, unless a refresh of it
+        is already running. Returns the refresh's future.
+        """
+        key = search_name(query)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    # Created on first use so no thread exists before gunicorn forks
+                    self._executor = ThreadPoolExecutor(self.max_refreshes, thread_name_prefix='usda-refresh')
+                future = self._pending[key] = self._executor.submit(self._refresh, key)
+        return future
+
+    def _refresh(self, key):
+        try:
+            self._fetch_and_store(key)
+        except Exception as e:
+            logger.warning("Refreshing USDA search for %r failed: %r", key, e)
+            with self._lock:
+                self.refresh_errors += 1
+        else:
+            with self._lock:
+                self.refreshes += 1
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            close_old_connections()
+
+    def warm(self, queries, wait_for=False):
+        """
+        Refresh every query in ``queries`` that has no fresh entry.
+
+        Args:
+            wait_for (bool): Block until the fetches finish.
+
+        Returns:
+            dict: ``{'queued': n, 'fresh': n}``
+        """
+        from .models import UsdaSearchResult
+
+        keys = list(dict.fromkeys(k for k in map(search_name, queries) if k))
+        fresh = set()
+        for row in UsdaSearchResult.objects.filter(query__in=keys):
+            age, ttl = self._age(row)
+            if age < ttl:
+                fresh.add(row.query)
+        futures = [self.refresh(key) for key in keys if key not in fresh]
+        if wait_for:
+            wait(futures)
+        return {'queued': len(futures), 'fresh': len(fresh)}
+
+    def stats(self):
+        with self._lock:
+            lookups = sum(self.lookups.values())
+            served = lookups - self.lookups['miss']
+            return {
+                'lookups': dict(self.lookups),
+                'hit_rate': served / lookups if lookups else 0.0,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'pending': len(self._pending),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def usda_cache():
+    """The process-wide USDA search cache, configured from settings on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UsdaSearchCache(
+                    search_remote,
+                    ttl=getattr(settings, 'USDA_CACHE_TTL', 7 * 86400.0),
+                    negative_ttl=getattr(settings, 'USDA_CACHE_NEGATIVE_TTL', 86400.0),
+                    stale_ttl=getattr(settings, 'USDA_CACHE_STALE_TTL', 30 * 86400.0),
+                )
+    return _cache
+
+
+def usda_cache_stats():
+    """Stats of the USDA cache, or ``None`` if this process has not used it."""
+    return _cache.stats() if _cache is not None else None
@@ -6,13 +6,16 @@ from django.contrib.auth.hashers import make_password, check_password
 from allauth.socialaccount.models import SocialAccount
 from allauth.account.signals import user_signed_up, user_logged_in
 from django.dispatch import receiver
-import requests
+from django.conf import settings
 from PIL import Image
 from io import BytesIO
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from transformers import pipeline
 import torch
+from .fdc_store import USDA_SEARCH_URL
+from .http_client import http_client
+from .nutrients import Nutrients, display
 
 def login_required_custom(view_func):
     def wrapper(request, *args, **kwargs):
@@ -21,7 +24,7 @@ def login_required_custom(view_func):
         return view_func(request, *args, **kwargs)
     return wrapper
 
-API_KEY = "Use your own api"  // use will get api fron USDA FoodData Central
+API_KEY = getattr(settings, 'USDA_API_KEY', '')  # from USDA FoodData Central
 
 
 def landing_page(request):
@@ -256,44 +259,27 @@ def food_recognition_page(request):
             food_label = preds[0]['label']
 
             # Fetch nutritional data from USDA API
-            url = f'https://api.nal.usda.gov/fdc/v1/foods/search?query={food_label}&api_key={API_KEY}'
-            response = requests.get(url)
-            data = response.json()
-
-            # Default nutritional values
-            calories = 'Not found'
-            protein = 'Not found'
-            carbs = 'Not found'
-            fat = 'Not found'
-
-            if 'foods' in data and len(data['foods']) > 0:
-                food = data['foods'][0]
-                for nutrient in food.get('foodNutrients', []):
-                    nutrient_name = nutrient.get('nutrientName', '')
-                    if 'Energy' in nutrient_name and 'kcal' in nutrient.get('unitName', '').lower():
-                        calories = f"{nutrient['value']} kcal"
-                    elif 'Protein' in nutrient_name:
-                        protein = f"{nutrient['value']}g"
-                    elif 'Carbohydrate' in nutrient_name:
-                        carbs = f"{nutrient['value']}g"
-                    elif 'Total lipid' in nutrient_name or 'Fat' in nutrient_name:
-                        fat = f"{nutrient['value']}g"
+            response = http_client('usda').get(USDA_SEARCH_URL, params={'query': food_label, 'api_key': API_KEY},
+                                               timeout=getattr(settings, 'USDA_API_TIMEOUT', 5.0))
+            foods = response.json().get('foods') or []
+
+            # Nutritional values by USDA nutrient id ('Not found' when missing)
+            nutrients = Nutrients.from_search_food(foods[0]) if foods else None
+            shown = display(nutrients)
+            calories, protein, carbs, fat = shown['calories'], shown['protein'], shown['carbs'], shown['fat']
 
             # Calculate health score (simple algorithm)
             health_score = 7.5  # Default score
-            if calories != 'Not found':
-                try:
-                    cal_value = float(calories.split()[0])
-                    if cal_value < 200:
-                        health_score = 8.5
-                    elif cal_value < 400:
-                        health_score = 7.5
-                    elif cal_value < 600:
-                        health_score = 6.0
-                    else:
-                        health_score = 4.5
-                except:
-                    pass
+            cal_value = nutrients.calories if nutrients else None
+            if cal_value is not None:
+                if cal_value < 200:
+                    health_score = 8.5
+                elif cal_value < 400:
+                    health_score = 7.5
+                elif cal_value < 600:
+                    health_score = 6.0
+                else:
+                    health_score = 4.5
 
             return JsonResponse({
                 'food_name': food_label.title(),
@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from .metrics import CONTENT_TYPE, model_metrics, render_metrics
+from .prediction_cache import cache_stats
+from .tabular_models import TABULAR_MODELS
+from .weight_trajectory import simulate_trajectory
+
+logger = logging.getLogger(__name__)
+
+@csrf_exempt
+def batch_predict(request, model_name):
+    """
+    Score many records with one model call.
+
+    POST a JSON array of records (or ``{"records": [...], "persist": false}``)
+    using the same field names as the single-row endpoint. The response holds
+    one result per record plus the time spent encoding, predicting and saving.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method.'}, status=405)
+
+    spec = TABULAR_MODELS.get(model_name)
+    if spec is None:
+        return JsonResponse({'error': f'Unknown model: {model_name}',
+                             'models': sorted(TABULAR_MODELS)}, status=404)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON.'}, status=400)
+
+    persist = True
+    if isinstance(payload, dict):
+        persist = payload.get('persist', True)
+        if not isinstance(persist, bool):
+            return JsonResponse({'error': '"persist" must be true or false.'}, status=400)
+        payload = payload.get('records')
+    if not isinstance(payload, list) or not all(isinstance(r, dict) for r in payload):
+        return JsonResponse({'error': 'Expected a JSON array of records.'}, status=400)
+
+    max_records = getattr(settings, 'BATCH_PREDICTION_MAX_RECORDS', 1000)
+    if len(payload) > max_records:
+        return JsonResponse({'error': f'At most {max_records} records per batch.'}, status=413)
+    if not payload:
+        return JsonResponse({'model': model_name, 'count': 0, 'results': [], 'saved': 0})
+
+    timings = {}
+    try:
+        start = time.perf_counter()
+        X = spec.encode(payload)
+        timings['encode_ms'] = (time.perf_counter() - start) * 1000
+    except (TypeError, ValueError, KeyError) as e:
+        return JsonResponse({'error': f'Invalid record: {e}'}, status=400)
+
+    try:
+        model = spec.load(len(payload))
+        start = time.perf_counter()
+        results = spec.predict(model, X)
+        timings['predict_ms'] = (time.perf_counter() - start) * 1000
+    except FileNotFoundError:
+        return JsonResponse({'error': f'Model not available: {model_name}'}, status=503)
+    except Exception as e:
+        model_metrics(spec.name).count_error('batch_inference')
+        return JsonResponse({'error': str(e)}, status=500)
+
+    saved = 0
+    if persist:
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                saved = spec.persist(payload, results)
+        except Exception:
+            model_metrics(spec.name).count_error('persist')
+            logger.exception("Error saving %s batch", model_name)
+        timings['persist_ms'] = (time.perf_counter() - start) * 1000
+
+    metrics = model_metrics(spec.name)
+    for stage, key in (('batch_encode', 'encode_ms'), ('batch_inference', 'predict_ms'),
+                       ('batch_persist', 'persist_ms')):
+        if key in timings:
+            metrics.observe(stage, timings[key] / 1000)
+
+    return JsonResponse({
+        'model': model_name,
+        'count': len(results),
+        'results': results,
+        'saved': saved,
+        'timings_ms': {k: round(v, 3) for k, v in timings.items()},
+    })
+
+
+@csrf_exempt
+def weight_trajectory(request):
+    """
+    Week-by-week projected weight for one plan, for charting.
+
+    POST a JSON object with the ``predict_weight_change`` form fields. Every
+    week of the plan is scored in a single model call.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method.'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON.'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Expected a JSON object.'}, status=400)
+
+    max_weeks = getattr(settings, 'WEIGHT_TRAJECTORY_MAX_WEEKS', 520)
+    try:
+        if int(data.get('duration_weeks', 8)) > max_weeks:
+            return JsonResponse({'error': f'At most {max_weeks} weeks per trajectory.'}, status=413)
+        model = TABULAR_MODELS['weight_change'].load()
+        start = time.perf_counter()
+        trajectory = simulate_trajectory(model, data)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'error': f'Invalid plan: {e}'}, status=400)
+    except FileNotFoundError:
+        return JsonResponse({'error': 'Model not available: weight_change'}, status=503)
+
+    trajectory['timings_ms'] = {'simulate_ms': round(elapsed_ms, 3)}
+    return JsonResponse(trajectory)
+
+
+def prediction_cache_stats(request):
+    """Hit/miss counters of this worker's single-row prediction caches."""
+    return JsonResponse({'caches': cache_stats()})
+
+
+def prometheus_metrics(request):
+    """Request counts, errors, stage latencies, cache hit rates and model versions of this worker."""
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
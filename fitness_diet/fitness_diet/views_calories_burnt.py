@@ -1,22 +1,34 @@
-import pickle
+import json
+import math
+import time
 import numpy as np
+from django.conf import settings
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-import os
 from .models import CalorieCalculation
+from .metrics import model_metrics
+from .prediction_cache import prediction_cache
+from .surrogate_table import get_calorie_table
+from .tabular_models import TABULAR_MODELS
+from .tree_engine import get_tree_model
 
-# Load the calories burnt model
-MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_models', 'calories_burnt', 'calorie_burn_model.pkl')
-with open(MODEL_PATH, 'rb') as f:
-    calorie_burn_model = pickle.load(f)
+# Calories burnt model, relative to ml_models/
+MODEL_NAME = 'calories_burnt/calorie_burn_model.pkl'
+
+# One cache per engine: the lookup table only approximates the model, so their answers must not mix
+calorie_cache = prediction_cache('calories_burnt', 'calories_burnt/')
+calorie_table_cache = prediction_cache('calories_burnt_table', 'calories_burnt/')
+calorie_metrics = model_metrics('calories_burnt', 'calories_burnt/')
 
 @csrf_exempt
+@calorie_metrics.instrument
 def calories_burnt_predictor(request):
     calories_burnt = None
     if request.method == 'POST':
         try:
             data = request.POST
+            encode_start = time.perf_counter()
             # Extract input features from POST data
             gender = 1 if data.get('gender', '').lower() == 'male' else 0
             age = float(data.get('age', 25))
@@ -28,29 +40,130 @@ def calories_burnt_predictor(request):
 
             # Prepare input array for model
             input_features = np.array([[gender, age, height, weight, duration, heart_rate, body_temp]])
+            calorie_metrics.observe('encode', time.perf_counter() - encode_start)
 
-            # Predict calories burnt
-            prediction = calorie_burn_model.predict(input_features)
+            # Predict calories burnt, from the lookup table when enabled and the input is on its grid
+            with calorie_metrics.time('inference'):
+                table = get_calorie_table() if getattr(settings, 'CALORIE_BURN_LOOKUP_TABLE', False) else None
+                if table is not None and table.contains(input_features)[0]:
+                    prediction = calorie_table_cache.predict(input_features, table.predict)
+                else:
+                    calorie_burn_model = get_tree_model(MODEL_NAME)
+                    prediction = calorie_cache.predict(input_features, calorie_burn_model.predict)
             calories_burnt = round(float(prediction[0]), 1)
 
             # Save the calorie calculation to database
-            try:
-                CalorieCalculation.objects.create(
-                    age=int(age),
-                    height=height,
-                    actual_weight=weight,
-                    calories_burned=calories_burnt
-                )
-            except Exception as e:
-                print(f"Error saving calorie calculation: {e}")
+            with calorie_metrics.time('persist'):
+                try:
+                    CalorieCalculation.objects.create(
+                        age=int(age),
+                        height=height,
+                        actual_weight=weight,
+                        calories_burned=calories_burnt
+                    )
+                except Exception as e:
+                    calorie_metrics.count_error('persist')
+                    print(f"Error saving calorie calculation: {e}")
 
             # Check if this is an AJAX request
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({'calories_burnt': calories_burnt})
 
         except Exception as e:
+            # Both answers are 400s, which calorie_metrics.instrument counts as request errors
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({'error': str(e)}, status=400)
-            pass  # Handle error gracefully by showing no result
+            # Handle error gracefully by showing no result
+            return render(request, 'calories_burnt.html', {'calories_burnt': None}, status=400)
 
     return render(request, 'calories_burnt.html', {'calories_burnt': calories_burnt})
+
+
+class _SweepTooLarge(ValueError):
+    pass
+
+
+def _sweep_axis(spec, max_points):
+    """
+    Axis values from ``{"start", "stop", "num"}`` (inclusive) or ``{"values": [...]}``.
+
+    Raises:
+        _SweepTooLarge: The axis alone has more than ``max_points`` values;
+            ``num`` is checked before anything is allocated.
+    """
+    if isinstance(spec, list):
+        spec = {'values': spec}
+    if not isinstance(spec, dict):
+        raise ValueError("each axis must be an object or a list of values")
+    if 'values' in spec:
+        values = np.asarray(spec['values'], dtype=float).ravel()
+    else:
+        num = int(spec.get('num', 20))
+        if num < 1:
+            raise ValueError("num must be at least 1")
+        if num > max_points:
+            raise _SweepTooLarge()
+        values = np.linspace(float(spec['start']), float(spec['stop']), num)
+    if len(values) > max_points:
+        raise _SweepTooLarge()
+    if not len(values) or not np.isfinite(values).all():
+        raise ValueError("axis needs at least one finite value")
+    return values
+
+
+@csrf_exempt
+def calories_burnt_sweep(request):
+    """
+    Calories burnt over a grid of one or two inputs, for charting.
+
+    POST ``{"base": {...}, "sweep": {"duration": {"start": 10, "stop": 60, "num": 11}}}``.
+    ``base`` holds the single-row form fields, and ``sweep`` maps one or two
+    numeric fields to their axis values. The whole grid is scored with one
+    model call. ``calories_burnt`` comes back as a list, or as a list of rows
+    for two axes (first axis = rows). Nothing is saved.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method.'}, status=405)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON.'}, status=400)
+    if not isinstance(payload, dict) or not isinstance(payload.get('sweep'), dict):
+        return JsonResponse({'error': 'Expected {"base": {...}, "sweep": {field: axis}}.'}, status=400)
+
+    spec = TABULAR_MODELS['calories_burnt']
+    fields = list(payload['sweep'])
+    sweepable = spec.COLUMNS[1:]
+    if not 1 <= len(fields) <= 2 or not set(fields) <= set(sweepable):
+        return JsonResponse({'error': 'Sweep one or two of: ' + ', '.join(sweepable)}, status=400)
+
+    max_points = getattr(settings, 'CALORIE_SWEEP_MAX_POINTS', 10000)
+    try:
+        base = spec.encode([payload.get('base') or {}])[0]
+        axes = [_sweep_axis(payload['sweep'][field], max_points) for field in fields]
+    except _SweepTooLarge:
+        return JsonResponse({'error': f'At most {max_points} grid points per sweep.'}, status=413)
+    except (TypeError, ValueError, KeyError) as e:
+        return JsonResponse({'error': f'Invalid sweep: {e}'}, status=400)
+
+    shape = tuple(len(axis) for axis in axes)
+    if math.prod(shape) > max_points:
+        return JsonResponse({'error': f'At most {max_points} grid points per sweep.'}, status=413)
+
+    # One row per grid point: the base row with the swept columns overwritten
+    X = np.tile(base, (math.prod(shape), 1))
+    for field, grid in zip(fields, np.meshgrid(*axes, indexing='ij')):
+        X[:, spec.COLUMNS.index(field)] = grid.ravel()
+
+    try:
+        model = get_tree_model(MODEL_NAME, batch_size=len(X))
+    except FileNotFoundError:
+        return JsonResponse({'error': 'Model not available: calories_burnt'}, status=503)
+    calories = np.round(np.asarray(model.predict(X), dtype=float), 1).reshape(shape)
+
+    return JsonResponse({
+        'fields': fields,
+        'axes': {field: axis.tolist() for field, axis in zip(fields, axes)},
+        'shape': list(shape),
+        'calories_burnt': calories.tolist(),
+    })
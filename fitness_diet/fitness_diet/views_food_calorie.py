@@ -1,47 +1,36 @@
-import requests
 from PIL import Image
 from io import BytesIO
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from transformers import pipeline
-import torch
 import os
-
-API_KEY = os.environ.get('USDA_API_KEY', '')
+from .food_label_map import nutrition_for_label
+from .food_classifier import food_classifier, food_metrics
+from .nutrients import display
 
 @csrf_exempt
+@food_metrics.instrument
 def food_calorie_predictor(request):
     if request.method == "POST" and request.FILES.get("food_image"):
         try:
             uploaded_file = request.FILES["food_image"]
-            image = Image.open(uploaded_file)
-
-            # Load model with GPU if available
-            device = 0 if torch.cuda.is_available() else -1
-            classifier = pipeline("image-classification", model="nateraw/food", device=device)
+            with food_metrics.time('encode'):
+                image = Image.open(uploaded_file)
 
-            preds = classifier(image, top_k=1)
+            with food_metrics.time('inference'):
+                preds = food_classifier.classify(image, top_k=1)
             food_label = preds[0]["label"]
 
-            # Fetch calories from USDA API
-            url = f"https://api.nal.usda.gov/fdc/v1/foods/search?query={food_label}&api_key={API_KEY}"
-            response = requests.get(url)
-            data = response.json()
-
-            calories = "Not found"
-            if "foods" in data and len(data["foods"]) > 0:
-                food = data["foods"][0]
-                for n in food.get("foodNutrients", []):
-                    if "Energy" in n.get("nutrientName", ""):
-                        calories = f"{n['value']} {n['unitName']}"
-                        break
+            # Calories per 100 g, precomputed per classifier label (manage.py build_food_label_map)
+            with food_metrics.time('lookup'):
+                nutrition = nutrition_for_label(food_label)
 
             return JsonResponse({
                 "food_name": food_label,
-                "calories": calories,
+                "calories": display(nutrition)['calories'],
                 "confidence": f"{preds[0]['score']:.2%}"
             })
         except Exception as e:
+            food_metrics.count_error()
             return JsonResponse({"error": str(e)})
 
     return JsonResponse({"error": "Invalid request"})
@@ -2,114 +2,62 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
-import os
-import joblib
+import time
 import numpy as np
-from django.conf import settings
 from .models import HealthAssessment
+from .feature_encoders import get_heart_encoder, predict_with_proba
+from .metrics import model_metrics
+from .prediction_cache import prediction_cache
+from .tree_engine import get_tree_model
+
+heart_cache = prediction_cache('heart_disease', 'heart_disease/')
+lung_cache = prediction_cache('lung_disease', 'lung_disease/')
+heart_metrics = model_metrics('heart_disease', 'heart_disease/')
+lung_metrics = model_metrics('lung_disease', 'lung_disease/')
 
 # Heart Disease Prediction View
 @csrf_exempt
+@heart_metrics.instrument
 def heart_disease_prediction(request):
     if request.method == 'POST':
         try:
             # Get form data
             data = json.loads(request.body)
 
-            # Extract features according to your model
-            age = float(data.get('age', 50))
-            sex = int(data.get('sex', 1))  # 0 = female, 1 = male
-            chest_pain_type = data.get('chest_pain_type', 'ASY')  # ASY, ATA, NAP, TA
-            resting_bp = float(data.get('resting_bp', 120))
-            cholesterol = float(data.get('cholesterol', 200))
-            fasting_bs = int(data.get('fasting_bs', 0))  # 0 or 1
-            resting_ecg = data.get('resting_ecg', 'Normal')  # Normal, LVH, ST
-            max_hr = float(data.get('max_hr', 150))
-            exercise_angina = int(data.get('exercise_angina', 0))  # 0 or 1
-            oldpeak = float(data.get('oldpeak', 1.0))
-            st_slope = data.get('st_slope', 'Flat')  # Flat, Up, Down
-
-            # Convert categorical variables to one-hot encoding
-            sex_features = {
-                'Sex_F': 1 if sex == 0 else 0,  # 0 = Female
-                'Sex_M': 1 if sex == 1 else 0,  # 1 = Male
-            }
-
-            chest_pain_features = {
-                'ChestPainType_ASY': 1 if chest_pain_type == 'ASY' else 0,
-                'ChestPainType_ATA': 1 if chest_pain_type == 'ATA' else 0,
-                'ChestPainType_NAP': 1 if chest_pain_type == 'NAP' else 0,
-                'ChestPainType_TA': 1 if chest_pain_type == 'TA' else 0,
-            }
-
-            resting_ecg_features = {
-                'RestingECG_Normal': 1 if resting_ecg == 'Normal' else 0,
-                'RestingECG_LVH': 1 if resting_ecg == 'LVH' else 0,
-                'RestingECG_ST': 1 if resting_ecg == 'ST' else 0,
-            }
-
-            exercise_angina_features = {
-                'ExerciseAngina_N': 1 if exercise_angina == 0 else 0,  # 0 = No
-                'ExerciseAngina_Y': 1 if exercise_angina == 1 else 0,  # 1 = Yes
-            }
-
-            st_slope_features = {
-                'ST_Slope_Flat': 1 if st_slope == 'Flat' else 0,
-                'ST_Slope_Up': 1 if st_slope == 'Up' else 0,
-                'ST_Slope_Down': 1 if st_slope == 'Down' else 0,
-            }
-
-            # Prepare features dictionary in correct order
-            features_dict = {
-                'Age': age,
-                'RestingBP': resting_bp,
-                'Cholesterol': cholesterol,
-                'FastingBS': fasting_bs,
-                'MaxHR': max_hr,
-                'Oldpeak': oldpeak,
-                'Sex_F': sex_features['Sex_F'],
-                'Sex_M': sex_features['Sex_M'],
-                'ChestPainType_ASY': chest_pain_features['ChestPainType_ASY'],
-                'ChestPainType_ATA': chest_pain_features['ChestPainType_ATA'],
-                'ChestPainType_NAP': chest_pain_features['ChestPainType_NAP'],
-                'ChestPainType_TA': chest_pain_features['ChestPainType_TA'],
-                'RestingECG_LVH': resting_ecg_features['RestingECG_LVH'],
-                'RestingECG_Normal': resting_ecg_features['RestingECG_Normal'],
-                'RestingECG_ST': resting_ecg_features['RestingECG_ST'],
-                'ExerciseAngina_N': exercise_angina_features['ExerciseAngina_N'],
-                'ExerciseAngina_Y': exercise_angina_features['ExerciseAngina_Y'],
-                'ST_Slope_Down': st_slope_features['ST_Slope_Down'],
-                'ST_Slope_Flat': st_slope_features['ST_Slope_Flat'],
-                'ST_Slope_Up': st_slope_features['ST_Slope_Up'],
-            }
-
-            # Load model and features
-            model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'heart_disease', 'heart_model.pkl')
-            features_path = os.path.join(settings.BASE_DIR, 'ml_models', 'heart_disease', 'model_features.pkl')
-
-            if os.path.exists(model_path) and os.path.exists(features_path):
-                model = joblib.load(model_path)
-                feature_names = joblib.load(features_path)
+            # Load model and the encoder compiled from its feature list
+            try:
+                model = get_tree_model('heart_disease/heart_model.pkl')
+                encoder = get_heart_encoder()
+            except FileNotFoundError:
+                model = encoder = None
 
-                # Create feature array in correct order
-                features = np.array([[features_dict[feature] for feature in feature_names]])
+            if model is not None:
+
+                # Encode straight into the model's column order
+                with heart_metrics.time('encode'):
+                    features = encoder.encode_row(data)
 
-                prediction = model.predict(features)[0]
-                probability = model.predict_proba(features)[0][1] * 100
+                # One forest pass gives both the class and its probability; repeats come from the cache
+                with heart_metrics.time('inference'):
+                    labels, proba = heart_cache.predict(features, lambda X: predict_with_proba(model, X))
+                prediction = labels[0]
+                probability = proba[0][1] * 100
 
                 risk_level = 'High' if prediction == 1 else 'Low'
                 recommendations = "Consult a cardiologist immediately. Monitor blood pressure, cholesterol, and maintain a heart-healthy diet." if prediction == 1 else "Continue regular health check-ups and maintain a healthy lifestyle."
 
                 # Save the health assessment to database
-                try:
-                    HealthAssessment.objects.create(
-                        assessment_type='heart_disease',
-                        risk_level=risk_level,
-                        probability=round(probability, 2),
-                        recommendations=recommendations
-                    )
-                except Exception as e:
-                    print(f"Error saving heart disease assessment: {e}")
+                with heart_metrics.time('persist'):
+                    try:
+                        HealthAssessment.objects.create(
+                            assessment_type='heart_disease',
+                            risk_level=risk_level,
+                            probability=round(probability, 2),
+                            recommendations=recommendations
+                        )
+                    except Exception as e:
+                        heart_metrics.count_error('persist')
+                        print(f"Error saving heart disease assessment: {e}")
 
                 result = {
                     'prediction': int(prediction),
@@ -135,6 +83,7 @@ def heart_disease_prediction(request):
 
 # Lung Disease Prediction View
 @csrf_exempt
+@lung_metrics.instrument
 def lung_disease_prediction(request):
     if request.method == 'POST':
         try:
@@ -142,6 +91,7 @@ def lung_disease_prediction(request):
             data = json.loads(request.body)
 
             # Extract features according to your model
+            encode_start = time.perf_counter()
             age = float(data.get('age', 50))
             gender = int(data.get('gender', 1))  # 0 = Male, 1 = Female
             air_pollution = int(data.get('air_pollution', 2))  # 0-8 scale
@@ -173,14 +123,15 @@ def lung_disease_prediction(request):
                                 chest_pain, coughing_blood, fatigue, weight_loss,
                                 shortness_breath, wheezing, swallowing_diff,
                                 clubbing_nails, frequent_cold, dry_cough, snoring]])
+            lung_metrics.observe('encode', time.perf_counter() - encode_start)
 
-            # Load model and features
-            model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'lung_disease', 'lungs_model.pkl')
-            features_path = os.path.join(settings.BASE_DIR, 'ml_models', 'lung_disease', 'lungs_model_features.pkl')
+            # Load model
+            try:
+                model = get_tree_model('lung_disease/lungs_model.pkl')
+            except FileNotFoundError:
+                model = None
 
-            if os.path.exists(model_path) and os.path.exists(features_path):
-                model = joblib.load(model_path)
-                feature_names = joblib.load(features_path)
+            if model is not None:
 
                 # Create feature array in correct order
                 features = np.array([[age, gender, air_pollution, alcohol_use, dust_allergy,
@@ -190,31 +141,33 @@ def lung_disease_prediction(request):
                                     shortness_breath, wheezing, swallowing_diff,
                                     clubbing_nails, frequent_cold, dry_cough, snoring]])
 
-                prediction = model.predict(features)[0]
+                # One forest pass gives both the class and its probabilities; repeats come from the cache
+                with lung_metrics.time('inference'):
+                    labels, proba = lung_cache.predict(features, lambda X: predict_with_proba(model, X))
+                prediction = labels[0]
 
                 # Handle multi-class prediction (Low, Medium, High)
                 risk_levels = ['Low', 'Medium', 'High']
                 risk_level = risk_levels[prediction] if prediction < len(risk_levels) else 'Unknown'
 
                 # Calculate probability for high risk (assuming class 2 is high risk)
-                try:
-                    probabilities = model.predict_proba(features)[0]
-                    high_risk_probability = probabilities[2] * 100 if len(probabilities) > 2 else probabilities[-1] * 100
-                except:
-                    high_risk_probability = 50.0  # Default if predict_proba not available
+                probabilities = proba[0]
+                high_risk_probability = probabilities[2] * 100 if len(probabilities) > 2 else probabilities[-1] * 100
 
                 recommendations = "Quit smoking, avoid pollutants, consult a pulmonologist, and practice breathing exercises." if risk_level == 'High' else "Maintain good air quality, avoid smoking, and have regular check-ups."
 
                 # Save the health assessment to database
-                try:
-                    HealthAssessment.objects.create(
-                        assessment_type='lung_disease',
-                        risk_level=risk_level,
-                        probability=round(high_risk_probability, 2),
-                        recommendations=recommendations
-                    )
-                except Exception as e:
-                    print(f"Error saving lung disease assessment: {e}")
+                with lung_metrics.time('persist'):
+                    try:
+                        HealthAssessment.objects.create(
+                            assessment_type='lung_disease',
+                            risk_level=risk_level,
+                            probability=round(high_risk_probability, 2),
+                            recommendations=recommendations
+                        )
+                    except Exception as e:
+                        lung_metrics.count_error('persist')
+                        print(f"Error saving lung disease assessment: {e}")
 
                 result = {
                     'prediction': int(prediction),
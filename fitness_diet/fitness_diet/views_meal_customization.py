@@ -3,6 +3,12 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from .models import UserProfile, MealPlan, MealSwap, FoodDatabase
+from .food_search import search as search_foods
+from .food_swaps import suggest_swaps
+
+# Foods one autocomplete or swap suggestion request may ask for
+MAX_AUTOCOMPLETE_RESULTS = 50
+MAX_SWAP_SUGGESTIONS = 50
 
 def customize_meals(request):
     """View for customizing meal plans"""
@@ -49,8 +55,8 @@ def customize_meals(request):
             MealPlan.objects.create(user=user, **meal_data)
         current_meals = MealPlan.objects.filter(user=user)
 
-    # Get available food options from database
-    available_foods = FoodDatabase.objects.all()[:20]  # Limit for performance
+    # Suggestions shown before the user searches; the search box queries food_autocomplete
+    available_foods = FoodDatabase.objects.all()[:20]
 
     context = {
         'current_meals': current_meals,
@@ -75,6 +81,14 @@ def swap_meal(request):
             new_calories = request.POST.get('new_calories')
             swap_reason = request.POST.get('swap_reason', 'preference')
 
+            # A catalog food is swapped in with its stored name and calories
+            food_id = request.POST.get('food_id')
+            if food_id:
+                food = FoodDatabase.objects.filter(id=food_id).first()
+                if food is None:
+                    return JsonResponse({'error': 'Food not found.'}, status=404)
+                new_food, new_calories = food.name, food.calories
+
             # Get the original meal
             original_meal = MealPlan.objects.get(id=meal_id, user=user)
 
@@ -103,3 +117,33 @@ def swap_meal(request):
             return JsonResponse({'error': str(e)}, status=500)
 
     return JsonResponse({'error': 'Invalid request method.'}, status=405)
+
+
+def food_autocomplete(request):
+    """JSON food suggestions for the swap search box: ?q=<typed text>&limit=10&category=<category>"""
+    try:
+        limit = min(int(request.GET.get('limit', 10)), MAX_AUTOCOMPLETE_RESULTS)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer.'}, status=400)
+    query = request.GET.get('q', '')
+    foods, corrected = search_foods(query, limit=limit, category=request.GET.get('category') or None)
+    return JsonResponse({'query': query, 'corrected': corrected, 'results': foods})
+
+
+def meal_swap_suggestions(request, meal_id):
+    """JSON catalog foods closest in calories and macros to one of the user's meals: ?k=5&category=<category>"""
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return JsonResponse({'error': 'Please log in first.'}, status=401)
+    try:
+        k = min(int(request.GET.get('k', 5)), MAX_SWAP_SUGGESTIONS)
+    except ValueError:
+        return JsonResponse({'error': 'k must be an integer.'}, status=400)
+    if k < 1:
+        return JsonResponse({'error': 'k must be at least 1.'}, status=400)
+    meal = MealPlan.objects.filter(id=meal_id, user_id=user_id).first()
+    if meal is None:
+        return JsonResponse({'error': 'Meal not found.'}, status=404)
+    suggestions = suggest_swaps(meal, k=k, category=request.GET.get('category') or None)
+    return JsonResponse({'meal': {'id': meal.id, 'food_item': meal.food_item, 'calories': meal.calories},
+                         'suggestions': suggestions})
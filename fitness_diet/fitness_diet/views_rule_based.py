@@ -1,90 +1,57 @@
-import pandas as pd
 import random
 import os
-import joblib
-import matplotlib.pyplot as plt
+import time
 import uuid
+import numpy as np
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.conf import settings
-from ml_models.workout_plan.workout_suggestion_model import WorkoutSuggestionGenerator
-from ml_models.diet_plan.diet_plan_model import DietPlanGenerator
 from .models import DietPlan, WorkoutPlan, WeightPrediction, CalorieCalculation, FoodRecognition, HealthAssessment
+from . import food_catalog
+from .metrics import model_metrics
+from .model_registry import model_registry
 
-# Model path for workout suggestions
-MODEL_PATH = os.path.join(settings.BASE_DIR, 'ml_models', 'workout_plan', 'workout_suggestion_generator.pkl')
+# Model names (relative to ml_models/) for the registry
+DIET_MODEL_NAME = 'diet_plan/diet_plan_generator.pkl'
+WORKOUT_MODEL_NAME = 'workout_plan/workout_suggestion_generator.pkl'
 
-# Path to the datasets
-DATA_DIR = os.path.join(settings.BASE_DIR, 'data')
+# The generator classes pull in scikit-learn, so they are imported on first load
+def _load_diet_model(path):
+    from ml_models.diet_plan.diet_plan_model import DietPlanGenerator
+    return DietPlanGenerator.load_model(path)
 
-def load_and_preprocess_data():
-    """
-    Load the USDA nutrient dataset and preprocess it.
-    Since we have pickle files, we'll create a sample dataset for fallback.
-    """
-    # Create a sample dataset since we don't have the CSV file
-    sample_data = {
-        'food_name': [
-            'Chicken Breast', 'Brown Rice', 'Broccoli', 'Sweet Potato', 'Greek Yogurt',
-            'Salmon', 'Quinoa', 'Spinach', 'Banana', 'Almonds',
-            'Eggs', 'Oats', 'Avocado', 'Blueberries', 'Cottage Cheese',
-            'Turkey', 'Lentils', 'Kale', 'Apple', 'Walnuts'
-        ],
-        'category': [
-            'Protein', 'Grain', 'Vegetable', 'Vegetable', 'Dairy',
-            'Protein', 'Grain', 'Vegetable', 'Fruit', 'Nut',
-            'Protein', 'Grain', 'Fruit', 'Fruit', 'Dairy',
-            'Protein', 'Legume', 'Vegetable', 'Fruit', 'Nut'
-        ],
-        'calories': [165, 123, 34, 86, 100, 208, 120, 23, 89, 164, 155, 68, 234, 57, 98, 135, 116, 33, 52, 185],
-        'protein_g': [31, 2.6, 2.8, 2, 17, 25, 4.4, 2.9, 1.1, 6, 13, 2.4, 2.9, 0.7, 11, 30, 9, 2.9, 0.3, 4.3],
-        'carbs_g': [0, 26, 7, 20, 6, 0, 22, 4, 23, 6, 1, 12, 12, 14, 3, 0, 20, 7, 14, 4],
-        'fats_g': [3.6, 1, 0.4, 0.1, 0, 12, 1.9, 0.4, 0.3, 14, 11, 1.4, 21, 0.3, 4, 1, 0.4, 0.5, 0.2, 18],
-        'fiber_g': [0, 1.8, 2.6, 3, 0, 0, 3, 2.2, 2.6, 3.5, 0, 1.7, 10, 2.4, 0, 0, 8, 2.6, 2.4, 2],
-        'sugar_g': [0, 0.4, 1.7, 4.2, 4, 0, 0, 0.4, 12, 1.2, 1.1, 0.5, 0.3, 10, 3, 0, 2, 0.9, 10, 0.7],
-        'sodium_mg': [74, 1, 33, 55, 36, 59, 7, 79, 1, 1, 124, 2, 10, 1, 364, 99, 2, 43, 1, 1],
-        'potassium_mg': [256, 43, 316, 337, 141, 490, 172, 558, 358, 208, 126, 61, 485, 77, 104, 239, 369, 447, 107, 125],
-        'calcium_mg': [15, 10, 47, 30, 110, 12, 17, 99, 5, 76, 56, 8, 12, 6, 83, 8, 19, 135, 6, 28],
-        'iron_mg': [0.9, 0.4, 0.7, 0.6, 0.1, 0.8, 1.5, 2.7, 0.3, 1.0, 1.8, 0.8, 0.6, 0.3, 0.1, 1.4, 3.3, 1.7, 0.1, 0.8],
-        'vitamin_c_mg': [0, 0, 89, 2.4, 0, 0, 0, 28, 8.7, 0, 0, 0, 10, 9.7, 0, 0, 4.4, 120, 4.6, 0.4],
-        'vitamin_a_iu': [0, 0, 623, 14187, 0, 26, 0, 9377, 64, 0, 540, 0, 146, 54, 37, 0, 68, 10302, 54, 0],
-        'cholesterol_mg': [85, 0, 0, 0, 0, 55, 0, 0, 0, 0, 373, 0, 0, 0, 17, 84, 0, 0, 0, 0],
-        'saturated_fat_g': [1, 0.2, 0.1, 0, 0, 3, 0.2, 0.1, 0.1, 1.1, 3.3, 0.3, 3, 0, 2.6, 0.2, 0.1, 0.1, 0, 1.7],
-        'trans_fat_g': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    }
+def _load_workout_model(path):
+    from ml_models.workout_plan.workout_suggestion_model import WorkoutSuggestionGenerator
+    return WorkoutSuggestionGenerator.load_model(path)
+
+model_registry.register_loader(DIET_MODEL_NAME, _load_diet_model)
+model_registry.register_loader(WORKOUT_MODEL_NAME, _load_workout_model)
 
-    df = pd.DataFrame(sample_data)
-    return df
+diet_metrics = model_metrics('diet_plan', 'diet_plan/')
+workout_metrics = model_metrics('workout_plan', 'workout_plan/')
 
-def select_foods_for_meal(df_filtered, target_calories, meal_name):
+# Path to the datasets
+DATA_DIR = os.path.join(settings.BASE_DIR, 'data')
+
+def select_foods_for_meal(catalog, indices, target_calories, meal_name):
     """
     Select foods for a meal to approximate the target calories.
     Uses a simple greedy approach: randomly select foods until close to target.
+
+    Args:
+        catalog (FoodCatalog): The food catalog.
+        indices (ndarray): Catalog rows to choose from, lowest calories first.
     """
-    selected_foods = []
-    total_calories = 0
-    total_nutrients = {col: 0 for col in ['protein_g', 'carbs_g', 'fats_g', 'fiber_g', 'sugar_g', 'sodium_mg',
-                                         'potassium_mg', 'calcium_mg', 'iron_mg', 'vitamin_c_mg', 'vitamin_a_iu',
-                                         'cholesterol_mg', 'saturated_fat_g', 'trans_fat_g']}
-    # Sort by calories for greedy selection
-    df_sorted = df_filtered.sort_values('calories').reset_index(drop=True)
     # Randomly select up to 5 foods
-    num_foods = min(5, len(df_sorted))
-    indices = random.sample(range(len(df_sorted)), num_foods)
-    for idx in indices:
-        food = df_sorted.iloc[idx]
-        selected_foods.append({
-            'name': food['food_name'],
-            'calories': food['calories'],
-            'nutrients': {col: food[col] for col in total_nutrients.keys()}
-        })
-        total_calories += food['calories']
-        for col in total_nutrients:
-            total_nutrients[col] += food[col]
-        # If close enough (within 50 calories), stop
-        if abs(total_calories - target_calories) <= 50:
-            break
-    return selected_foods, total_calories, total_nutrients
+    num_foods = min(5, len(indices))
+    picked = indices[random.sample(range(len(indices)), num_foods)]
+    # Stop at the first food that brings the meal within 50 calories of the target
+    running_calories = np.cumsum(catalog.calories[picked])
+    close = np.flatnonzero(np.abs(running_calories - target_calories) <= 50)
+    if len(close):
+        picked = picked[:close[0] + 1]
+    total_calories = int(running_calories[len(picked) - 1]) if len(picked) else 0
+    return [catalog.food(i) for i in picked], total_calories, catalog.totals(picked)
 
 def generate_diet_plan(required_calories, diet_type='balanced'):
     """
@@ -100,17 +67,10 @@ def generate_diet_plan(required_calories, diet_type='balanced'):
     # Set random seed for reproducibility
     random.seed(42)
 
-    df = load_and_preprocess_data()
-
-    # Filter by diet type
-    if diet_type == 'protein_rich':
-        df_filtered = df[df['protein_g'] > 15]
-    elif diet_type == 'low_carb':
-        df_filtered = df[df['carbs_g'] < 20]
-    else:  # balanced
-        df_filtered = df
+    catalog = food_catalog.catalog()
+    indices = catalog.diet_indices(diet_type)
 
-    if df_filtered.empty:
+    if not len(indices):
         return {'error': f'No foods available for the selected diet type: {diet_type}'}
 
     # Split calories
@@ -119,15 +79,17 @@ def generate_diet_plan(required_calories, diet_type='balanced'):
     dinner_cal = int(required_calories * 0.3)
 
     # Generate meals
-    breakfast_foods, breakfast_total_cal, breakfast_nutrients = select_foods_for_meal(df_filtered, breakfast_cal, 'Breakfast')
-    lunch_foods, lunch_total_cal, lunch_nutrients = select_foods_for_meal(df_filtered, lunch_cal, 'Lunch')
-    dinner_foods, dinner_total_cal, dinner_nutrients = select_foods_for_meal(df_filtered, dinner_cal, 'Dinner')
+    breakfast_foods, breakfast_total_cal, breakfast_nutrients = select_foods_for_meal(catalog, indices, breakfast_cal, 'Breakfast')
+    lunch_foods, lunch_total_cal, lunch_nutrients = select_foods_for_meal(catalog, indices, lunch_cal, 'Lunch')
+    dinner_foods, dinner_total_cal, dinner_nutrients = select_foods_for_meal(catalog, indices, dinner_cal, 'Dinner')
 
     # Daily totals
     daily_calories = breakfast_total_cal + lunch_total_cal + dinner_total_cal
     daily_nutrients = {k: breakfast_nutrients[k] + lunch_nutrients[k] + dinner_nutrients[k] for k in breakfast_nutrients}
 
     # Generate plots
+    import matplotlib.pyplot as plt
+
     plot_id = str(uuid.uuid4())
     static_dir = os.path.join(settings.BASE_DIR, 'static')
     os.makedirs(static_dir, exist_ok=True)
@@ -208,6 +170,8 @@ def generate_workout_suggestions(calories_burned, tolerance=50):
         {'activity_type': 'Pilates', 'daily_steps': 1500, 'duration_minutes': 50, 'calories_burned': 150, 'intensity': 'Low'}
     ]
 
+    import pandas as pd
+
     df = pd.DataFrame(sample_workouts)
 
     # Filter workouts within the tolerance range of calories burned
@@ -256,8 +220,10 @@ def calculate_bmr_tdee(age, gender, weight, height, activity_level):
     tdee = bmr * activity_multipliers.get(activity_level, 1.2)
     return bmr, tdee
 
+@diet_metrics.instrument
 def diet_plan_view(request):
     if request.method == 'POST':
+        encode_start = time.perf_counter()
         # Get form data
         age = int(request.POST.get('age', 25))
         gender = request.POST.get('gender', 'male')
@@ -284,37 +250,40 @@ def diet_plan_view(request):
 
         # Ensure minimum calories
         required_calories = max(required_calories, 1200)
+        diet_metrics.observe('encode', time.perf_counter() - encode_start)
 
         # Try to use ML model first, fallback to rule-based if model not available
-        try:
-            model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'diet_plan', 'diet_plan_generator.pkl')
-            if os.path.exists(model_path):
-                model = DietPlanGenerator.load_model(model_path)
+        with diet_metrics.time('inference'):
+            try:
+                model = model_registry.get(DIET_MODEL_NAME)
                 plan = model.generate_daily_plan(required_calories, diet_type)
-            else:
+            except FileNotFoundError:
+                plan = generate_diet_plan(required_calories, diet_type)
+            except Exception as e:
+                diet_metrics.count_error('inference')
+                print(f"Error using ML model: {e}")
                 plan = generate_diet_plan(required_calories, diet_type)
-        except Exception as e:
-            print(f"Error using ML model: {e}")
-            plan = generate_diet_plan(required_calories, diet_type)
 
         # Save the diet plan to database
-        try:
-            # Format meals for saving
-            breakfast_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['breakfast']['foods']])
-            lunch_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['lunch']['foods']])
-            dinner_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['dinner']['foods']])
-            snacks_text = ""  # No snacks in current plan
-
-            DietPlan.objects.create(
-                preference=diet_type,
-                required_calories=required_calories,
-                breakfast=breakfast_text,
-                lunch=lunch_text,
-                dinner=dinner_text,
-                snacks=snacks_text
-            )
-        except Exception as e:
-            print(f"Error saving diet plan: {e}")
+        with diet_metrics.time('persist'):
+            try:
+                # Format meals for saving
+                breakfast_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['breakfast']['foods']])
+                lunch_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['lunch']['foods']])
+                dinner_text = "\n".join([f"{food['name']} - {food['calories']} cal" for food in plan['dinner']['foods']])
+                snacks_text = ""  # No snacks in current plan
+
+                DietPlan.objects.create(
+                    preference=diet_type,
+                    required_calories=required_calories,
+                    breakfast=breakfast_text,
+                    lunch=lunch_text,
+                    dinner=dinner_text,
+                    snacks=snacks_text
+                )
+            except Exception as e:
+                diet_metrics.count_error('persist')
+                print(f"Error saving diet plan: {e}")
 
         # Add user information to context
         context = {
@@ -340,6 +309,7 @@ def diet_plan_view(request):
         # Show the form
         return render(request, 'diet_plan_form.html')
 
+@workout_metrics.instrument
 def workout_plan_view(request):
     if request.method == 'POST':
         # Read form inputs
@@ -350,9 +320,14 @@ def workout_plan_view(request):
 
         # Load the model
         try:
-            workout_model = WorkoutSuggestionGenerator.load_model(MODEL_PATH)
+            workout_model = model_registry.get(WORKOUT_MODEL_NAME)
+        except FileNotFoundError:
+            # No trained artifact shipped; the generator's rule-based defaults apply
+            from ml_models.workout_plan.workout_suggestion_model import WorkoutSuggestionGenerator
+            workout_model = WorkoutSuggestionGenerator()
         except Exception as e:
             # Fallback to rule-based if model loading fails
+            workout_metrics.count_error('inference')
             prediction = "Mixed cardio and strength training"
             suggestions = ["30-minute cardio workout", "Light strength training", "Yoga session"]
             return render(request, 'workout_plan.html', {
@@ -368,6 +343,7 @@ def workout_plan_view(request):
         features = [[age, weight, height]]
 
         # Call model.predict for main recommendation
+        inference_start = time.perf_counter()
         prediction = workout_model.predict(features)[0]
 
         # Generate additional suggestions based on typical calorie burn goals
@@ -380,20 +356,23 @@ def workout_plan_view(request):
             target_calories = 250  # Maintenance level
 
         suggestions = workout_model.generate_workout_suggestions(target_calories)
+        workout_metrics.observe('inference', time.perf_counter() - inference_start)
 
         # Save the workout plan to database
-        try:
-            workout_text = f"Main: {prediction}\nSuggestions:\n" + "\n".join([f"- {s['activity_type']}: {s['duration']} min, {s['calories_burned']} cal" for s in suggestions])
-            WorkoutPlan.objects.create(
-                age=age,
-                gender=request.POST.get('gender', 'male'),  # Assuming gender is in form
-                weight=weight,
-                height=height,
-                calories_burned=target_calories,
-                workout_plan=workout_text
-            )
-        except Exception as e:
-            print(f"Error saving workout plan: {e}")
+        with workout_metrics.time('persist'):
+            try:
+                workout_text = f"Main: {prediction}\nSuggestions:\n" + "\n".join([f"- {s['activity_type']}: {s['duration']} min, {s['calories_burned']} cal" for s in suggestions])
+                WorkoutPlan.objects.create(
+                    age=age,
+                    gender=request.POST.get('gender', 'male'),  # Assuming gender is in form
+                    weight=weight,
+                    height=height,
+                    calories_burned=target_calories,
+                    workout_plan=workout_text
+                )
+            except Exception as e:
+                workout_metrics.count_error('persist')
+                print(f"Error saving workout plan: {e}")
 
         # Pass data to template
         return render(request, 'workout_plan.html', {
@@ -7,19 +7,23 @@ from django.contrib.auth.hashers import make_password, check_password
 from allauth.socialaccount.models import SocialAccount
 from allauth.account.signals import user_signed_up, user_logged_in
 from django.dispatch import receiver
-import requests
 from PIL import Image
 from io import BytesIO
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from transformers import pipeline
-import torch
-import joblib
 import os
+import time
 import numpy as np
 from django.conf import settings
+from .linear_engine import WEIGHT_CHANGE_MODEL, get_linear_model
+from .metrics import model_metrics
+from .prediction_cache import prediction_cache
+from .food_label_map import nutrition_for_labels
+from .nutrients import Nutrients, display
+from .food_classifier import food_classifier, food_metrics
 
-API_KEY = os.environ.get('USDA_API_KEY', '')
+weight_change_cache = prediction_cache('weight_change', 'weight_change/')
+weight_change_metrics = model_metrics('weight_change', 'weight_change/')
 
 def landing_page(request):
     # Check if there's a pending redirect from OAuth login
@@ -371,9 +375,11 @@ def dashboard(request):
 
     return render(request, 'dashboard.html')
 
+@weight_change_metrics.instrument
 def predict_weight_change(request):
     if request.method == 'POST':
         try:
+            encode_start = time.perf_counter()
             # Get form data - matching the 5 features expected by the model
             age = int(request.POST.get('age', 25))
             gender = request.POST.get('gender', 'male')
@@ -387,11 +393,8 @@ def predict_weight_change(request):
             total_calories_needed = weight_difference_kg * 7700  # 7700 calories per kg
             daily_caloric_surplus_deficit = total_calories_needed / (duration_weeks * 7)
 
-            # Load the model
-            model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'weight_change', 'weight_change_model.pkl')
-            model_dict = joblib.load(model_path)
-            model = model_dict['model']
-            scaler = model_dict.get('scaler')
+            # Scaler and regressor fused into one NumPy weight matrix
+            model = get_linear_model(WEIGHT_CHANGE_MODEL)
 
             # Encode categorical variables (matching model expectations)
             gender_encoded = 1 if gender.lower() == 'male' else 0
@@ -413,19 +416,11 @@ def predict_weight_change(request):
                 daily_caloric_surplus_deficit,
                 physical_activity_encoded
             ]])
-
-            # Scale features if scaler exists
-            if scaler:
-                try:
-                    features_scaled = scaler.transform(features)
-                except Exception as scale_error:
-                    print(f"Scaler transform failed: {scale_error}, using unscaled features")
-                    features_scaled = features
-            else:
-                features_scaled = features
+            weight_change_metrics.observe('encode', time.perf_counter() - encode_start)
 
             # Make prediction - model returns [weight_change, duration]
-            prediction = model.predict(features_scaled)[0]
+            with weight_change_metrics.time('inference'):
+                prediction = weight_change_cache.predict(features, model.predict)[0]
             predicted_weight_change_kg = float(prediction[0])  # First output is weight change
 
             # Calculate additional metrics for display
@@ -433,17 +428,19 @@ def predict_weight_change(request):
             daily_calorie_adjustment = weekly_change_needed * 7700 / 7  # 7700 calories per kg
 
             # Save the weight prediction to database
-            try:
-                WeightPrediction.objects.create(
-                    current_weight=current_weight,
-                    duration_weeks=duration_weeks,
-                    weight_change_kg=round(predicted_weight_change_kg, 2),
-                    physical_activity_level=physical_activity_level
-                )
-            except Exception as e:
-                print(f"Error saving weight prediction: {e}")
-                # Don't fail the whole prediction if DB save fails
-                pass
+            with weight_change_metrics.time('persist'):
+                try:
+                    WeightPrediction.objects.create(
+                        current_weight=current_weight,
+                        duration_weeks=duration_weeks,
+                        weight_change_kg=round(predicted_weight_change_kg, 2),
+                        physical_activity_level=physical_activity_level
+                    )
+                except Exception as e:
+                    weight_change_metrics.count_error('persist')
+                    print(f"Error saving weight prediction: {e}")
+                    # Don't fail the whole prediction if DB save fails
+                    pass
 
             context = {
                 'prediction': round(predicted_weight_change_kg, 2),
@@ -462,91 +459,78 @@ def predict_weight_change(request):
             return render(request, 'weight_change_prediction.html', context)
 
         except Exception as e:
+            weight_change_metrics.count_error()
             messages.error(request, f'Error making prediction: {str(e)}')
             return render(request, 'weight_change_prediction.html')
 
     return render(request, 'weight_change_prediction.html')
 
+def _health_score(calories):
+    """Simple health score out of 10 from calories per 100 g."""
+    if calories is None:
+        return 7.5  # Default score
+    if calories < 200:
+        return 8.5
+    elif calories < 400:
+        return 7.5
+    elif calories < 600:
+        return 6.0
+    return 4.5
+
+def _food_candidate(rank, pred, nutrients):
+    """One classifier guess with its nutrients per 100 g, formatted for the recognition page."""
+    return {
+        'rank': rank,
+        'food_name': pred['label'].title(),
+        **display(nutrients),
+        'confidence': f"{pred['score']:.1%}",
+        'health_score': _health_score(nutrients.calories if nutrients else None)
+    }
+
 @csrf_exempt
+@food_metrics.instrument
 def food_recognition_page(request):
     if request.method == 'POST' and request.FILES.get('food_image'):
         try:
             uploaded_file = request.FILES['food_image']
-            image = Image.open(uploaded_file)
-
-            # Load model with GPU if available
-            device = 0 if torch.cuda.is_available() else -1
-            classifier = pipeline('image-classification', model='nateraw/food', device=device)
-
-            preds = classifier(image, top_k=1)
-            food_label = preds[0]['label']
-
-            # Fetch nutritional data from USDA API
-            url = f'https://api.nal.usda.gov/fdc/v1/foods/search?query={food_label}&api_key={API_KEY}'
-            response = requests.get(url)
-            data = response.json()
-
-            # Default nutritional values
-            calories = 'Not found'
-            protein = 'Not found'
-            carbs = 'Not found'
-            fat = 'Not found'
-
-            if 'foods' in data and len(data['foods']) > 0:
-                food = data['foods'][0]
-                for nutrient in food.get('foodNutrients', []):
-                    nutrient_name = nutrient.get('nutrientName', '')
-                    if 'Energy' in nutrient_name and 'kcal' in nutrient.get('unitName', '').lower():
-                        calories = f"{nutrient['value']} kcal"
-                    elif 'Protein' in nutrient_name:
-                        protein = f"{nutrient['value']}g"
-                    elif 'Carbohydrate' in nutrient_name:
-                        carbs = f"{nutrient['value']}g"
-                    elif 'Total lipid' in nutrient_name or 'Fat' in nutrient_name:
-                        fat = f"{nutrient['value']}g"
-
-            # Calculate health score (simple algorithm)
-            health_score = 7.5  # Default score
-            if calories != 'Not found':
-                try:
-                    cal_value = float(calories.split()[0])
-                    if cal_value < 200:
-                        health_score = 8.5
-                    elif cal_value < 400:
-                        health_score = 7.5
-                    elif cal_value < 600:
-                        health_score = 6.0
-                    else:
-                        health_score = 4.5
-                except:
-                    pass
+            with food_metrics.time('encode'):
+                image = Image.open(uploaded_file)
+
+            # The top candidates, so the user can pick another one if the first guess is wrong
+            with food_metrics.time('inference'):
+                preds = food_classifier.classify(image, top_k=getattr(settings, 'FOOD_RECOGNITION_CANDIDATES', 3))
+
+            # Nutrients per 100 g of every candidate, precomputed per classifier label
+            # (manage.py build_food_label_map); labels missing from the map are looked up concurrently
+            with food_metrics.time('lookup'):
+                nutritions = nutrition_for_labels([pred['label'] for pred in preds])
+            candidates = [_food_candidate(rank, pred, nutrition)
+                          for rank, (pred, nutrition) in enumerate(zip(preds, nutritions), 1)]
+            best, nutrients = candidates[0], nutritions[0] or Nutrients()
 
             # Save the food recognition to database
-            try:
-                # Extract numeric values
-                cal_val = float(calories.split()[0]) if calories != 'Not found' else 0
-                prot_val = float(protein.split('g')[0]) if protein != 'Not found' else None
-                carb_val = float(carbs.split('g')[0]) if carbs != 'Not found' else None
-                fat_val = float(fat.split('g')[0]) if fat != 'Not found' else None
-
-                FoodRecognition.objects.create(
-                    recognized_food=food_label.title(),
-                    calories=cal_val,
-                    protein=prot_val,
-                    carbs=carb_val,
-                    fat=fat_val
-                )
-            except Exception as e:
-                print(f"Error saving food recognition: {e}")
+            with food_metrics.time('persist'):
+                try:
+                    FoodRecognition.objects.create(
+                        recognized_food=best['food_name'],
+                        calories=round(nutrients.calories or 0),
+                        protein=nutrients.protein,
+                        carbs=nutrients.carbs,
+                        fat=nutrients.fat
+                    )
+                except Exception as e:
+                    food_metrics.count_error('persist')
+                    print(f"Error saving food recognition: {e}")
 
             return JsonResponse({
-                'food_name': food_label.title(),
-                'calories': calories,
-                'protein': protein,
-                'carbs': carbs,
-                'fat': fat,
-                'confidence': f"{preds[0]['score']:.1%}",
-                'health_score': health_score
+                'food_name': best['food_name'],
+                'calories': best['calories'],
+                'protein': best['protein'],
+                'carbs': best['carbs'],
+                'fat': best['fat'],
+                'confidence': best['confidence'],
+                'health_score': best['health_score'],
+                'candidates': candidates
             })
 
         except Exception as e:
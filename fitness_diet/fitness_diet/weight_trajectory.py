@@ -0,0 +1,70 @@
+"""
+Week-by-week weight projection from the weight-change model.
+
+The model predicts the total change over a plan from the user's weight and
+the daily caloric surplus/deficit. To draw a curve, every week ``k`` of the
+plan gets its own feature row: the weight the user should be at when that
+week starts and the daily surplus/deficit needed to reach the target in the
+weeks that remain. The row's prediction, spread over the remaining weeks,
+is the expected change during week ``k``.
+
+Each row starts from the planned weight rather than the previous row's
+projection, so the rows do not depend on each other. All weeks are scored
+in one model call, and cost barely grows with the plan length.
+"""
+
+import numpy as np
+
+from .tabular_models import ACTIVITY_LEVELS
+
+KCAL_PER_KG = 7700
+
+
+def trajectory_features(age, gender, current_weight, target_weight, duration_weeks, physical_activity_level):
+    """Return the ``(duration_weeks, 5)`` feature matrix and the planned weight at the start of each week."""
+    weeks = np.arange(duration_weeks)
+    remaining_weeks = duration_weeks - weeks
+    planned_weight = current_weight + (target_weight - current_weight) * weeks / duration_weeks
+
+    X = np.empty((duration_weeks, 5))
+    X[:, 0] = age
+    X[:, 1] = 1 if str(gender).lower() == 'male' else 0
+    X[:, 2] = planned_weight
+    X[:, 3] = (target_weight - planned_weight) * KCAL_PER_KG / (remaining_weeks * 7)
+    X[:, 4] = ACTIVITY_LEVELS.get(physical_activity_level, 2)
+    return X, planned_weight
+
+
+def simulate_trajectory(model, data):
+    """
+    Project the weight at the end of every week of the plan in ``data``.
+
+    ``data`` uses the field names and defaults of ``predict_weight_change``.
+    Raises ``ValueError`` for a non-positive ``duration_weeks``.
+    """
+    age = int(data.get('age', 25))
+    gender = data.get('gender', 'male')
+    current_weight = float(data.get('current_weight', 70))
+    target_weight = float(data.get('target_weight', 65))
+    duration_weeks = int(data.get('duration_weeks', 8))
+    physical_activity_level = data.get('physical_activity_level', 'moderately_active')
+    if duration_weeks < 1:
+        raise ValueError("duration_weeks must be at least 1")
+
+    X, planned_weight = trajectory_features(age, gender, current_weight, target_weight,
+                                            duration_weeks, physical_activity_level)
+    remaining_change = model.predict(X)[:, 0]
+    weekly_change = remaining_change / (duration_weeks - np.arange(duration_weeks))
+    projected_weight = current_weight + np.concatenate([[0.0], np.cumsum(weekly_change)])
+
+    return {
+        'current_weight': current_weight,
+        'target_weight': target_weight,
+        'duration_weeks': duration_weeks,
+        # Same value the single-row endpoint reports for this plan
+        'predicted_weight_change': round(float(remaining_change[0]), 2),
+        'weeks': list(range(duration_weeks + 1)),
+        'projected_weight': np.round(projected_weight, 2).tolist(),
+        'planned_weight': np.round(np.append(planned_weight, target_weight), 2).tolist(),
+        'weekly_change': np.round(weekly_change, 3).tolist(),
+    }
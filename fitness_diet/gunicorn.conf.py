@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration for FitAI.
+
+Picked up automatically by ``gunicorn`` when started from this directory
+(see Procfile).
+
+GUNICORN_MODEL_PRELOAD chooses where the ML models are loaded:
+
+* ``master`` (default): once in the master before forking, so workers
+  share the pages copy-on-write (see ``fitness_diet.preload``).
+* ``worker``: once per worker at boot.
+* ``off``: lazily, on the first request that needs each model.
+"""
+
+import os
+
+MODEL_PRELOAD = os.environ.get('GUNICORN_MODEL_PRELOAD', 'master').lower()
+
+# Import the project in the master so the preloaded models are inherited by every worker
+preload_app = MODEL_PRELOAD == 'master'
+
+
+def when_ready(server):
+    """Load every model in the master and freeze the heap before the first fork."""
+    if MODEL_PRELOAD != 'master':
+        return
+
+    from fitness_diet.preload import freeze_heap, preload_models
+
+    stats = preload_models()
+    frozen = freeze_heap()
+    server.log.info("Preloaded %d model artifacts in the master; %d objects frozen", len(stats), frozen)
+
+
+def post_worker_init(worker):
+    """Load models per worker if asked to, and optionally build the food classifier."""
+    from django.conf import settings
+
+    if MODEL_PRELOAD == 'worker':
+        from fitness_diet.preload import preload_models
+
+        preload_models()
+
+    if not getattr(settings, 'FOOD_CLASSIFIER_WARMUP', False):
+        return
+
+    from fitness_diet.food_classifier import food_classifier
+
+    try:
+        food_classifier.warm_up()
+        worker.log.info("Food classifier warmed up in %.2fs", food_classifier.build_seconds or 0)
+    except Exception as e:
+        worker.log.warning("Food classifier warm-up failed: %s", e)
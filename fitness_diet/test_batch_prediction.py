@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the batch prediction API scores records exactly like
+the single-row endpoints.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: persisted batches write HealthAssessment and CalorieCalculation rows
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.test import Client
+
+from fitness_diet.metrics import model_metrics
+from fitness_diet.models import CalorieCalculation
+from fitness_diet.tabular_models import TABULAR_MODELS
+
+HEART_RECORDS = [
+    {},
+    {'age': 40, 'sex': 0, 'chest_pain_type': 'ATA', 'resting_bp': 130, 'cholesterol': 180,
+     'max_hr': 170, 'oldpeak': 0.0, 'st_slope': 'Up'},
+    {'age': 67, 'sex': 1, 'chest_pain_type': 'ASY', 'cholesterol': 290, 'fasting_bs': 1,
+     'resting_ecg': 'LVH', 'max_hr': 110, 'exercise_angina': 1, 'oldpeak': 2.5},
+]
+LUNG_RECORDS = [
+    {},
+    {'age': 33, 'gender': 0, 'smoking': 7, 'air_pollution': 6, 'coughing_blood': 5},
+    {'age': 58, 'smoking': 0, 'fatigue': 0, 'dry_cough': 0},
+]
+
+
+def post_batch(client, model_name, records):
+    response = client.post(f'/api/predict/{model_name}/batch',
+                           data=json.dumps({'records': records, 'persist': False}),
+                           content_type='application/json')
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def test_batch_matches_single_row_views():
+    """Batch results equal the heart and lung single-row endpoints"""
+    client = Client()
+    for model_name, url, records in [('heart_disease', '/heart-disease-prediction/', HEART_RECORDS),
+                                     ('lung_disease', '/lung-disease-prediction/', LUNG_RECORDS)]:
+        batch = post_batch(client, model_name, records)
+        assert batch['count'] == len(records)
+        assert set(batch['timings_ms']) == {'encode_ms', 'predict_ms'}
+        for record, result in zip(records, batch['results']):
+            single = client.post(url, data=json.dumps(record), content_type='application/json').json()
+            assert result == single, (model_name, record, result, single)
+        print(f"✓ {model_name}: {len(records)} records match the single-row endpoint")
+
+
+def test_batch_rejects_bad_requests():
+    """Unknown models and malformed payloads are rejected"""
+    client = Client()
+    assert client.post('/api/predict/unknown/batch', data='[]', content_type='application/json').status_code == 404
+    assert client.post('/api/predict/heart_disease/batch', data='{"records": 3}',
+                       content_type='application/json').status_code == 400
+    assert client.get('/api/predict/heart_disease/batch').status_code == 405
+    zero_weeks = client.post('/api/predict/weight_change/batch', data='[{"duration_weeks": 0}]',
+                             content_type='application/json')
+    assert zero_weeks.status_code == 400 and 'duration_weeks' in zero_weeks.json()['error']
+    assert client.post('/api/predict/weight_change/batch', data='{"records": [{}], "persist": "false"}',
+                       content_type='application/json').status_code == 400
+    print("✓ Bad batch requests rejected")
+
+
+def test_calories_and_weight_batches():
+    """Calorie-burn and weight-change batches return one result per record"""
+    client = Client()
+    calories = post_batch(client, 'calories_burnt', [{'gender': 'male'}, {'duration': 60, 'heart_rate': 140}])
+    assert len(calories['results']) == 2 and 'calories_burnt' in calories['results'][0]
+    weight = post_batch(client, 'weight_change', [{}, {'current_weight': 90, 'target_weight': 80}])
+    assert len(weight['results']) == 2 and 'prediction' in weight['results'][0]
+    print("✓ Calorie-burn and weight-change batches scored")
+
+
+def test_batch_persist():
+    """Persisted batches are saved in one go; a failed save is counted, not raised"""
+    client = Client()
+    records = [{'gender': 'male'}, {'duration': 60}]
+    response = client.post('/api/predict/calories_burnt/batch', data=json.dumps(records),
+                           content_type='application/json').json()
+    assert response['saved'] == 2 and CalorieCalculation.objects.count() == 2
+
+    spec = TABULAR_MODELS['calories_burnt']
+    metrics = model_metrics(spec.name)
+    errors = metrics.errors['persist'].value if 'persist' in metrics.errors else 0
+
+    def fail(records, results):
+        raise RuntimeError('database is locked')
+
+    spec.persist = fail
+    try:
+        response = client.post('/api/predict/calories_burnt/batch', data=json.dumps(records),
+                               content_type='application/json')
+    finally:
+        del spec.persist
+    assert response.status_code == 200 and response.json()['saved'] == 0
+    assert metrics.errors['persist'].value == errors + 1
+    print("✓ Batch persisted; failed saves counted as persist errors")
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    test_batch_matches_single_row_views()
+    test_batch_rejects_bad_requests()
+    test_calories_and_weight_batches()
+    test_batch_persist()
+    print("\n🎉 ALL BATCH PREDICTION TESTS PASSED!")
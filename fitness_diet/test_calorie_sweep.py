@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the calorie-burn sweep scores the whole grid like
+the per-point endpoints, in one model call and without database writes.
+"""
+
+import json
+import os
+import sys
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+BASE = {'gender': 'male', 'age': 31, 'height': 180, 'weight': 78, 'heart_rate': 110, 'body_temp': 40.1}
+
+
+def post_sweep(client, payload):
+    return client.post('/api/calories-burnt/sweep', data=json.dumps(payload),
+                       content_type='application/json')
+
+
+def post_points(client, records):
+    response = client.post('/api/predict/calories_burnt/batch',
+                           data=json.dumps({'records': records, 'persist': False}),
+                           content_type='application/json')
+    return [result['calories_burnt'] for result in response.json()['results']]
+
+
+def test_one_axis_matches_single_points():
+    """A duration sweep equals scoring each duration separately"""
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        response = post_sweep(client, {'base': BASE, 'sweep': {'duration': {'start': 5, 'stop': 60, 'num': 12}}})
+    assert response.status_code == 200, response.content
+    assert len(queries) == 0, "sweep must not touch the database"
+    body = response.json()
+    assert body['shape'] == [12]
+    expected = post_points(client, [dict(BASE, duration=d) for d in body['axes']['duration']])
+    assert body['calories_burnt'] == expected
+    print("✓ One-axis sweep matches per-point scoring without database queries")
+
+
+def test_two_axes_grid_layout():
+    """Two axes come back as rows of the first axis by columns of the second"""
+    client = Client()
+    durations, heart_rates = [10, 20, 30], [90, 120]
+    body = post_sweep(client, {'base': BASE, 'sweep': {'duration': durations, 'heart_rate': heart_rates}}).json()
+    assert body['shape'] == [3, 2]
+    expected = post_points(client, [dict(BASE, duration=d, heart_rate=h) for d in durations for h in heart_rates])
+    assert [value for row in body['calories_burnt'] for value in row] == expected
+    print("✓ Two-axis grid laid out row-major by the first axis")
+
+
+def test_invalid_sweeps():
+    """Bad fields, axes and oversized grids are rejected"""
+    client = Client()
+    assert post_sweep(client, {'sweep': {'gender': [0, 1]}}).status_code == 400
+    assert post_sweep(client, {'sweep': {'age': [20], 'weight': [60], 'height': [170]}}).status_code == 400
+    assert post_sweep(client, {'sweep': {'age': {'start': 20}}}).status_code == 400
+    assert post_sweep(client, {'sweep': {'age': []}}).status_code == 400
+    assert post_sweep(client, {'sweep': {'age': {'start': 1, 'stop': 90, 'num': 1000},
+                                         'weight': {'start': 40, 'stop': 150, 'num': 1000}}}).status_code == 413
+    # num is bounded before the axis is allocated: 10**13 points would be an 80 TB linspace
+    assert post_sweep(client, {'sweep': {'age': {'start': 1, 'stop': 2, 'num': 10 ** 13}}}).status_code == 413
+    for num in (0, -5):
+        assert post_sweep(client, {'sweep': {'age': {'start': 1, 'stop': 2, 'num': num}}}).status_code == 400
+    assert client.get('/api/calories-burnt/sweep').status_code == 405
+    print("✓ Invalid sweeps rejected")
+
+
+if __name__ == '__main__':
+    test_one_axis_matches_single_points()
+    test_two_axes_grid_layout()
+    test_invalid_sweeps()
+    print("\n🎉 ALL CALORIE SWEEP TESTS PASSED!")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local USDA FoodData Central store: streaming
+CSV and JSON imports in chunks, indexed label lookups, and the remote
+API fallback.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import warnings
+from unittest import mock
+
+import django
+import requests
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: import_fdc --replace swaps in fixture foods
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from fitness_diet.http_client import http_client
+from fitness_diet.fdc_store import iter_json_array, lookup_nutrition, search_name
+from fitness_diet.models import FdcFood, FdcFoodNutrient, FdcNutrient
+
+NUTRIENTS = [(1008, 'Energy', 'KCAL'), (1003, 'Protein', 'G'), (1004, 'Total lipid (fat)', 'G'),
+             (1005, 'Carbohydrate, by difference', 'G'), (1089, 'Iron, Fe', 'MG')]
+FOODS = [
+    # fdc_id, data_type, description, category id, {nutrient_id: amount}
+    (1001, 'branded_food', 'APPLE PIE', '', {1008: 300.0, 1003: 2.0}),
+    (1002, 'sr_legacy_food', 'Apple pie', '18', {1008: 265.0, 1003: 2.4, 1004: 12.5, 1005: 37.1, 1089: 0.5}),
+    (1003, 'foundation_food', 'Pizza, cheese, thin crust', '21', {1008: 280.0, 1003: 12.0}),
+    (1004, 'survey_fndds_food', 'Sushi roll, california', '', {1008: 140.0}),
+]
+
+
+def write_csv_dump(root):
+    def write(name, header, rows):
+        with open(os.path.join(root, name), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    write('nutrient.csv', ['id', 'name', 'unit_name', 'nutrient_nbr', 'rank'],
+          [(i, name, unit, '', '') for i, name, unit in NUTRIENTS])
+    write('food_category.csv', ['id', 'code', 'description'], [('18', '1800', 'Baked Products'),
+                                                                ('21', '2100', 'Fast Foods')])
+    write('food.csv', ['fdc_id', 'data_type', 'description', 'food_category_id', 'publication_date'],
+          [(fdc_id, data_type, description, category, '2019-04-01')
+           for fdc_id, data_type, description, category, _ in FOODS])
+    rows, row_id = [], 1
+    for fdc_id, _, _, _, amounts in FOODS:
+        for nutrient_id, amount in amounts.items():
+            rows.append((row_id, fdc_id, nutrient_id, amount))
+            row_id += 1
+    rows.append((row_id, 999999, 1008, 50.0))  # food not in food.csv
+    write('food_nutrient.csv', ['id', 'fdc_id', 'nutrient_id', 'amount'], rows)
+
+
+def write_json_dump(path):
+    foods = [{
+        'fdcId': 2001, 'dataType': 'Foundation', 'description': 'Hummus, commercial',
+        'foodCategory': {'description': 'Legumes'},
+        'foodNutrients': [{'nutrient': {'id': 2047, 'name': 'Energy (Atwater General Factors)', 'unitName': 'kcal'},
+                           'amount': 229.0},
+                          {'nutrient': {'id': 1003, 'name': 'Protein', 'unitName': 'g'}, 'amount': 7.35}],
+    }]
+    with open(path, 'w') as f:
+        json.dump({'FoundationFoods': foods}, f)
+
+
+def test_search_name():
+    """Labels and FDC descriptions normalize to the same key"""
+    assert search_name('apple_pie') == 'apple pie'
+    assert search_name('Pie, Apple (baked)') == 'pie apple baked'
+    print("✓ Labels normalized for indexed lookups")
+
+
+def test_json_stream_small_chunks():
+    """The JSON reader yields every element even when chunks split tokens"""
+    text = json.dumps({'Foods': [{'a': 1, 's': 'x]},['}, 123456, [1, 2], 'tail', 1.5]})
+    assert list(iter_json_array(io.StringIO(text), chunk_size=3)) == [{'a': 1, 's': 'x]},['}, 123456, [1, 2],
+                                                                      'tail', 1.5]
+    print("✓ JSON array streamed with 3-character chunks")
+
+
+def test_csv_import_and_lookup():
+    """A chunked CSV import is queryable and re-importing is idempotent"""
+    call_command('migrate', verbosity=0)
+    with tempfile.TemporaryDirectory() as root:
+        write_csv_dump(root)
+        call_command('import_fdc', root, '--replace', '--chunk-size', '2', stdout=io.StringIO())
+        call_command('import_fdc', root, '--chunk-size', '3', stdout=io.StringIO())
+
+    assert FdcFood.objects.count() == 4
+    assert not FdcFoodNutrient.objects.filter(food_id=999999).exists()
+    assert not FdcNutrient.objects.filter(id=1089).exists(), "non-default nutrient imported"
+    assert FdcFood.objects.get(fdc_id=1002).category == 'Baked Products'
+
+    with override_settings(USDA_REMOTE_FALLBACK=False):
+        apple = lookup_nutrition('apple_pie')
+        assert apple.fdc_id == 1002, "SR legacy should win over branded"
+        assert apple.as_dict() == {'fdc_id': 1002, 'description': 'Apple pie', 'calories': 265.0, 'protein': 2.4,
+                         'carbs': 37.1, 'fat': 12.5, 'source': 'local'}
+        assert lookup_nutrition('pizza').fdc_id == 1003  # prefix
+        assert lookup_nutrition('california_roll').fdc_id == 1004  # every word
+        assert lookup_nutrition('ramen') is None
+    print("✓ CSV dump imported in chunks; lookups by exact name, prefix and words")
+
+
+def test_json_import_and_filters():
+    """JSON exports import with Atwater energy; --data-types filters foods"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'foundation.json')
+        write_json_dump(path)
+        call_command('import_fdc', path, '--data-types', 'branded_food', stdout=io.StringIO())
+        assert not FdcFood.objects.filter(fdc_id=2001).exists()
+        call_command('import_fdc', path, stdout=io.StringIO())
+
+    with override_settings(USDA_REMOTE_FALLBACK=False):
+        hummus = lookup_nutrition('hummus')
+    assert hummus.calories == 229.0 and hummus.protein == 7.35
+    print("✓ JSON export imported; data-type filter honoured")
+
+
+def test_remote_fallback():
+    """Unknown labels go to the USDA API with a timeout, and failures return None"""
+    response = mock.Mock()
+    response.json.return_value = {'foods': [{'fdcId': 7, 'description': 'Ramen', 'foodNutrients': [
+        {'nutrientId': 1008, 'unitName': 'KCAL', 'value': 436.0},
+        {'nutrientId': 1003, 'unitName': 'G', 'value': 10.0},
+    ]}]}
+    with override_settings(USDA_REMOTE_FALLBACK=True, USDA_API_TIMEOUT=2.5):
+        with mock.patch.object(http_client('usda'), 'get', return_value=response) as get:
+            ramen = lookup_nutrition('ramen')
+            assert get.call_args.kwargs['timeout'] == 2.5
+            assert lookup_nutrition('apple pie').source == 'local'
+            assert get.call_count == 1
+        assert ramen.calories == 436.0 and ramen.source == 'remote'
+
+        with mock.patch.object(http_client('usda'), 'get', side_effect=requests.Timeout):
+            assert lookup_nutrition('pho') is None
+    print("✓ Remote fallback used only for unknown foods, with a timeout")
+
+
+if __name__ == "__main__":
+    test_search_name()
+    test_json_stream_small_chunks()
+    test_csv_import_and_lookup()
+    test_json_import_and_filters()
+    test_remote_fallback()
+    print("\n🎉 ALL FDC STORE TESTS PASSED!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the columnar food catalog behind rule-based diet
+plans: the sample fallback, diet-type masks, read-only columns, reloads
+after catalog changes and meal selection on index arrays.
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import warnings
+
+import django
+import numpy as np
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the tests need an empty food catalog, then fill it
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+
+from fitness_diet import food_catalog
+from fitness_diet.food_catalog import NUTRIENTS, SAMPLE_FOODS, FoodCatalog
+from fitness_diet.models import FoodDatabase
+from fitness_diet.views_rule_based import select_foods_for_meal
+
+
+def test_sample_catalog():
+    """An empty FoodDatabase falls back to the sample; masks match the diet filters"""
+    food_catalog.invalidate()
+    catalog = food_catalog.catalog()
+    assert catalog is food_catalog.catalog(), "loaded once per process"
+    assert list(catalog.names) == SAMPLE_FOODS['food_name']
+
+    protein = np.array(SAMPLE_FOODS['protein_g'])
+    carbs = np.array(SAMPLE_FOODS['carbs_g'])
+    assert np.array_equal(catalog.masks['protein_rich'], protein > 15)
+    assert np.array_equal(catalog.masks['low_carb'], carbs < 20)
+    assert catalog.masks['balanced'].all()
+
+    low_carb = catalog.diet_indices('low_carb')
+    assert set(low_carb) == set(np.flatnonzero(carbs < 20))
+    assert (np.diff(catalog.calories[low_carb]) >= 0).all(), "ordered by calories"
+    assert catalog.diet_indices('keto') is catalog.diet_indices('balanced')
+
+    for array in (catalog.names, catalog.calories, catalog.nutrients['protein_g'], low_carb):
+        try:
+            array[0] = 0
+            raise AssertionError("catalog columns must be read-only")
+        except ValueError:
+            pass
+    print("✓ Sample catalog with diet-type masks and read-only columns")
+
+
+def test_database_catalog_reloads():
+    """Saved foods replace the sample; unknown nutrients are 0 but match no filter"""
+    FoodDatabase.objects.create(name='Tuna', calories=130, protein=28, carbs=0, fat=1)
+    FoodDatabase.objects.create(name='Mystery Bar', calories=250)
+    catalog = food_catalog.catalog()
+    assert list(catalog.names) == ['Tuna', 'Mystery Bar']
+    assert catalog.food(1) == {'name': 'Mystery Bar', 'calories': 250,
+                               'nutrients': {nutrient: 0.0 for nutrient in NUTRIENTS}}
+    assert list(catalog.diet_indices('protein_rich')) == [0]
+    assert list(catalog.diet_indices('low_carb')) == [0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'foods.jsonl')
+        with open(path, 'w') as f:
+            f.write('{"name": "Egg White", "calories": 52, "protein": 11, "carbs": 0.7}\n')
+        call_command('import_foods', path, stdout=io.StringIO(), stderr=io.StringIO())
+    assert 'Egg White' in food_catalog.catalog().names, "import_foods invalidates its own process's catalog"
+
+    FoodDatabase.objects.filter(name='Tuna').first().delete()
+    assert 'Tuna' not in food_catalog.catalog().names
+    print("✓ Catalog loaded from FoodDatabase and reloaded after changes")
+
+
+def test_meal_selection():
+    """Meals are picked from index arrays and summed column-wise"""
+    catalog = FoodCatalog(SAMPLE_FOODS)
+    indices = catalog.diet_indices('protein_rich')
+    random.seed(42)
+    foods, total_calories, nutrients = select_foods_for_meal(catalog, indices, 400, 'Lunch')
+    names = [food['name'] for food in foods]
+    assert set(names) <= set(catalog.names[indices]) and len(set(names)) == len(names)
+    assert total_calories == sum(food['calories'] for food in foods)
+    assert abs(total_calories - 400) <= 50 or len(foods) == min(5, len(indices))
+    assert nutrients['protein_g'] == sum(food['nutrients']['protein_g'] for food in foods)
+
+    random.seed(42)
+    assert select_foods_for_meal(catalog, indices, 400, 'Lunch')[0] == foods, "reproducible with a seed"
+    print("✓ Meal selection on index arrays")
+
+
+if __name__ == "__main__":
+    call_command('migrate', verbosity=0)
+    test_sample_catalog()
+    test_database_catalog_reloads()
+    test_meal_selection()
+    print("\n🎉 ALL FOOD CATALOG TESTS PASSED!")
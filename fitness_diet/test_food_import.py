@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the food catalog importer: CSV, JSON and JSON Lines
+input, row validation, dedupe on name, chunked upserts and the search
+index rebuild.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: import_foods --replace empties the food catalog
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import CommandError, call_command
+
+from fitness_diet import food_catalog, food_search
+from fitness_diet.food_import import InvalidRow, category_value, validate_row
+from fitness_diet.models import FoodDatabase
+
+CSV_ROWS = [
+    {'food_name': 'Chicken Breast', 'calories': '165', 'protein_g': '31', 'carbs_g': '0', 'fats_g': '3.6',
+     'category': 'High Protein'},
+    {'food_name': '  Brown   Rice ', 'calories': '123.4', 'protein_g': '2.6', 'carbs_g': '26', 'fats_g': '',
+     'category': 'Grain'},
+    {'food_name': 'Broccoli', 'calories': 'lots', 'protein_g': '2.8', 'carbs_g': '7', 'fats_g': '0.4',
+     'category': 'vegan'},
+    {'food_name': '', 'calories': '10', 'protein_g': '', 'carbs_g': '', 'fats_g': '', 'category': ''},
+    {'food_name': 'Chicken Breast', 'calories': '170', 'protein_g': '32', 'carbs_g': '0', 'fats_g': '4',
+     'category': 'high_protein'},
+    {'food_name': 'Salmon', 'calories': '208', 'protein_g': '-25', 'carbs_g': '0', 'fats_g': '12',
+     'category': ''},
+]
+
+
+def write_csv(directory, rows):
+    path = os.path.join(directory, 'foods.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def run(*args):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    call_command('import_foods', *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def test_validate_row():
+    """Aliases, whitespace, rounding, categories and range checks"""
+    food = validate_row({'Food_Name': ' Greek  Yogurt', 'KCAL': 99.6, 'protein_g': 17, 'fats_g': None,
+                         'category': 'dairy-free', 'healthy': 'no'})
+    assert food == {'name': 'Greek Yogurt', 'calories': 100, 'protein': 17.0, 'carbs': None, 'fat': None,
+                    'category': 'dairy_free', 'is_healthy': False}
+    assert category_value('Protein') == '' and category_value('Low Carb') == 'low_carb'
+    for row, reason in [({'calories': 1}, 'missing name'), ({'name': 'x'}, 'missing calories'),
+                        ({'name': 'x', 'calories': 'nan'}, 'out of range'),
+                        ({'name': 'x', 'calories': 20000}, 'out of range'),
+                        ({'name': 'x', 'calories': True}, 'not a number'),
+                        ({'name': 'x' * 201, 'calories': 1}, 'longer than'), (['x', 1], 'not an object')]:
+        try:
+            validate_row(row)
+            raise AssertionError(f"{row} should be rejected")
+        except InvalidRow as e:
+            assert reason in str(e), (reason, str(e))
+    print("✓ Rows validated and normalized")
+
+
+def test_csv_import(directory):
+    """Invalid rows are reported and skipped; the last row of a name wins"""
+    out, err = run(write_csv(directory, CSV_ROWS), '--replace', '--chunk-size', '10')
+    assert 'rows/s' in out and '3 invalid, 1 duplicate names' in out, out
+    assert 'foods.csv:4: calories is not a number' in err and 'foods.csv:5: missing name' in err, err
+    foods = {f.name: f for f in FoodDatabase.objects.all()}
+    assert set(foods) == {'Chicken Breast', 'Brown Rice'}
+    chicken = foods['Chicken Breast']
+    assert (chicken.calories, chicken.protein, chicken.category) == (170, 32.0, 'high_protein')
+    assert foods['Brown Rice'].calories == 123 and foods['Brown Rice'].fat is None
+    assert foods['Brown Rice'].category == ''
+    print("✓ CSV imported with validation and dedupe")
+
+
+def test_json_upsert_in_chunks(directory):
+    """JSON arrays and JSON Lines upsert over existing foods, chunk by chunk"""
+    path = os.path.join(directory, 'foods.json')
+    with open(path, 'w') as f:
+        json.dump({'foods': [{'name': f'Protein Bar {i}', 'calories': 200 + i, 'protein': 20} for i in range(7)]
+                   + [{'name': 'Chicken Breast', 'calories': 165, 'category': 'low_carb'}]}, f)
+    out, _ = run(path, '--chunk-size', '3')
+    assert 'Upserted 8 foods from 8 rows' in out, out
+    assert FoodDatabase.objects.count() == 9
+    assert FoodDatabase.objects.get(name='Chicken Breast').category == 'low_carb'
+
+    lines = os.path.join(directory, 'foods.jsonl')
+    with open(lines, 'w') as f:
+        f.write(json.dumps({'name': 'Protein Bar 0', 'calories': 190}) + '\n\n{"name": broken\n')
+    out, err = run(lines)
+    assert '1 invalid' in out and 'foods.jsonl:3: invalid JSON' in err
+    assert FoodDatabase.objects.get(name='Protein Bar 0').calories == 190
+    assert FoodDatabase.objects.count() == 9
+    print("✓ JSON and JSON Lines upserted in chunks")
+
+
+def test_search_index_and_limits(directory):
+    """Imported foods are searchable; --max-invalid stops a bad file"""
+    foods, _ = food_search.search('protein ba')
+    assert len(foods) == 7
+    try:
+        run(write_csv(directory, CSV_ROWS), '--max-invalid', '1', '--show-invalid', '0')
+        raise AssertionError("expected the import to stop")
+    except CommandError as e:
+        assert 'More than 1 invalid rows' in str(e)
+    print("✓ Search index rebuilt; --max-invalid enforced")
+
+
+def test_failed_run_keeps_index_consistent(directory):
+    """A failed --replace run keeps the old catalog; a failed plain run indexes what it committed"""
+    before = set(FoodDatabase.objects.values_list('name', flat=True))
+    bad = [{'name': 'Kiwi', 'calories': '61'}, {'name': 'Mango', 'calories': 'lots'}]
+    for args in (['--replace'], []):
+        try:
+            run(write_csv(directory, bad), '--max-invalid', '0', '--show-invalid', '0', '--chunk-size', '1', *args)
+            raise AssertionError("expected the import to stop")
+        except CommandError:
+            pass
+        if args:
+            assert set(FoodDatabase.objects.values_list('name', flat=True)) == before, "the delete was rolled back"
+            assert food_search.search('kiwi')[0] == [] and len(food_search.search('protein ba')[0]) == 7
+            assert set(food_catalog.catalog().names) == before
+    assert [food['name'] for food in food_search.search('kiwi')[0]] == ['Kiwi']
+    assert 'Kiwi' in food_catalog.catalog().names
+    print("✓ Failed imports roll back --replace and keep the search index and catalog in step")
+
+
+if __name__ == "__main__":
+    call_command('migrate', verbosity=0)
+    test_validate_row()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_csv_import(tmp)
+        test_json_upsert_in_chunks(tmp)
+        test_search_index_and_limits(tmp)
+        test_failed_run_keeps_index_consistent(tmp)
+    print("\n🎉 ALL FOOD IMPORT TESTS PASSED!")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the precomputed Food-101 label -> nutrition map:
+building it from the local FDC store with overrides, loading it through
+the model registry, the live lookup fallback for unmapped labels, and the
+concurrent lookup of the recognition page's top candidates.
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from unittest import mock
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: import_fdc --replace swaps in fixture foods
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, override_settings
+from PIL import Image
+
+from fitness_diet import food_label_map
+from fitness_diet.food_classifier import food_classifier
+from fitness_diet.food_label_map import (FOOD101_LABELS, LABEL_MAP, build_label_map, get_label_map, label_key,
+                                         nutrition_for_label, nutrition_for_labels)
+from fitness_diet.http_client import http_client
+from fitness_diet.model_registry import model_registry
+from fitness_diet.models import FoodRecognition
+from fitness_diet.nutrients import Nutrients
+from test_fdc_store import write_csv_dump
+
+
+def test_labels():
+    """The built-in label list is Food-101 and keys are normalized"""
+    assert len(FOOD101_LABELS) == 101 and len(set(FOOD101_LABELS)) == 101
+    assert label_key('Apple Pie') == label_key('apple_pie') == 'apple_pie'
+    print("✓ 101 Food-101 labels; keys normalized")
+
+
+def test_build_with_overrides():
+    """Labels resolve by name, by override query and by override FDC id"""
+    call_command('migrate', verbosity=0)
+    with tempfile.TemporaryDirectory() as root:
+        write_csv_dump(root)
+        call_command('import_fdc', root, '--replace', stdout=io.StringIO())
+
+    with mock.patch.object(http_client('usda'), 'get', side_effect=AssertionError("remote lookup")):
+        artifact = build_label_map(['apple_pie', 'sushi', 'pizza', 'ramen'],
+                                   overrides={'sushi': 'california roll', 'Pizza': 1003})
+    labels = artifact['labels']
+    assert labels['apple_pie']['fdc_id'] == 1002 and labels['apple_pie']['calories'] == 265.0
+    assert labels['sushi']['fdc_id'] == 1004 and labels['sushi']['query'] == 'california roll'
+    assert labels['pizza']['fdc_id'] == 1003
+    assert artifact['unresolved'] == ['ramen']
+    print("✓ Map built from the local store; overrides by query and FDC id")
+
+
+def test_command_and_lookup():
+    """The command writes the artifact, and views read it without touching the store"""
+    # Build into a temporary model root, never over a real map
+    artifact_root, model_registry.root = model_registry.root, tempfile.mkdtemp()
+    path = model_registry.path_for(LABEL_MAP)
+    try:
+        try:
+            call_command('build_food_label_map', '--builtin-labels', stdout=io.StringIO())
+            raise AssertionError("unresolved labels should fail the build")
+        except CommandError:
+            pass
+        assert not os.path.exists(path)
+
+        out = io.StringIO()
+        call_command('build_food_label_map', '--builtin-labels', '--allow-unresolved', stdout=out)
+        assert 'labels resolved' in out.getvalue()
+        with open(path) as f:
+            artifact = json.load(f)
+        assert len(artifact['labels']) + len(artifact['unresolved']) == 101
+
+        label_map = get_label_map()
+        assert label_map['apple_pie'].fdc_id == 1002
+        with mock.patch.object(food_label_map, 'lookup_nutrition', side_effect=AssertionError("live lookup")):
+            assert nutrition_for_label('apple_pie').calories == 265.0
+        with override_settings(USDA_REMOTE_FALLBACK=False):
+            assert nutrition_for_label('ramen') is None
+            assert nutrition_for_label('hummus') is None
+    finally:
+        shutil.rmtree(model_registry.root)
+        model_registry.root = artifact_root
+        model_registry.clear()
+    print(f"✓ {len(artifact['labels'])} labels served from the precomputed map")
+
+
+def test_missing_map():
+    """Before the map is built, labels fall back to a live lookup"""
+    assert get_label_map() == {}
+    with override_settings(USDA_REMOTE_FALLBACK=False):
+        assert nutrition_for_label('apple_pie').source == 'local'
+    print("✓ Live lookup used when no map has been built")
+
+
+def slow_lookup(query, delay=0.2):
+    """Stand-in for a remote lookup: ``delay`` seconds, calories = length of the query"""
+    time.sleep(delay)
+    return Nutrients(None, query, calories=len(query), protein=1.0, source='remote')
+
+
+def test_concurrent_lookups():
+    """Unmapped candidates are looked up concurrently and returned in order"""
+    labels = ['ramen', 'pho', 'takoyaki']
+    with mock.patch.object(food_label_map, 'lookup_nutrition', side_effect=slow_lookup):
+        start = time.perf_counter()
+        records = nutrition_for_labels(labels)
+        elapsed = time.perf_counter() - start
+    assert [r.description for r in records] == labels
+    assert elapsed < 0.45, f"lookups ran serially ({elapsed:.2f}s)"
+    print(f"✓ 3 lookups of 0.2s each resolved in {elapsed:.2f}s")
+
+
+def test_recognition_candidates():
+    """The recognition page returns the ranked top 3 with nutrition for each"""
+    preds = [{'label': 'ramen', 'score': 0.6}, {'label': 'pho', 'score': 0.3}, {'label': 'hot_and_sour_soup',
+                                                                              'score': 0.05}]
+    image = io.BytesIO()
+    Image.new('RGB', (32, 32), 'red').save(image, format='PNG')
+    image.seek(0)
+    image.name = 'soup.png'
+    with mock.patch.object(food_classifier, 'classify', return_value=preds) as classify, \
+            mock.patch.object(food_label_map, 'lookup_nutrition', side_effect=slow_lookup):
+        response = Client().post('/food-recognition/', {'food_image': image})
+    assert response.status_code == 200, response.content
+    assert classify.call_args.kwargs['top_k'] == 3
+    data = response.json()
+    assert data['food_name'] == 'Ramen' and data['calories'] == '5.0 kcal' and data['confidence'] == '60.0%'
+    assert [c['rank'] for c in data['candidates']] == [1, 2, 3]
+    assert [c['food_name'] for c in data['candidates']] == ['Ramen', 'Pho', 'Hot_And_Sour_Soup']
+    assert data['candidates'][2]['calories'] == '17.0 kcal' and data['candidates'][2]['carbs'] == 'Not found'
+    saved = FoodRecognition.objects.latest('id')
+    assert (saved.recognized_food, saved.calories, saved.protein, saved.carbs) == ('Ramen', 5, 1.0, None)
+    print("✓ Recognition returns 3 ranked candidates with nutrition")
+
+
+if __name__ == "__main__":
+    test_labels()
+    test_build_with_overrides()
+    test_command_and_lookup()
+    test_missing_map()
+    test_concurrent_lookups()
+    test_recognition_candidates()
+    print("\n🎉 ALL FOOD LABEL MAP TESTS PASSED!")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the meal-swap food search: the FTS5 index kept in
+sync by model signals, prefix and typo-tolerant ranking, the category
+filter, rebuilds after bulk writes and the autocomplete endpoint.
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the tests fill the food catalog with fixtures
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.test import Client
+
+from fitness_diet import food_search
+from fitness_diet.models import FoodDatabase
+
+FOODS = [
+    ('Chicken Breast', 165, 'high_protein'),
+    ('Grilled Chicken Salad', 350, 'low_carb'),
+    ('Chickpea Curry', 410, 'vegan'),
+    ('Roast Chicken Thigh With Crème Fraîche', 520, ''),
+    ('Broccoli', 34, 'vegan'),
+    ('Tofu Stir Fry', 300, 'vegan'),
+    ('Salmon Fillet', 208, 'high_protein'),
+]
+
+
+def names(query, **kwargs):
+    foods, _ = food_search.search(query, **kwargs)
+    return [food['name'] for food in foods]
+
+
+def setup_foods():
+    call_command('migrate', verbosity=0)
+    for name, calories, category in FOODS:
+        FoodDatabase.objects.create(name=name, calories=calories, category=category)
+
+
+def test_prefix_ranking():
+    """Names starting with the query first, then other name matches, shorter names first"""
+    assert names('chick') == ['Chicken Breast', 'Chickpea Curry', 'Grilled Chicken Salad',
+                              'Roast Chicken Thigh With Crème Fraîche']
+    assert names('chicken s') == ['Grilled Chicken Salad']
+    assert names('CREME fraic') == ['Roast Chicken Thigh With Crème Fraîche'], "diacritics are folded"
+    assert names('chick', limit=2) == ['Chicken Breast', 'Chickpea Curry']
+    assert names('vegan') == ['Broccoli', 'Tofu Stir Fry', 'Chickpea Curry'], "category matches come last"
+    assert names('chick', category='vegan') == ['Chickpea Curry']
+    assert names('  ') == [] and names('"*') == []
+    print("✓ Prefix matches ranked: name starts, then anywhere, then category")
+
+
+def test_typo_tolerance():
+    """Words no index term starts with also match terms one edit away"""
+    foods, corrected = food_search.search('chikcen breast')
+    assert [f['name'] for f in foods] == ['Chicken Breast'] and corrected
+    assert names('brocoli') == ['Broccoli']
+    assert names('slamon') == ['Salmon Fillet']
+    foods, corrected = food_search.search('sal')
+    assert [f['name'] for f in foods] == ['Salmon Fillet', 'Grilled Chicken Salad'] and not corrected, \
+        "known prefixes are not corrected"
+    print("✓ Misspelled words corrected by one edit")
+
+
+def test_signal_sync():
+    """Saves and deletes update the index; renames replace the old entry"""
+    food = FoodDatabase.objects.create(name='Quinoa Bowl', calories=400, category='vegan')
+    assert names('quin') == ['Quinoa Bowl']
+    food.name = 'Barley Risotto With Mushrooms'
+    food.save()
+    assert names('quin') == [] and names('barl') == ['Barley Risotto With Mushrooms']
+    assert names('quinoa') == [], "the renamed food's old terms are gone"
+    food.delete()
+    assert names('barl') == []
+    print("✓ Index follows saves, renames and deletes")
+
+
+def test_rebuild_after_bulk_create():
+    """bulk_create skips signals; rebuild() indexes those rows"""
+    FoodDatabase.objects.bulk_create([FoodDatabase(name=f'Lentil Soup {i}', calories=200) for i in range(5)])
+    assert names('lentil') == []
+    assert food_search.rebuild() == FoodDatabase.objects.count()
+    assert len(names('lentil')) == 5
+    FoodDatabase.objects.filter(name__startswith='Lentil').delete()
+    print("✓ Bulk writes indexed by rebuild")
+
+
+def test_autocomplete_endpoint():
+    """GET /api/foods/autocomplete returns ranked foods as JSON"""
+    client = Client()
+    data = client.get('/api/foods/autocomplete', {'q': 'chick', 'limit': 2}).json()
+    assert [f['name'] for f in data['results']] == ['Chicken Breast', 'Chickpea Curry']
+    assert data['results'][0]['calories'] == 165 and not data['corrected']
+    data = client.get('/api/foods/autocomplete', {'q': 'salmn'}).json()
+    assert data['corrected'] and data['results'][0]['name'] == 'Salmon Fillet'
+    data = client.get('/api/foods/autocomplete', {'q': 'chick', 'category': 'high_protein'}).json()
+    assert [f['name'] for f in data['results']] == ['Chicken Breast']
+    assert client.get('/api/foods/autocomplete', {'q': 'a', 'limit': 'x'}).status_code == 400
+    print("✓ Autocomplete endpoint serves search results")
+
+
+if __name__ == "__main__":
+    setup_foods()
+    test_prefix_ranking()
+    test_typo_tolerance()
+    test_signal_sync()
+    test_rebuild_after_bulk_create()
+    test_autocomplete_endpoint()
+    print("\n🎉 ALL FOOD SEARCH TESTS PASSED!")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the similar-food swap engine: nearest neighbours on
+scaled nutrient vectors, the diet category filter, incremental updates
+from model signals, rebuilds, the suggestion endpoint and catalog swaps.
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+
+import django
+import numpy as np
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the tests fill the food catalog with fixtures
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.test import Client
+
+from fitness_diet import food_swaps
+from fitness_diet.food_swaps import SwapIndex, load_foods, suggest_swaps
+from fitness_diet.models import FoodDatabase, MealPlan, UserProfile
+
+FOODS = [
+    # name, calories, protein, carbs, fat, category
+    ('Grilled Chicken Salad', 450, 40, 20, 22, 'high_protein'),
+    ('Turkey Wrap', 460, 35, 40, 16, 'high_protein'),
+    ('Tofu Bowl', 440, 25, 45, 17, 'vegan'),
+    ('Lentil Curry', 470, 22, 60, 14, 'vegan'),
+    ('Steak Salad', 455, 42, 10, 28, 'low_carb'),
+    ('Oatmeal with Berries', 350, 10, 60, 7, 'vegetarian'),
+    ('Pasta Carbonara', 800, 30, 90, 35, ''),
+    ('Apple', 95, None, 25, None, 'vegan'),
+]
+
+
+def names(foods):
+    return [food['name'] for food in foods]
+
+
+def setup_catalog():
+    call_command('migrate', verbosity=0)
+    for name, calories, protein, carbs, fat, category in FOODS:
+        FoodDatabase.objects.create(name=name, calories=calories, protein=protein, carbs=carbs, fat=fat,
+                                    category=category)
+
+
+def brute_force(index, food, k):
+    """Reference answer: distances to every catalog food, same scaling"""
+    tree, _, _ = index._current()
+    distances = np.linalg.norm(tree.scaled(tree.foods) - tree.scaled([food])[0], axis=1)
+    return [tree.foods[i]['name'] for i in np.argsort(distances, kind='stable')[:k]]
+
+
+def test_nearest_neighbours():
+    """The KD-tree returns what a brute-force scan does, filtered by category"""
+    index = SwapIndex()
+    salad = FoodDatabase.objects.filter(name='Grilled Chicken Salad').values(*food_swaps._FIELDS).first()
+    nearest = index.nearest(4, food=salad)
+    assert names(nearest) == brute_force(index, salad, 4)
+    assert nearest[0]['name'] == 'Grilled Chicken Salad' and nearest[0]['distance'] == 0.0
+    assert names(index.nearest(2, food=salad, exclude={salad['id']})) == ['Steak Salad', 'Turkey Wrap']
+    vegan = index.nearest(3, food=salad, category='vegan')
+    assert names(vegan) == ['Tofu Bowl', 'Lentil Curry', 'Apple'], names(vegan)
+    assert index.nearest(10, food=salad, category='vegetarian')[0]['name'] == 'Oatmeal with Berries'
+    assert len(index.nearest(50, food=salad)) == len(FOODS)
+    assert not index.nearest(3, food=salad, category='gluten_free')
+    assert index.nearest(-1, food=salad) == []
+    print("✓ KD-tree neighbours match brute force; category filter widens the query")
+
+
+def test_meal_suggestions():
+    """A meal in the catalog excludes itself; an unknown one is matched on calories"""
+    meal = MealPlan(food_item='grilled chicken SALAD', calories=450)
+    suggestions = suggest_swaps(meal, k=3)
+    assert 'Grilled Chicken Salad' not in names(suggestions) and len(suggestions) == 3
+    unknown = suggest_swaps(MealPlan(food_item='Mystery Stew', calories=800), k=1)
+    assert names(unknown) == ['Pasta Carbonara']
+    print("✓ Meal suggestions exclude the meal's food; unknown meals matched on calories")
+
+
+def test_incremental_updates():
+    """Signals feed the delta; a rebuild happens only past the threshold"""
+    index = food_swaps._index = SwapIndex(rebuild_min=3, rebuild_fraction=0.0, max_age=0)
+    salad = FoodDatabase.objects.filter(name='Grilled Chicken Salad').values(*food_swaps._FIELDS).first()
+    index.nearest(1, food=salad)
+    assert index.builds == 1
+
+    twin = FoodDatabase.objects.create(name='Chicken Caesar', calories=452, protein=40, carbs=19, fat=22,
+                                       category='high_protein')
+    assert index.stats()['delta'] == 1
+    assert names(index.nearest(2, food=salad)) == ['Grilled Chicken Salad', 'Chicken Caesar']
+    steak = FoodDatabase.objects.get(name='Steak Salad')
+    steak.calories, steak.category = 100, 'vegan'
+    steak.save()
+    assert index.stats() == {'foods': len(FOODS), 'delta': 2, 'removed': 1, 'builds': 1}
+    assert 'Steak Salad' not in names(index.nearest(3, food=salad, category='low_carb'))
+    vegan = {food['name']: food for food in index.nearest(len(FOODS), calories=100, category='vegan')}
+    assert vegan['Steak Salad']['calories'] == 100, "the edited food is served as saved"
+    assert 'Steak Salad' not in names(index.nearest(len(FOODS), calories=100, exclude={steak.id}))
+    twin.delete()
+    assert 'Chicken Caesar' not in names(index.nearest(len(FOODS) + 1, food=salad))
+    assert index.builds == 1, "up to three changes stay in the delta"
+
+    FoodDatabase.objects.create(name='Beef Burrito', calories=700, protein=35, carbs=70, fat=25)
+    FoodDatabase.objects.create(name='Quinoa Salad', calories=400, protein=12, carbs=55, fat=12)
+    index.nearest(1, food=salad)
+    assert index.builds == 2 and index.stats()['delta'] == 0
+    assert len(load_foods()) == index.stats()['foods']
+    print("✓ Changes served from the delta, then folded in by a rebuild")
+
+
+def test_swap_endpoints():
+    """Suggestions are per user meal; a swap by food_id uses catalog values"""
+    user = UserProfile.objects.create(name='Swap Tester', goal='maintain_weight', age=30, sex='female',
+                                      height=165, weight=60, weekly_goal='maintain', email='swaps@example.com',
+                                      password='x')
+    meal = MealPlan.objects.create(user=user, meal_type='lunch', food_item='Tofu Bowl', calories=440)
+    client = Client()
+    assert client.get(f'/api/meals/{meal.id}/swaps').status_code == 401
+
+    session = client.session
+    session['user_id'] = user.id
+    session.save()
+    data = client.get(f'/api/meals/{meal.id}/swaps', {'k': 2, 'category': 'vegan'}).json()
+    assert data['meal']['food_item'] == 'Tofu Bowl'
+    assert names(data['suggestions']) == ['Lentil Curry', 'Apple']
+    assert client.get('/api/meals/999999/swaps').status_code == 404
+    for k in ('0', '-1', 'x'):
+        assert client.get(f'/api/meals/{meal.id}/swaps', {'k': k}).status_code == 400
+
+    lentils = FoodDatabase.objects.get(name='Lentil Curry')
+    response = client.post('/swap-meal/', {'meal_id': meal.id, 'food_id': lentils.id,
+                                           'new_food': 'Anything', 'new_calories': '1'})
+    assert response.json()['success']
+    meal.refresh_from_db()
+    assert (meal.food_item, meal.calories) == ('Lentil Curry', 470)
+    print("✓ Suggestion endpoint and catalog swaps")
+    user.delete()
+
+
+if __name__ == "__main__":
+    setup_catalog()
+    test_nearest_neighbours()
+    test_meal_suggestions()
+    test_incremental_updates()
+    test_swap_endpoints()
+    print("\n🎉 ALL FOOD SWAPS TESTS PASSED!")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared outbound HTTP client against a local stub
+server: connection reuse, read timeouts, bounded retries, the circuit
+breaker, and the USDA search going through it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+import requests
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.test import override_settings
+
+from fitness_diet.fdc_store import search_remote
+from fitness_diet.http_client import CircuitBreaker, CircuitOpenError, HttpClient, http_client
+
+USDA_BODY = {'foods': [{'fdcId': 9, 'description': 'Pho', 'foodNutrients': [
+    {'nutrientId': 1008, 'unitName': 'KCAL', 'value': 60.0}, {'nutrientId': 1003, 'unitName': 'G', 'value': 4.0}]}]}
+
+
+class StubUsda(BaseHTTPRequestHandler):
+    """Answers from ``server.script`` (a list of ``(status, delay)``, then 200s) and records each request"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.client_address, self.path))
+            status, delay = server.script.pop(0) if server.script else (200, 0)
+        time.sleep(delay)
+        body = json.dumps(USDA_BODY if status == 200 else {'error': status}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client gave up (read timeout)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubUsda)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests, server.script = [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/fdc/v1/foods/search'
+
+
+def test_connection_reuse(server, url):
+    """Sequential calls reuse one pooled keep-alive connection"""
+    client = HttpClient('test', retries=0)
+    before = len(server.requests)
+    for _ in range(10):
+        assert client.get(url, params={'query': 'pho'}).json() == USDA_BODY
+    ports = {address[1] for address, _ in server.requests[before:]}
+    assert len(ports) == 1, ports
+    print("✓ 10 calls over 1 pooled connection")
+
+
+def test_retries_with_backoff(server, url):
+    """Transient 503s are retried; persistent ones return the last response"""
+    client = HttpClient('test', retries=2, backoff=0.01)
+    server.script[:] = [(503, 0), (503, 0)]
+    assert client.get(url).status_code == 200
+    assert client.stats()['retries'] == 2 and client.stats()['failures'] == 0
+
+    server.script[:] = [(503, 0)] * 3
+    assert client.get(url).status_code == 503
+    assert client.stats()['failures'] == 1
+    server.script[:] = [(404, 0)]
+    assert client.get(url).status_code == 404, "4xx is not retried"
+    assert client.stats()['retries'] == 4
+    print("✓ 503s retried with bounded attempts; 4xx returned as is")
+
+
+def test_read_timeout(server, url):
+    """A hanging upstream costs at most (retries + 1) read timeouts"""
+    client = HttpClient('test', read_timeout=0.2, retries=1, backoff=0.01)
+    server.script[:] = [(200, 1.0), (200, 1.0)]
+    start = time.perf_counter()
+    try:
+        client.get(url)
+        raise AssertionError("expected a timeout")
+    except requests.Timeout:
+        pass
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0, elapsed
+    print(f"✓ Hung upstream abandoned after {elapsed:.2f}s")
+
+
+def test_circuit_breaker(server, url):
+    """Repeated failures open the circuit; a trial call after the reset closes it"""
+    client = HttpClient('test', retries=0, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.3))
+    server.script[:] = [(502, 0)] * 3
+    for _ in range(3):
+        assert client.get(url).status_code == 502
+    assert client.breaker.state == 'open'
+
+    before = len(server.requests)
+    for _ in range(5):
+        try:
+            client.get(url)
+            raise AssertionError("expected the circuit to be open")
+        except CircuitOpenError:
+            pass
+    assert len(server.requests) == before, "open circuit must not call the upstream"
+    assert client.stats()['rejected'] == 5
+
+    time.sleep(0.35)
+    server.script[:] = [(502, 0)]
+    assert client.get(url).status_code == 502  # failed trial: open again
+    assert client.breaker.state == 'open'
+    time.sleep(0.35)
+    assert client.get(url).status_code == 200
+    assert client.breaker.state == 'closed'
+    print("✓ Circuit opens, fails fast, half-opens and closes")
+
+
+def test_usda_search_through_client(server, url):
+    """The USDA search uses the shared client with the configured URL and timeout"""
+    with override_settings(USDA_API_URL=url, USDA_API_KEY='k'):
+        pho = search_remote('pho')
+    assert pho.calories == 60.0 and pho.protein == 4.0
+    _, path = server.requests[-1]
+    assert 'query=pho' in path and 'api_key=k' in path
+    assert http_client('usda').stats()['calls'] >= 1
+    print("✓ USDA search served by the stub through the shared client")
+
+
+if __name__ == "__main__":
+    stub, stub_url = start_stub()
+    try:
+        test_connection_reuse(stub, stub_url)
+        test_retries_with_backoff(stub, stub_url)
+        test_read_timeout(stub, stub_url)
+        test_circuit_breaker(stub, stub_url)
+        test_usda_search_through_client(stub, stub_url)
+    finally:
+        stub.shutdown()
+    print("\n🎉 ALL HTTP CLIENT TESTS PASSED!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the inference sidecar batches concurrent requests and
+returns the same predictions as the in-process classifier.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+
+from PIL import Image
+
+from fitness_diet.food_classifier import FoodClassifier
+from fitness_diet.inference_server import _LENGTH, InferenceClient, InferenceServer, MicroBatcher, _recv_json
+from test_food_classifier import build_tiny_model
+
+
+def test_sidecar_batches_concurrent_requests():
+    """Concurrent clients are served from shared batches with matching results"""
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, 'model')
+        build_tiny_model(model_dir)
+        local = FoodClassifier(model=model_dir)
+        pipeline = local.get_pipeline()
+
+        socket_path = os.path.join(tmp, 'inference.sock')
+        batcher = MicroBatcher(pipeline, max_batch_size=8, max_wait_ms=50)
+        server = InferenceServer(socket_path, batcher)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = InferenceClient(socket_path, timeout=10)
+            colors = ['red', 'green', 'blue', 'white', 'black', 'yellow', 'purple', 'orange']
+            images = [Image.new('RGB', (48, 40), color) for color in colors]
+
+            with ThreadPoolExecutor(max_workers=len(images)) as pool:
+                remote = list(pool.map(lambda image: client.classify(image, top_k=2), images))
+
+            for image, preds in zip(images, remote):
+                expected = pipeline(image, top_k=2)
+                assert [p['label'] for p in preds] == [p['label'] for p in expected]
+                assert abs(preds[0]['score'] - expected[0]['score']) < 1e-4
+
+            stats = client.stats()
+            assert stats['images'] == len(images)
+            assert stats['largest_batch'] > 1, stats
+            print(f"✓ {stats['images']} images served in {stats['batches']} batches")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_image_size_limits():
+    """Clients send downscaled images; oversized headers are refused before their body is read"""
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, 'model')
+        build_tiny_model(model_dir)
+        pipeline = FoodClassifier(model=model_dir).get_pipeline()
+
+        socket_path = os.path.join(tmp, 'inference.sock')
+        server = InferenceServer(socket_path, MicroBatcher(pipeline, max_wait_ms=1), max_pixels=64 * 64)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            photo = Image.new('RGB', (4000, 3000), 'red')
+            preds = InferenceClient(socket_path, timeout=10, max_side=64).classify(photo)
+            assert preds and photo.size == (4000, 3000)
+
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(10)
+                sock.connect(socket_path)
+                header = json.dumps({'width': 100000, 'height': 100000}).encode()
+                sock.sendall(_LENGTH.pack(len(header)) + header)
+                assert 'exceeds' in _recv_json(sock)['error']
+                assert sock.recv(1) == b'', "the connection is closed"
+            print("✓ Images downscaled by the client; oversized headers refused")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    test_sidecar_batches_concurrent_requests()
+    test_image_size_limits()
+    print("\n🎉 INFERENCE SERVER TESTS PASSED!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the fused weight-change model matches the original
+scaler + regressor pipeline for batch sizes from 1 to 10000, and that
+scoring through the export never imports scikit-learn.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from fitness_diet.linear_engine import WEIGHT_CHANGE_MODEL, FusedLinearModel, pipeline_predict
+from fitness_diet.management.commands.export_linear_models import max_difference, parity_inputs
+from fitness_diet.model_registry import model_registry
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+PROBE = """
+import json, os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+import django
+django.setup()
+from fitness_diet.linear_engine import get_linear_model
+prediction = get_linear_model().predict([[30, 1, 80.0, -500.0, 2]])
+print(json.dumps({'prediction': prediction.tolist(), 'sklearn': 'sklearn' in sys.modules}))
+"""
+
+
+def test_parity():
+    """Fused model matches the pipeline for every batch size"""
+    model_dict = model_registry.get(WEIGHT_CHANGE_MODEL)
+    fused = FusedLinearModel.from_pipeline(model_dict)
+    X = parity_inputs(model_dict, max(BATCH_SIZES), seed=1)
+    for batch_size in BATCH_SIZES:
+        assert max_difference(model_dict, fused, X[:batch_size]) <= 1e-9, batch_size
+    assert fused.predict(X[0]).shape == (1, 2)
+    print(f"✓ Fused model matches the pipeline for batch sizes {BATCH_SIZES}")
+
+
+def test_save_load_roundtrip():
+    """A saved fused model loads back with identical predictions"""
+    model_dict = model_registry.get(WEIGHT_CHANGE_MODEL)
+    fused = FusedLinearModel.from_pipeline(model_dict, source_sha256='abc')
+    X = parity_inputs(model_dict, 100)
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'model.bundle', 'manifest.json')
+        fused.save(path)
+        loaded = FusedLinearModel.load(path)
+    assert loaded.source_sha256 == 'abc'
+    assert loaded.target_names == model_dict['target_names']
+    assert np.array_equal(loaded.predict(X), fused.predict(X))
+    print("✓ Saved fused model loads back unchanged")
+
+
+def test_request_path_without_sklearn():
+    """With the export in place, scoring does not import scikit-learn"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    expected = pipeline_predict(model_registry.get(WEIGHT_CHANGE_MODEL), np.array([[30, 1, 80.0, -500.0, 2]]))
+    assert not result['sklearn'], "sklearn imported on the request path"
+    assert np.allclose(result['prediction'], expected)
+    print("✓ Fused export scored without importing scikit-learn")
+
+
+if __name__ == '__main__':
+    test_parity()
+    test_save_load_roundtrip()
+    test_request_path_without_sklearn()
+    print("\n🎉 ALL LINEAR ENGINE TESTS PASSED!")
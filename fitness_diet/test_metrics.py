@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the /metrics endpoint: Prometheus text format,
+per-model request/error counters and stage histograms filled by the
+prediction views, cache hit rates and loaded model versions.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import warnings
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the prediction views save a row per request
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from django.core.management import call_command
+from django.test import Client
+
+from fitness_diet.metrics import Counter, Histogram, ModelMetrics, model_metrics
+
+HEART_INPUT = {'age': 44, 'sex': 0, 'cholesterol': 233, 'max_hr': 161}
+MODELS = ['heart_disease', 'lung_disease', 'calories_burnt', 'weight_change', 'diet_plan', 'workout_plan', 'food_vit']
+
+
+def parse(text):
+    """``{(name, frozenset(labels)): value}`` plus the declared ``{family: type}``"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE'):
+            _, _, family, kind = line.split()
+            types[family] = kind
+        elif line and not line.startswith('#'):
+            name_labels, value = line.rsplit(' ', 1)
+            name, labels = name_labels.split('{', 1)
+            pairs = [pair.split('=', 1) for pair in labels.rstrip('}').split('",') if pair]
+            samples[(name, frozenset((k, v.strip('"')) for k, v in pairs))] = float(value)
+    return samples, types
+
+
+def value(samples, name, **labels):
+    matches = [v for (n, l), v in samples.items() if n == name and set(labels.items()) <= set(l)]
+    assert len(matches) == 1, (name, labels, len(matches))
+    return matches[0]
+
+
+def test_threaded_counts_exact():
+    """Per-thread shards lose no increments under concurrent writers"""
+    counter, histogram = Counter(), Histogram(buckets=(1.0, 2.0))
+
+    def work():
+        for i in range(10000):
+            counter.inc()
+            histogram.observe(0.5 if i % 2 else 1.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cumulative, count, total = histogram.snapshot()
+    assert counter.value == 80000
+    assert cumulative == [40000, 80000, 80000] and count == 80000
+    assert abs(total - 80000.0) < 1e-6
+    print("✓ 8 threads x 10000 observations counted exactly")
+
+
+def test_exited_threads_retired():
+    """A thread per request does not grow the shard list: exited threads' shards are folded"""
+    counter, histogram = Counter(), Histogram(buckets=(1.0,))
+
+    def request():
+        counter.inc()
+        histogram.observe(0.5)
+
+    for _ in range(1000):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+    assert len(counter._shards) < Counter.MIN_PRUNE_AT, len(counter._shards)
+    assert counter.value == 1000 and histogram.snapshot()[1] == 1000
+    assert not counter._shards and not histogram._shards
+    print("✓ Shards of 1000 exited threads folded into the totals")
+
+
+def test_stage_timer_counts_errors():
+    """An exception inside a timed stage is recorded as an error of that stage"""
+    metrics = ModelMetrics('test')
+    try:
+        with metrics.time('inference'):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    with metrics.time('encode'):
+        pass
+    assert metrics.errors['inference'].value == 1
+    assert metrics.latency['inference'].snapshot()[1] == 1
+    assert metrics.latency['encode'].snapshot()[1] == 1
+    print("✓ Stage timer records durations and errors")
+
+
+def test_endpoint():
+    """Predictions show up as counters, histograms, cache rates and versions on /metrics"""
+    client = Client()
+    before = model_metrics('heart_disease').requests.value
+    for _ in range(3):
+        response = client.post('/heart-disease-prediction/', data=json.dumps(HEART_INPUT),
+                               content_type='application/json')
+        assert response.status_code == 200, response.content
+    assert client.post('/heart-disease-prediction/', data='not json',
+                       content_type='application/json').status_code == 400
+    client.get('/heart-disease-prediction/')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples, types = parse(response.content.decode())
+
+    assert types['fitness_model_requests_total'] == 'counter'
+    assert types['fitness_model_stage_duration_seconds'] == 'histogram'
+    for model in MODELS:
+        value(samples, 'fitness_model_requests_total', model=model)
+    assert value(samples, 'fitness_model_requests_total', model='heart_disease') == before + 4
+    assert value(samples, 'fitness_model_errors_total', model='heart_disease', stage='request') >= 1
+    for stage in ('encode', 'inference', 'persist'):
+        count = value(samples, 'fitness_model_stage_duration_seconds_count', model='heart_disease', stage=stage)
+        inf = value(samples, 'fitness_model_stage_duration_seconds_bucket', model='heart_disease',
+                    stage=stage, le='+Inf')
+        assert count >= 3 and inf == count, stage
+    assert value(samples, 'fitness_prediction_cache_hits_total', cache='heart_disease') >= 2
+    assert 0 < value(samples, 'fitness_prediction_cache_hit_ratio', cache='heart_disease') <= 1
+    assert any(n == 'fitness_model_info' and ('model', 'heart_disease') in l for n, l in samples)
+    print(f"✓ /metrics exposes {len(types)} families covering {len(MODELS)} models")
+
+
+def test_families_contiguous():
+    """Every family's samples follow its own TYPE line (required by the text format)"""
+    text = Client().get('/metrics').content.decode()
+    seen, current = set(), None
+    for line in text.splitlines():
+        if line.startswith('# TYPE'):
+            current = line.split()[2]
+            assert current not in seen, current
+            seen.add(current)
+        elif line and not line.startswith('#'):
+            assert line.startswith(current), line
+    print("✓ Metric families are contiguous")
+
+
+def test_calorie_errors_counted_once():
+    """A bad calorie form is one request error, answered as JSON or as the page"""
+    client = Client()
+    metrics = model_metrics('calories_burnt')
+    for headers in ({'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}, {}):
+        before = metrics.errors['request'].value if 'request' in metrics.errors else 0
+        response = client.post('/calories-burnt-predictor/', {'age': 'thirty'}, **headers)
+        assert response.status_code == 400, headers
+        assert metrics.errors['request'].value == before + 1, headers
+    print("✓ Calorie predictor errors counted once on both paths")
+
+
+if __name__ == "__main__":
+    call_command('migrate', verbosity=0)
+    test_threaded_counts_exact()
+    test_exited_threads_retired()
+    test_stage_timer_counts_errors()
+    test_endpoint()
+    test_calorie_errors_counted_once()
+    test_families_contiguous()
+    print("\n🎉 ALL METRICS TESTS PASSED!")
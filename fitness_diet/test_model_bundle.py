@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script to verify model bundles: arrays come back memory-mapped, the
+manifest describes the export, and a modified bundle is rejected so the
+registry falls back to the source pickle.
+"""
+
+import json
+import os
+import pickle
+import sys
+import tempfile
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from fitness_diet.feature_encoders import HEART_MODEL, get_heart_encoder
+from fitness_diet.model_bundle import BundleError, bundle_manifest_name, read_bundle
+from fitness_diet.model_registry import ModelRegistry, file_sha256, model_registry
+from fitness_diet.tree_engine import FlatTreeEnsemble
+
+SHIPPED_BUNDLES = [
+    'heart_disease/heart_model.pkl',
+    'lung_disease/lungs_model.pkl',
+    'calories_burnt/calorie_burn_model.pkl',
+    'weight_change/weight_change_model.pkl',
+]
+
+
+def make_registry(root):
+    """A registry over a small pickled forest and its bundle"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, X[:, 0] > 0)
+    with open(os.path.join(root, 'model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    source_path = os.path.join(root, 'model.pkl')
+    engine = FlatTreeEnsemble.from_model(model, source_sha256=file_sha256(source_path))
+    engine.feature_names = ['a', 'b', 'c', 'd']
+    engine.save(os.path.join(root, *bundle_manifest_name('model.pkl').split('/')), source_path=source_path)
+    return ModelRegistry(root, check_interval=0), model, X
+
+
+def test_name():
+    """Bundle names sit next to the pickle"""
+    assert bundle_manifest_name('heart_disease/heart_model.pkl') == 'heart_disease/heart_model.bundle/manifest.json'
+    print("✓ Bundle manifest named after its pickle")
+
+
+def test_manifest_and_mmap():
+    """Arrays load memory-mapped and the manifest records version, features and libraries"""
+    with tempfile.TemporaryDirectory() as root:
+        registry, model, X = make_registry(root)
+        manifest, arrays = read_bundle(registry.path_for(bundle_manifest_name('model.pkl')))
+        assert manifest['kind'] == 'tree_ensemble'
+        assert manifest['feature_names'] == ['a', 'b', 'c', 'd']
+        assert manifest['version'] == manifest['source_sha256'][:12]
+        assert manifest['source'] == 'model.pkl'
+        assert manifest['libraries']['numpy'] == np.__version__
+        for name, array in arrays.items():
+            assert isinstance(array, np.memmap), name
+            assert list(array.shape) == manifest['arrays'][name]['shape']
+
+        engine = registry.get_export(bundle_manifest_name('model.pkl'), 'model.pkl', loader=FlatTreeEnsemble.load)
+        assert engine.feature_names == ['a', 'b', 'c', 'd']
+        assert np.allclose(engine.predict_proba(X), model.predict_proba(X))
+    print("✓ Bundle arrays memory-mapped, manifest complete, predictions match")
+
+
+def test_tampered_bundle_falls_back():
+    """A modified array file fails its checksum and the registry ignores the export"""
+    with tempfile.TemporaryDirectory() as root:
+        registry, _, _ = make_registry(root)
+        manifest_path = registry.path_for(bundle_manifest_name('model.pkl'))
+        with open(manifest_path) as f:
+            entry = json.load(f)['arrays']['threshold']
+        array_path = os.path.join(os.path.dirname(manifest_path), entry['file'])
+        threshold = np.load(array_path)
+        threshold[0] += 1.0
+        np.save(array_path, threshold)
+
+        try:
+            read_bundle(manifest_path)
+            raise AssertionError("tampered bundle was accepted")
+        except BundleError as e:
+            assert 'checksum' in str(e)
+        assert registry.get_export(bundle_manifest_name('model.pkl'), 'model.pkl',
+                                   loader=FlatTreeEnsemble.load) is None
+    print("✓ Tampered bundle rejected, registry falls back to the pickle")
+
+
+def test_reexport_replaces_files():
+    """Re-exporting writes new content-addressed files and removes the old ones"""
+    with tempfile.TemporaryDirectory() as root:
+        registry, _, _ = make_registry(root)
+        manifest_path = registry.path_for(bundle_manifest_name('model.pkl'))
+        engine = FlatTreeEnsemble.load(manifest_path)
+        engine.threshold = engine.threshold + 1.0
+        engine.save(manifest_path)
+        manifest, _ = read_bundle(manifest_path)
+        files = sorted(f for f in os.listdir(os.path.dirname(manifest_path)) if f.endswith('.npy'))
+        assert files == sorted(entry['file'] for entry in manifest['arrays'].values())
+    print("✓ Re-export leaves only the files the manifest references")
+
+
+def test_shipped_bundles():
+    """Every shipped bundle verifies and matches its pickle"""
+    for name in SHIPPED_BUNDLES:
+        manifest, _ = read_bundle(model_registry.path_for(bundle_manifest_name(name)))
+        assert manifest['source'] == os.path.basename(name), name
+        assert manifest['source_sha256'] == file_sha256(model_registry.path_for(name)), name
+        assert manifest['feature_names'], name
+    heart, _ = read_bundle(model_registry.path_for(bundle_manifest_name(HEART_MODEL)))
+    assert get_heart_encoder().feature_names == heart['feature_names'], "heart rows follow the manifest's order"
+    print(f"✓ {len(SHIPPED_BUNDLES)} shipped bundles verified against their pickles")
+
+
+if __name__ == "__main__":
+    test_name()
+    test_manifest_and_mmap()
+    test_tampered_bundle_falls_back()
+    test_reexport_replaces_files()
+    test_shipped_bundles()
+    print("\n🎉 ALL MODEL BUNDLE TESTS PASSED!")
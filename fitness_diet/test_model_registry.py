@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the model registry loads each artifact once and
+swaps in a new version when the file changes on disk.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import django
+import joblib
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+
+from fitness_diet.model_registry import ModelRegistry
+
+
+def test_loads_once():
+    """Repeated lookups return the same object without reloading"""
+    with tempfile.TemporaryDirectory() as root:
+        joblib.dump({'weights': [1, 2, 3]}, os.path.join(root, 'model.pkl'))
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return joblib.load(path)
+
+        registry = ModelRegistry(root, check_interval=0)
+        first = registry.get('model.pkl', loader=loader)
+        second = registry.get('model.pkl')
+        assert first is second
+        assert len(calls) == 1
+        print("✓ Artifact loaded once for repeated lookups")
+
+
+def test_reloads_changed_artifact():
+    """A rewritten artifact is picked up with a new version"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'model.pkl')
+        joblib.dump({'version': 1}, path)
+        registry = ModelRegistry(root, check_interval=0)
+        assert registry.get('model.pkl') == {'version': 1}
+        old_version = registry.version('model.pkl')
+
+        time.sleep(0.01)
+        joblib.dump({'version': 2, 'extra': True}, path)
+        assert registry.get('model.pkl') == {'version': 2, 'extra': True}
+        assert registry.version('model.pkl') != old_version
+
+        stats = registry.stats()
+        assert stats[0]['name'] == 'model.pkl'
+        assert stats[0]['load_seconds'] >= 0
+        print("✓ Changed artifact reloaded with a new version")
+
+
+def test_missing_artifact():
+    """Missing artifacts raise FileNotFoundError so views can fall back"""
+    with tempfile.TemporaryDirectory() as root:
+        registry = ModelRegistry(root)
+        try:
+            registry.get('missing.pkl')
+        except FileNotFoundError:
+            print("✓ Missing artifact raises FileNotFoundError")
+        else:
+            raise AssertionError("expected FileNotFoundError")
+
+
+if __name__ == '__main__':
+    test_loads_once()
+    test_reloads_changed_artifact()
+    test_missing_artifact()
+    print("\n🎉 ALL MODEL REGISTRY TESTS PASSED!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script to verify nutrient extraction by USDA nutrient id: search API
+payloads, the slotted Nutrients record, its display strings and round trip
+through JSON.
+"""
+
+import json
+import os
+import sys
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+from fitness_diet.nutrients import Nutrients, display
+
+# Shape of a USDA foods/search result; the lipid entries are the ones name matching got wrong
+SEARCH_FOOD = {
+    'fdcId': 171688, 'description': 'Apples, raw, with skin',
+    'foodNutrients': [
+        {'nutrientId': 1062, 'nutrientName': 'Energy', 'unitName': 'kJ', 'value': 218.0},
+        {'nutrientId': 1258, 'nutrientName': 'Fatty acids, total saturated', 'unitName': 'G', 'value': 0.028},
+        {'nutrientId': 1008, 'nutrientName': 'Energy', 'unitName': 'KCAL', 'value': 52.0},
+        {'nutrientId': 1003, 'nutrientName': 'Protein', 'unitName': 'G', 'value': 0.26},
+        {'nutrientId': 1004, 'nutrientName': 'Total lipid (fat)', 'unitName': 'G', 'value': 0.17},
+        {'nutrientId': 1005, 'nutrientName': 'Carbohydrate, by difference', 'unitName': 'G', 'value': 13.8},
+        {'nutrientId': 1079, 'nutrientName': 'Fiber, total dietary', 'unitName': 'G', 'value': 2.4},
+    ],
+}
+
+
+def test_search_payload():
+    """Values are picked by nutrient id, not by name"""
+    apple = Nutrients.from_search_food(SEARCH_FOOD)
+    assert apple == Nutrients(171688, 'Apples, raw, with skin', 52.0, 0.26, 13.8, 0.17, 'remote')
+    assert apple.fat == 0.17, "saturated fatty acids must not be read as fat"
+
+    atwater = Nutrients.from_search_food({'foodNutrients': [
+        {'nutrientId': 2047, 'unitName': 'KCAL', 'value': 61.0},
+        {'nutrientId': 2047, 'unitName': 'KCAL', 'value': 99.0}]})
+    assert atwater.calories == 61.0 and atwater.protein is None and atwater.fdc_id is None
+    print("✓ Nutrients extracted by USDA id; kJ energy and lipid look-alikes ignored")
+
+
+def test_record():
+    """The record is slotted, numeric and survives a JSON round trip"""
+    record = Nutrients('7', 'Pho', calories=60, protein='4.5')
+    assert not hasattr(record, '__dict__')
+    assert record.fdc_id == 7 and isinstance(record.calories, float) and record.protein == 4.5
+    restored = Nutrients.from_dict(dict(json.loads(json.dumps(record.as_dict())), query='pho'))
+    assert restored == record
+    assert record.display() == {'calories': '60.0 kcal', 'protein': '4.5g', 'carbs': 'Not found',
+                                'fat': 'Not found'}
+    assert display(None)['calories'] == 'Not found'
+    print("✓ Slotted record with numeric fields and display strings")
+
+
+if __name__ == "__main__":
+    test_search_payload()
+    test_record()
+    print("\n🎉 ALL NUTRIENTS TESTS PASSED!")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the prediction cache reuses results for repeated
+inputs, stays bounded, expires entries and is cleared when the model
+registry reloads an artifact.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import django
+import joblib
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the endpoints save an assessment or calculation per request
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from fitness_diet import views_calories_burnt
+from fitness_diet.model_registry import ModelRegistry
+from fitness_diet.prediction_cache import PredictionCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return X.sum(axis=1)
+
+
+def test_repeated_inputs_hit():
+    """Identical feature vectors are scored once"""
+    cache = PredictionCache('test', 'model/')
+    model = CountingModel()
+    first = cache.predict([[1.0, 2.0, -0.0]], model.predict)
+    second = cache.predict(np.array([[1, 2, 0]]), model.predict)
+    assert model.calls == 1 and first == second
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    print("✓ Repeated input served from the cache")
+
+
+def test_lru_bound_and_ttl():
+    """Oldest entries are evicted and expired entries are recomputed"""
+    cache = PredictionCache('test', 'model/', max_entries=2, ttl=0.05)
+    model = CountingModel()
+    for value in (1, 2, 3):
+        cache.predict([[value]], model.predict)
+    assert cache.stats()['entries'] == 2 and cache.stats()['evictions'] == 1
+    cache.predict([[1]], model.predict)
+    assert model.calls == 4, "evicted entry should be recomputed"
+    time.sleep(0.06)
+    cache.predict([[1]], model.predict)
+    assert model.calls == 5, "expired entry should be recomputed"
+    print("✓ LRU bound and TTL enforced")
+
+
+def test_quantized_inputs_share_entry():
+    """With a quantum, near-identical inputs share one entry and one answer"""
+    cache = PredictionCache('test', 'model/', quantum=0.1)
+    model = CountingModel()
+    first = cache.predict([[37.31, 120.0]], model.predict)
+    second = cache.predict([[37.29, 120.04]], model.predict)
+    assert model.calls == 1 and first[0] == 37.3 + 120.0 == second[0]
+    print("✓ Quantized inputs share a cache entry")
+
+
+def test_registry_reload_invalidates():
+    """Reloading an artifact clears the cache and changes the key"""
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, 'model'))
+        path = os.path.join(root, 'model', 'weights.pkl')
+        joblib.dump([1], path)
+        registry = ModelRegistry(root, check_interval=0)
+        cache = PredictionCache('test', 'model/', registry=registry)
+        registry.add_listener(cache.invalidate)
+
+        model = CountingModel()
+        registry.get('model/weights.pkl')
+        cache.predict([[1]], model.predict)
+        cache.predict([[1]], model.predict)
+        assert model.calls == 1
+
+        joblib.dump([1, 2], path)
+        os.utime(path, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+        registry.get('model/weights.pkl')
+        assert cache.stats()['entries'] == 0 and cache.stats()['invalidations'] == 1
+        cache.predict([[1]], model.predict)
+        assert model.calls == 2
+    print("✓ Registry reload invalidates the cache")
+
+
+def test_endpoint_counts_hits():
+    """Resubmitting the same heart form is a cache hit"""
+    client = Client()
+    payload = json.dumps({'age': 44, 'sex': 0, 'cholesterol': 233, 'max_hr': 161})
+    before = {c['name']: c for c in client.get('/api/predict/cache-stats').json()['caches']}['heart_disease']
+    first = client.post('/heart-disease-prediction/', data=payload, content_type='application/json').json()
+    second = client.post('/heart-disease-prediction/', data=payload, content_type='application/json').json()
+    after = {c['name']: c for c in client.get('/api/predict/cache-stats').json()['caches']}['heart_disease']
+    assert first == second
+    assert after['hits'] - before['hits'] >= 1
+    print("✓ Heart endpoint answers resubmissions from the cache")
+
+
+def test_calorie_engines_cached_apart():
+    """A lookup-table answer is never served for the model, or the other way round"""
+
+    class ConstantTable:
+        def contains(self, X):
+            return np.ones(len(X), dtype=bool)
+
+        def predict(self, X):
+            return np.full(len(X), -1.0)
+
+    client = Client()
+    form = {'gender': 'female', 'age': 41, 'height': 165, 'weight': 61,
+            'duration': 25, 'heart_rate': 105, 'body_temp': 39.5}
+    ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+    original = views_calories_burnt.get_calorie_table
+    views_calories_burnt.get_calorie_table = lambda: ConstantTable()
+    try:
+        with override_settings(CALORIE_BURN_LOOKUP_TABLE=True):
+            from_table = client.post('/calories-burnt-predictor/', form, **ajax).json()['calories_burnt']
+        from_model = client.post('/calories-burnt-predictor/', form, **ajax).json()['calories_burnt']
+        with override_settings(CALORIE_BURN_LOOKUP_TABLE=True):
+            from_table_again = client.post('/calories-burnt-predictor/', form, **ajax).json()['calories_burnt']
+    finally:
+        views_calories_burnt.get_calorie_table = original
+    assert from_table == from_table_again == -1.0
+    assert from_model != -1.0
+    print("✓ Lookup table and model answers cached apart")
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    test_repeated_inputs_hit()
+    test_lru_bound_and_ttl()
+    test_quantized_inputs_share_entry()
+    test_registry_reload_invalidates()
+    test_endpoint_counts_hits()
+    test_calorie_engines_cached_apart()
+    print("\n🎉 ALL PREDICTION CACHE TESTS PASSED!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Startup budget test: importing the URLConf must stay cheap.
+
+Runs the import in a fresh interpreter, then checks wall time, resident
+memory growth and that no heavy ML library was pulled in. Thresholds can be
+tuned with STARTUP_BUDGET_SECONDS and STARTUP_BUDGET_RSS_MB.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '1.5'))
+BUDGET_RSS_MB = float(os.environ.get('STARTUP_BUDGET_RSS_MB', '80'))
+HEAVY_MODULES = ['torch', 'transformers', 'pandas', 'matplotlib', 'sklearn', 'xgboost']
+
+PROBE = """
+import json, os, sys, time
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+import django
+django.setup()
+
+rss_before = rss()
+start = time.perf_counter()
+import fitness_diet.urls
+seconds = time.perf_counter() - start
+print(json.dumps({
+    'seconds': seconds,
+    'rss_mb': (rss() - rss_before) / (1024 * 1024),
+    'modules': sorted(m for m in %r if m in sys.modules),
+}))
+"""
+
+
+def measure_urlconf_import():
+    """Import fitness_diet.urls in a clean interpreter and report the cost"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE % (HEAVY_MODULES,)],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_urlconf_startup_budget():
+    """URLConf import stays within the time and memory budget"""
+    result = measure_urlconf_import()
+    print(f"URLConf import: {result['seconds']:.3f}s, RSS +{result['rss_mb']:.1f} MB")
+
+    assert not result['modules'], f"heavy modules imported at startup: {result['modules']}"
+    assert result['seconds'] < BUDGET_SECONDS, (
+        f"URLConf import took {result['seconds']:.2f}s (budget {BUDGET_SECONDS}s)")
+    assert result['rss_mb'] < BUDGET_RSS_MB, (
+        f"URLConf import grew RSS by {result['rss_mb']:.1f} MB (budget {BUDGET_RSS_MB} MB)")
+
+
+if __name__ == '__main__':
+    test_urlconf_startup_budget()
+    print("✓ Startup within budget")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the calorie-burn lookup table interpolates the model
+on its grid, loads memory-mapped, and that the predictor falls back to the
+model outside the grid.
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the predictor view saves a CalorieCalculation per request
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from fitness_diet import views_calories_burnt
+from fitness_diet.management.commands.build_calorie_table import holdout_errors, holdout_inputs
+from fitness_diet.model_registry import model_registry
+from fitness_diet.surrogate_table import CALORIE_GRID, CALORIE_MODEL, LookupTable
+
+# Coarse grid so the test builds in well under a second
+SMALL_GRID = [(column, lower, upper, 3) for column, lower, upper, _ in CALORIE_GRID]
+
+
+class LinearModel:
+    """Stand-in model that multilinear interpolation reproduces exactly"""
+
+    def predict(self, X):
+        return X @ np.arange(1, 8) + 5.0
+
+
+def build_small_table():
+    return LookupTable.build(model_registry.get(CALORIE_MODEL), SMALL_GRID, source_sha256='abc')
+
+
+def test_exact_for_linear_model():
+    """Interpolating a linear function is exact, including at the grid edges"""
+    model = LinearModel()
+    table = LookupTable.build(model, SMALL_GRID)
+    X = holdout_inputs(table, 500)
+    X[0] = table.lower
+    X[1] = table.upper
+    assert np.allclose(table.predict(X), model.predict(X))
+    print("✓ Linear function reproduced exactly")
+
+
+def test_grid_points_match_model():
+    """At grid points the table returns the model's own output"""
+    model = model_registry.get(CALORIE_MODEL)
+    table = build_small_table()
+    axes = [np.linspace(lower, upper, points) for _, lower, upper, points in SMALL_GRID]
+    X = np.array([[axis[i % len(axis)] for axis in axes] for i in range(3)])
+    assert np.allclose(table.predict(X), model.predict(X), atol=1e-3)
+    errors = holdout_errors(model, table, holdout_inputs(table, 1000))
+    assert errors['mean_abs'] <= errors['p99_abs'] <= errors['max_abs']
+    print(f"✓ Grid points match the model (coarse grid holdout mean error {errors['mean_abs']} kcal)")
+
+
+def test_save_load_memory_mapped():
+    """A saved table loads memory-mapped with identical answers"""
+    table = build_small_table()
+    X = holdout_inputs(table, 200)
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'model.bundle', 'manifest.json')
+        table.save(path)
+        loaded = LookupTable.load(path)
+        assert isinstance(loaded.values, np.memmap)
+        assert loaded.source_sha256 == 'abc'
+        assert np.array_equal(loaded.predict(X), table.predict(X))
+        del loaded
+    print("✓ Saved table loads memory-mapped")
+
+
+def test_predictor_falls_back_outside_grid():
+    """The predictor answers from the table inside the grid and from the model outside it"""
+    table = LookupTable.build(LinearModel(), SMALL_GRID)
+    client = Client()
+    original = views_calories_burnt.get_calorie_table
+    views_calories_burnt.get_calorie_table = lambda: table
+    try:
+        with override_settings(CALORIE_BURN_LOOKUP_TABLE=True):
+            inside = {'gender': 'male', 'age': 30, 'height': 170, 'weight': 70,
+                      'duration': 20, 'heart_rate': 100, 'body_temp': 40.0}
+            outside = dict(inside, duration=90)
+            ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+            in_grid = client.post('/calories-burnt-predictor/', inside, **ajax).json()['calories_burnt']
+            off_grid = client.post('/calories-burnt-predictor/', outside, **ajax).json()['calories_burnt']
+    finally:
+        views_calories_burnt.get_calorie_table = original
+
+    X = np.array([[1, 30, 170, 70, 20, 100, 40.0], [1, 30, 170, 70, 90, 100, 40.0]])
+    assert in_grid == round(float(LinearModel().predict(X[:1])[0]), 1)
+    assert off_grid == round(float(model_registry.get(CALORIE_MODEL).predict(X[1:])[0]), 1)
+    print("✓ Table used inside the grid, model outside it")
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    test_exact_for_linear_model()
+    test_grid_points_match_model()
+    test_save_load_memory_mapped()
+    test_predictor_falls_back_outside_grid()
+    print("\n🎉 ALL SURROGATE TABLE TESTS PASSED!")
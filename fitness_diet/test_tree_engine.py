@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the flattened tree engine reproduces the pickled
+heart, lung and calorie-burn models for batch sizes from 1 to 10000, and
+that a stale export is ignored in favour of the pickle.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from fitness_diet import tree_engine
+from fitness_diet.management.commands.export_tree_models import TREE_MODELS, max_difference, parity_inputs
+from fitness_diet.model_registry import ModelRegistry, file_sha256, model_registry
+from fitness_diet.model_bundle import bundle_manifest_name
+from fitness_diet.tree_engine import FlatTreeEnsemble
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def test_parity():
+    """Flat engine matches the original model's outputs and labels"""
+    for name in TREE_MODELS:
+        model = model_registry.get(name)
+        engine = FlatTreeEnsemble.from_model(model)
+        X = parity_inputs(engine, max(BATCH_SIZES), seed=1)
+        for batch_size in BATCH_SIZES:
+            batch = X[:batch_size]
+            assert max_difference(model, engine, batch) <= 1e-4, (name, batch_size)
+            if engine.classes_ is not None:
+                assert np.array_equal(model.predict(batch), engine.predict(batch)), (name, batch_size)
+        print(f"✓ {name} matches for batch sizes {BATCH_SIZES}")
+
+
+def test_save_load_roundtrip():
+    """A saved engine loads back with identical predictions"""
+    model = model_registry.get(TREE_MODELS[0])
+    engine = FlatTreeEnsemble.from_model(model, source_sha256='abc')
+    X = parity_inputs(engine, 100)
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'model.bundle', 'manifest.json')
+        engine.save(path)
+        loaded = FlatTreeEnsemble.load(path)
+    assert loaded.source_sha256 == 'abc'
+    assert np.array_equal(loaded.predict_proba(X), engine.predict_proba(X))
+    print("✓ Saved engine loads back unchanged")
+
+
+def test_stale_export_falls_back():
+    """An export whose checksum no longer matches the pickle is not used"""
+    name = TREE_MODELS[1]
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, os.path.dirname(name)))
+        source = os.path.join(root, name)
+        shutil.copy(model_registry.path_for(name), source)
+        engine = FlatTreeEnsemble.from_model(model_registry.get(name), source_sha256=file_sha256(source))
+        engine.save(os.path.join(root, *bundle_manifest_name(name).split('/')))
+
+        registry = ModelRegistry(root, check_interval=0)
+        original = tree_engine.model_registry
+        tree_engine.model_registry = registry
+        try:
+            assert isinstance(tree_engine.get_tree_model(name), FlatTreeEnsemble)
+            with open(source, 'ab') as f:
+                f.write(b'\0')
+            assert not isinstance(tree_engine.get_tree_model(name), FlatTreeEnsemble)
+        finally:
+            tree_engine.model_registry = original
+    print("✓ Stale export ignored after the pickle changes")
+
+
+if __name__ == '__main__':
+    test_parity()
+    test_save_load_roundtrip()
+    test_stale_export_falls_back()
+    print("\n🎉 ALL TREE ENGINE TESTS PASSED!")
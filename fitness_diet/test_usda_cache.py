@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the persistent USDA search cache: TTL hits, negative
+entries, stale-while-revalidate with a single background refresh, failures
+that are never cached, the admin pre-warm action and the /metrics counters.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import warnings
+from concurrent.futures import wait
+from datetime import timedelta
+from unittest import mock
+
+import django
+from django.conf import settings
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment on a throwaway database: the admin test clears the search cache and records recognitions
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+_database_dir = tempfile.TemporaryDirectory()
+settings.DATABASES['default']['NAME'] = os.path.join(_database_dir.name, 'db.sqlite3')
+django.setup()
+warnings.filterwarnings('ignore')
+logging.disable(logging.WARNING)
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from fitness_diet.http_client import http_client
+from fitness_diet.metrics import render_metrics
+from fitness_diet.models import FoodRecognition, UsdaSearchResult
+from fitness_diet.nutrients import Nutrients
+from fitness_diet.usda_cache import UsdaSearchCache, usda_cache
+
+
+class FakeUsda:
+    """``fetch`` callable answering from a dict, counting calls; ``gate`` holds calls until set"""
+
+    def __init__(self, foods):
+        self.foods = foods
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = None
+
+    def __call__(self, query):
+        self.calls.append(query)
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        calories = self.foods.get(query)
+        return None if calories is None else Nutrients(description=query, calories=calories, source='remote')
+
+
+def wait_for_refreshes(cache):
+    wait(list(cache._pending.values()), timeout=5)
+
+
+def age_entry(query, seconds):
+    UsdaSearchResult.objects.filter(query=query).update(fetched_at=timezone.now() - timedelta(seconds=seconds))
+
+
+def test_hits_and_negative_entries():
+    """Found and not-found answers are both cached under the normalized query"""
+    call_command('migrate', verbosity=0)
+    usda = FakeUsda({'pizza': 266.0})
+    cache = UsdaSearchCache(usda, ttl=100, negative_ttl=10, stale_ttl=1000)
+
+    assert cache.get('Pizza').calories == 266.0
+    assert cache.get('pizza ').calories == 266.0
+    assert cache.get('unobtainium') is None
+    assert cache.get('UNOBTAINIUM') is None
+    assert usda.calls == ['pizza', 'unobtainium']
+    assert UsdaSearchResult.objects.get(query='unobtainium').result is None
+    assert cache.stats()['lookups'] == {'hit': 1, 'stale': 0, 'negative': 1, 'miss': 2}
+
+    age_entry('unobtainium', 20)  # past the negative ttl but not the found one
+    age_entry('pizza', 20)
+    assert cache.get('unobtainium') is None and cache.get('pizza') is not None
+    wait_for_refreshes(cache)
+    assert usda.calls == ['pizza', 'unobtainium', 'unobtainium']
+    print("✓ Hits and negative entries served from the table")
+
+
+def test_stale_while_revalidate():
+    """A stale entry is served at once while exactly one background refresh runs"""
+    usda = FakeUsda({'sushi': 150.0})
+    cache = UsdaSearchCache(usda, ttl=100, negative_ttl=10, stale_ttl=1000)
+    cache.get('sushi')
+    age_entry('sushi', 500)
+    usda.foods['sushi'] = 143.0
+    usda.gate.clear()
+
+    values = [cache.get('sushi').calories for _ in range(5)]
+    assert values == [150.0] * 5, "stale value served without waiting"
+    assert cache.stats()['pending'] == 1
+    future = cache.refresh('sushi')
+    usda.gate.set()
+    future.result(5)
+    assert usda.calls == ['sushi', 'sushi']
+    assert cache.get('sushi').calories == 143.0
+    assert cache.stats()['refreshes'] == 1
+
+    age_entry('sushi', 5000)  # past the stale window: fetched synchronously
+    usda.foods['sushi'] = 140.0
+    assert cache.get('sushi').calories == 140.0
+    print("✓ Stale entries served during a single background refresh")
+
+
+def test_failures_not_cached():
+    """Failed requests return None on a miss and keep the old entry on refresh"""
+    usda = FakeUsda({'ramen': 436.0})
+    cache = UsdaSearchCache(usda, ttl=100, negative_ttl=10, stale_ttl=1000)
+    usda.error = TimeoutError('timed out')
+    assert cache.get('ramen') is None
+    assert not UsdaSearchResult.objects.filter(query='ramen').exists()
+
+    usda.error = None
+    cache.get('ramen')
+    age_entry('ramen', 500)
+    usda.error = TimeoutError('timed out')
+    assert cache.get('ramen').calories == 436.0
+    wait_for_refreshes(cache)
+    assert cache.stats()['refresh_errors'] == 1
+    assert UsdaSearchResult.objects.get(query='ramen').result['calories'] == 436.0
+    print("✓ Failures never cached; failed refresh keeps serving the old entry")
+
+
+def test_admin_prewarm():
+    """The admin action pre-warms the most recognized foods through the USDA API"""
+    # Only the pre-warmed searches should end up cached, not those of the tests above
+    UsdaSearchResult.objects.all().delete()
+    for food, n in (('Apple_Pie', 3), ('Pho', 2), ('Takoyaki', 1)):
+        for _ in range(n):
+            FoodRecognition.objects.create(recognized_food=food, calories=100)
+    admin_user = User.objects.filter(username='usda-admin').first() or User.objects.create_superuser(
+        'usda-admin', 'admin@example.com', 'x')
+    client = Client()
+    client.force_login(admin_user)
+
+    response = mock.Mock()
+    response.json.return_value = {'foods': [{'fdcId': 1, 'description': 'Found', 'foodNutrients': [
+        {'nutrientId': 1008, 'unitName': 'KCAL', 'value': 100.0}]}]}
+    cache = usda_cache()
+    with mock.patch.object(http_client('usda'), 'get', return_value=response) as get, \
+            override_settings(USDA_CACHE_WARM_LABELS=2):
+        page = client.post('/admin/fitness_diet/foodrecognition/', {
+            'action': 'warm_usda_cache',
+            '_selected_action': list(FoodRecognition.objects.values_list('id', flat=True)),
+        }, follow=True)
+        assert page.status_code == 200
+        assert b'2 of 2 foods queued' in page.content, page.content[-2000:]
+        wait_for_refreshes(cache)
+        searched = sorted(call.kwargs['params']['query'] for call in get.call_args_list)
+    assert searched == ['apple pie', 'pho'], searched
+    assert set(UsdaSearchResult.objects.values_list('query', flat=True)) == {'apple pie', 'pho'}
+    assert cache.warm(['Pho'])['fresh'] == 1
+    print("✓ Admin action pre-warms the most common recognized foods")
+
+
+def test_metrics():
+    """Cache outcomes are exported on /metrics"""
+    usda_cache().get('pho')
+    text = render_metrics()
+    assert 'fitness_usda_cache_lookups_total{' in text
+    assert 'result="hit"' in text and 'fitness_usda_cache_hit_ratio' in text
+    print("✓ USDA cache counters exported")
+
+
+if __name__ == "__main__":
+    test_hits_and_negative_entries()
+    test_stale_while_revalidate()
+    test_failures_not_cached()
+    test_admin_prewarm()
+    test_metrics()
+    print("\n🎉 ALL USDA CACHE TESTS PASSED!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the weight trajectory endpoint scores every week in
+one call and agrees with scoring the weeks one at a time.
+"""
+
+import json
+import os
+import sys
+import warnings
+
+import django
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_diet.settings')
+django.setup()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from django.test import Client
+
+from fitness_diet.linear_engine import get_linear_model
+from fitness_diet.tabular_models import TABULAR_MODELS
+from fitness_diet.weight_trajectory import trajectory_features
+
+PLAN = {'age': 34, 'gender': 'female', 'current_weight': 82.0, 'target_weight': 74.0,
+        'duration_weeks': 12, 'physical_activity_level': 'very_active'}
+
+
+class CountingModel:
+    """Wraps a model and records the batch size of every predict call"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return self.model.predict(X)
+
+
+def post_trajectory(client, plan):
+    return client.post('/api/predict/weight_change/trajectory', data=json.dumps(plan),
+                       content_type='application/json')
+
+
+def test_trajectory_shape():
+    """One point per week boundary, starting at the current weight"""
+    response = post_trajectory(Client(), PLAN)
+    assert response.status_code == 200, response.content
+    body = response.json()
+    assert body['weeks'] == list(range(13))
+    assert len(body['projected_weight']) == len(body['planned_weight']) == 13
+    assert len(body['weekly_change']) == 12
+    assert body['projected_weight'][0] == 82.0
+    assert body['planned_weight'][-1] == 74.0
+    print("✓ Trajectory has one point per week")
+
+
+def test_week_zero_matches_batch_endpoint():
+    """The plan-level prediction equals the weight_change batch API"""
+    client = Client()
+    trajectory = post_trajectory(client, PLAN).json()
+    batch = client.post('/api/predict/weight_change/batch',
+                        data=json.dumps({'records': [PLAN], 'persist': False}),
+                        content_type='application/json').json()
+    assert trajectory['predicted_weight_change'] == batch['results'][0]['prediction']
+    print("✓ Week 0 prediction matches the batch endpoint")
+
+
+def test_single_model_call_matches_per_week_calls():
+    """All weeks are scored in one call, with the same result as week-by-week scoring"""
+    model = CountingModel(get_linear_model())
+    spec = TABULAR_MODELS['weight_change']
+    original_load = spec.load
+    spec.load = lambda batch_size=1: model
+    try:
+        body = post_trajectory(Client(), PLAN).json()
+    finally:
+        spec.load = original_load
+    assert model.calls == [12], model.calls
+
+    X, _ = trajectory_features(34, 'female', 82.0, 74.0, 12, 'very_active')
+    per_week = [get_linear_model().predict(row)[0, 0] / (12 - k) for k, row in enumerate(X)]
+    assert np.allclose(body['weekly_change'], per_week, atol=1e-3)
+    print("✓ One model call for all weeks, matching per-week scoring")
+
+
+def test_invalid_plans():
+    """Bad durations and bodies are rejected"""
+    client = Client()
+    assert post_trajectory(client, dict(PLAN, duration_weeks=0)).status_code == 400
+    assert post_trajectory(client, dict(PLAN, duration_weeks='x')).status_code == 400
+    assert post_trajectory(client, dict(PLAN, duration_weeks=10000)).status_code == 413
+    assert post_trajectory(client, [PLAN]).status_code == 400
+    assert client.get('/api/predict/weight_change/trajectory').status_code == 405
+    print("✓ Invalid plans rejected")
+
+
+if __name__ == '__main__':
+    test_trajectory_shape()
+    test_week_zero_matches_batch_endpoint()
+    test_single_model_call_matches_per_week_calls()
+    test_invalid_plans()
+    print("\n🎉 ALL WEIGHT TRAJECTORY TESTS PASSED!")